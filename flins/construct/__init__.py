@@ -1,2 +1,11 @@
 from .world import World  # noqa: F401
 from .test import create_test_world  # noqa: F401
+from .turnover import Turnover  # noqa: F401
+from .slabs import Slabs  # noqa: F401
+from .shared import SharedState, SharedReader  # noqa: F401
+from . import observe  # noqa: F401
+from . import bindings  # noqa: F401
+from . import binding_log  # noqa: F401
+from .connectivity import Connectivity  # noqa: F401
+from . import correlate  # noqa: F401
+from . import density  # noqa: F401
@@ -0,0 +1,315 @@
+# encoding: utf-8
+"""
+Dear diary, today motor 12 let go of actin 3.
+
+Record the history of what is bound to what as an append-only binary log of
+binding events, far smaller than snapshots of positions as binding changes
+much less often than things move, and replay it to find what was bound to
+what at any tick.
+
+A binding log directory holds:
+
+- `log.bin`, the events, as records of `LOG`, each naming molecules by a
+  compact integer id in place of their string names
+- `molecules.bin`, records of `MOLECULE` giving the name, kind, and tract of
+  each id as it was first seen
+- `checkpoint_<offset>.npz`, every so many ticks, all the bonds and motor head
+  states after the log's first offset events
+
+Replay starts from the latest checkpoint at or before a tick and applies the
+events logged after it.
+"""
+
+import glob
+import os
+import weakref
+
+import numpy as np
+
+from .bindings import BIND, UNBIND, KINDS, KIND_CODES, protein, site_index
+
+
+LOG = np.dtype(
+    [
+        ("tick", "i8"),
+        ("event", "i1"),  # `bindings.BIND`, `UNBIND`, or `STATE`
+        ("state", "i1"),  # motor head state after a state event
+        ("mol", "i4"),
+        ("site", "i4"),  # head side or pair index
+        ("partner", "i4"),  # -1 for state events
+        ("partner_site", "i4"),
+    ]
+)
+MOLECULE = np.dtype(
+    [("id", "i4"), ("name", "S22"), ("kind", "i1"), ("tract", "i4"), ("tick", "i8")]
+)
+
+
+def _checkpoint_name(path, offset):
+    """Path of the checkpoint taken after offset events"""
+    return os.path.join(path, "checkpoint_%012i.npz" % offset)
+
+
+def _bond_array(bonds):
+    """Each bond once, as rows of (mol, site, partner, partner site)"""
+    rows = [a + b for a, b in bonds.items() if a < b]
+    return np.array(rows, dtype=np.int64).reshape(-1, 4)
+
+
+def _state_array(states):
+    """Motor head states, as rows of (mol, side, state)"""
+    rows = [key + (state,) for key, state in states.items()]
+    return np.array(rows, dtype=np.int64).reshape(-1, 3)
+
+
+def _apply(bonds, states, log):
+    """Bring bonds and motor states up to date with logged events, in order"""
+    for _, event, state, mol, site, partner, partner_site in log.tolist():
+        a, b = (mol, site), (partner, partner_site)
+        if event == BIND:
+            bonds[a], bonds[b] = b, a
+        elif event == UNBIND:
+            del bonds[a], bonds[b]
+        elif state == 0:
+            states.pop(a, None)
+        else:
+            states[a] = state
+
+
+class Topology:
+    """What is bound to what, by compact molecule id"""
+
+    def __init__(self, tick, bonds, states):
+        """A topology at a tick
+
+        Parameters
+        ----------
+        tick : int
+            Tick this is the topology at the end of
+        bonds : dict
+            Partner site of each bound site, as (mol, site) in both directions
+        states : dict
+            State of each motor head not in state 0, by (mol, side)
+        """
+        self.tick = tick
+        self.bonds = bonds
+        self.states = states
+
+    def __str__(self):
+        """String representation of a topology"""
+        return "Topology at tick %i with %i bonds" % (self.tick, len(self.bonds) // 2)
+
+    @classmethod
+    def from_arrays(cls, tick, bonds, states):
+        """A topology from rows of bonds and motor states, as checkpointed"""
+        linked = {}
+        for mol, site, partner, partner_site in bonds.tolist():
+            linked[(mol, site)] = (partner, partner_site)
+            linked[(partner, partner_site)] = (mol, site)
+        states = {(mol, side): state for mol, side, state in states.tolist()}
+        return cls(tick, linked, states)
+
+    @property
+    def bond_array(self):
+        """Each bond once, as rows of (mol, site, partner, partner site)"""
+        return _bond_array(self.bonds)
+
+    @property
+    def state_array(self):
+        """Motor head states, as rows of (mol, side, state)"""
+        return _state_array(self.states)
+
+
+class BindingLogWriter:
+    """Log a world's binding events to a binding log directory"""
+
+    def __init__(self, world, path, checkpoint=1000):
+        """Start logging, beginning with a checkpoint of what is bound now
+
+        Parameters
+        ----------
+        world : `flins.construct.World`
+            World to log, its events are recorded with `record_events`
+        path : str
+            Directory to log to, created if needed, mustn't hold a log already
+        checkpoint : int
+            Ticks between checkpoints
+        """
+        if os.path.exists(os.path.join(path, "log.bin")):
+            raise Exception("there's already a binding log at %s" % path)
+        os.makedirs(path, exist_ok=True)
+        self.world = world
+        self.path = path
+        self.checkpoint_every = checkpoint
+        self.offset = 0  # events logged
+        self.ids = weakref.WeakKeyDictionary()  # compact id of each molecule
+        self.n_molecules = 0
+        self._tract_index = {
+            tract: i for i, tract in enumerate(world.tractspace.all_tracts)
+        }
+        self._tick = world.clock.tick  # of the event being logged
+        self._new = []  # molecules seen since last written
+        self._log = open(os.path.join(path, "log.bin"), "ab")
+        self._molecules = open(os.path.join(path, "molecules.bin"), "ab")
+        self._bonds, self._states = self._scan()
+        self.checkpoint()
+        self.events = world.record_events()
+        self.events.subscribe(self)
+
+    def __str__(self):
+        """String representation of a binding log writer"""
+        return "BindingLogWriter of %i events to %s" % (self.offset, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _id(self, mol, tract):
+        """Compact id of a molecule, given one if first seen
+
+        Events are handed on after the fact, by when a molecule may have left
+        its tract and lost its name, so molecules are known by identity and
+        their tract is given.
+        """
+        try:
+            return self.ids[mol]
+        except KeyError:
+            i = self.ids[mol] = self.n_molecules
+            self.n_molecules += 1
+            name = mol.id or ""
+            self._new.append((i, name, KIND_CODES[mol.kind], tract, self._tick))
+            return i
+
+    def _key(self, site, tract):
+        """Compact id and site index of a binding site"""
+        return (self._id(protein(site), tract), site_index(site))
+
+    def _scan(self):
+        """Bonds and motor states of the world as it is now"""
+        bonds, states = {}, {}
+        self._tick = self.world.clock.tick
+        for i, tract in enumerate(self.world.tractspace.all_tracts):
+            sites = [anchor.bs for anchor in tract.mols.get("anchor", [])]
+            for kind in ("actinin", "motor"):
+                for mol in tract.mols.get(kind, []):
+                    sites += [head.bs for head in mol.heads]
+            for site in sites:
+                if site.bound:
+                    other = self._tract_index[protein(site.link).tract]
+                    a, b = self._key(site, i), self._key(site.link, other)
+                    bonds[a], bonds[b] = b, a
+                if getattr(site.parent, "state", 0) != 0:
+                    states[self._key(site, i)] = site.parent.state
+        return bonds, states
+
+    def __call__(self, records, sites, partners):
+        """Log a batch of events handed on by the world's event buffer"""
+        log = np.zeros(len(records), dtype=LOG)
+        log["tick"], log["event"] = records["tick"], records["event"]
+        log["state"] = records["state"]
+        keys, others = [], []
+        columns = [records[f].tolist() for f in ("tick", "tract", "partner_tract")]
+        for site, partner, tick, tract, partner_tract in zip(sites, partners, *columns):
+            self._tick = tick
+            keys.append(self._key(site, tract))
+            if partner is None:
+                others.append((-1, -1))
+            else:
+                others.append(self._key(partner, partner_tract))
+        log["mol"], log["site"] = np.array(keys).T
+        log["partner"], log["partner_site"] = np.array(others).T
+        self._write_molecules()
+        self._log.write(log.tobytes())
+        self.offset += len(log)
+        _apply(self._bonds, self._states, log)
+        if self.world.clock.tick >= self._next_checkpoint:
+            self.checkpoint()
+
+    def _write_molecules(self):
+        """Append molecules seen since last written"""
+        if len(self._new) > 0:
+            self._molecules.write(np.array(self._new, dtype=MOLECULE).tobytes())
+            self._new = []
+
+    def checkpoint(self):
+        """Write every bond and motor state, as of the events logged so far"""
+        self._write_molecules()
+        self._log.flush()
+        self._molecules.flush()
+        tick = self.world.clock.tick
+        np.savez_compressed(
+            _checkpoint_name(self.path, self.offset),
+            tick=tick,
+            offset=self.offset,
+            bonds=_bond_array(self._bonds),
+            states=_state_array(self._states),
+        )
+        self._next_checkpoint = tick + self.checkpoint_every
+
+    def close(self):
+        """Log what the world still holds, checkpoint, and stop logging"""
+        self.events.flush()
+        self.events.unsubscribe(self)
+        self.checkpoint()
+        self._log.close()
+        self._molecules.close()
+
+
+class BindingLog:
+    """Replay a binding log to find what was bound at any tick"""
+
+    def __init__(self, path):
+        """Read a binding log
+
+        Parameters
+        ----------
+        path : str
+            Directory a `BindingLogWriter` logged to
+        """
+        self.path = path
+        self.log = np.fromfile(os.path.join(path, "log.bin"), dtype=LOG)
+        self.molecules = np.fromfile(os.path.join(path, "molecules.bin"), MOLECULE)
+        self.checkpoints = []  # (tick, offset, filename), in order
+        for filename in sorted(glob.glob(os.path.join(path, "checkpoint_*.npz"))):
+            with np.load(filename) as data:
+                tick, offset = int(data["tick"]), int(data["offset"])
+            self.checkpoints.append((tick, offset, filename))
+
+    def __str__(self):
+        """String representation of a binding log"""
+        return "BindingLog of %i events at %s" % (len(self.log), self.path)
+
+    def __len__(self):
+        return len(self.log)
+
+    @property
+    def n_molecules(self):
+        """How many molecules have compact ids"""
+        return len(self.molecules)
+
+    def name(self, mol):
+        """Name of the molecule with a compact id, as `Protein.id`
+
+        Molecules that left their tract before their first event was logged
+        have no name.
+        """
+        return self.molecules["name"][mol].decode()
+
+    def kind(self, mol):
+        """Kind of the molecule with a compact id"""
+        return KINDS[self.molecules["kind"][mol]]
+
+    def topology(self, tick):
+        """What was bound to what at the end of a tick"""
+        usable = [c for c in self.checkpoints if c[0] <= tick]
+        if len(usable) == 0:
+            raise Exception("binding log starts after tick %i" % tick)
+        _, offset, filename = usable[-1]
+        with np.load(filename) as data:
+            topology = Topology.from_arrays(tick, data["bonds"], data["states"])
+        log = self.log[offset:]
+        end = np.searchsorted(log["tick"], tick, side="right")
+        _apply(topology.bonds, topology.states, log[:end])
+        return topology
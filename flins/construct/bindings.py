@@ -0,0 +1,169 @@
+# encoding: utf-8
+"""
+Who bound what, and when.
+
+Every change in what is bound to what passes through `BindingSite.bind` and
+`unbind`, and every change of motor state through the motor head's state. An
+`EventBuffer` listens to a world's space for these and keeps them as typed
+records in a preallocated numpy array, handing each batch to its subscribers
+(indexes, occupancy maps, observables, logs) so none of them need to scan the
+world for what changed.
+"""
+
+import numpy as np
+
+from ..proteins.actin import GActinPair
+from ..proteins.base import Head
+
+
+KINDS = ("actin", "anchor", "actinin", "motor")
+KIND_CODES = {kind: code for code, kind in enumerate(KINDS)}
+BIND, UNBIND, STATE = 0, 1, 2
+
+EVENT = np.dtype(
+    [
+        ("tick", "i8"),
+        ("time", "f8"),
+        ("event", "i1"),  # BIND, UNBIND, or STATE
+        ("kind", "i1"),  # code of the kind of protein the site is on
+        ("site", "i4"),  # which of its sites, head side or pair index
+        ("tract", "i4"),  # index of its tract
+        ("partner", "i1"),  # code of the partner's kind, -1 for state changes
+        ("partner_site", "i4"),
+        ("partner_tract", "i4"),
+        ("state", "i1"),  # motor head state after the event, -1 for others
+    ]
+)
+
+
+def protein(site):
+    """Protein a binding site is on"""
+    owner = site.parent
+    if isinstance(owner, Head):
+        return owner.parent
+    elif isinstance(owner, GActinPair):
+        return owner.filament
+    return owner
+
+
+def site_index(site):
+    """Which of its protein's sites a binding site is"""
+    owner = site.parent
+    if isinstance(owner, Head):
+        return owner.side
+    elif isinstance(owner, GActinPair):
+        return owner.index
+    return 0
+
+
+class EventBuffer:
+    """Binding changes in a world, kept as typed records for subscribers
+
+    Records are written to a fixed-size array, along with the binding sites
+    they concern, and handed to subscribers when it fills or is flushed, which
+    the world does at the end of each step.
+    """
+
+    def __init__(self, world, capacity=4096):
+        """Start listening to a world's space
+
+        Parameters
+        ----------
+        world : `flins.construct.World`
+            World whose binding changes to record
+        capacity : int
+            How many events to hold before handing them on
+        """
+        self.world = world
+        self.capacity = capacity
+        self.records = np.zeros(capacity, dtype=EVENT)
+        self.sites = [None] * capacity
+        self.partners = [None] * capacity
+        self.n = 0  # events held
+        self.total = 0  # events handed on so far
+        self.subscribers = []
+        self._tract_index = {
+            tract: i for i, tract in enumerate(world.tractspace.all_tracts)
+        }
+        world.tractspace.listen(self)
+
+    def __str__(self):
+        """String representation of an event buffer"""
+        return "EventBuffer holding %i of %i events, %i handed on" % (
+            self.n,
+            self.capacity,
+            self.total,
+        )
+
+    def subscribe(self, callback):
+        """Hand each batch of events to a callback
+
+        The callback is given the records, an array of `EVENT`, and lists of
+        the binding site and partner site of each, None for a state change's
+        partner. These are reused once it returns, so copy what is kept.
+        """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Stop handing events to a callback"""
+        self.subscribers.remove(callback)
+
+    def _add(self, event, site, partner, state=-1):
+        """Note an event, handing the full buffer on first if needed"""
+        if self.n == self.capacity:
+            self.flush()
+        i, clock, tracts = self.n, self.world.clock, self._tract_index
+        mol = protein(site)
+        if partner is None:
+            other = (-1, -1, -1)
+        else:
+            mol_b = protein(partner)
+            other = (KIND_CODES[mol_b.kind], site_index(partner), tracts[mol_b.tract])
+        self.records[i] = (
+            clock.tick,
+            clock.time,
+            event,
+            KIND_CODES[mol.kind],
+            site_index(site),
+            tracts[mol.tract],
+        ) + other + (state,)
+        self.sites[i], self.partners[i] = site, partner
+        self.n += 1
+
+    def bound(self, site, other):
+        """A site has bound another"""
+        self._add(BIND, site, other)
+
+    def unbound(self, site, other):
+        """A site has let go of another"""
+        self._add(UNBIND, site, other)
+
+    def state_changed(self, head, old):
+        """A motor head has changed state"""
+        self._add(STATE, head.bs, None, head.state)
+
+    def added(self, mol):
+        """A protein has joined, its binding yet to be recorded"""
+        pass
+
+    def removed(self, mol):
+        """A protein has left, its unbinding already recorded"""
+        pass
+
+    def flush(self):
+        """Hand the events held to each subscriber and clear them"""
+        n = self.n
+        if n == 0:
+            return
+        records, sites, partners = self.records[:n], self.sites[:n], self.partners[:n]
+        for callback in self.subscribers:
+            callback(records, sites, partners)
+        self.total += n
+        self.n = 0
+
+    def close(self):
+        """Hand on what is held and stop listening"""
+        self.flush()
+        self.world.tractspace.ignore(self)
+        if self.world.events is self:
+            self.world.events = None
@@ -0,0 +1,297 @@
+# encoding: utf-8
+"""
+Six degrees of α-actinin.
+
+Keep track of how the actin network hangs together: filaments are nodes, and
+fully bound α-actinins and motors are edges between the filaments their heads
+are bound to. Anchors tie filaments down at either end of the tracts. The
+network percolates when one connected cluster is anchored at both ends.
+
+Components are kept in a union-find as crosslinks form, which never needs
+undoing. Unbinding can split a component, which union-find can't follow, so
+components are marked stale and rebuilt with `scipy.sparse.csgraph` when next
+asked about. New filaments are added as lone nodes, while removed filaments
+mark components stale and their nodes are dropped when rebuilding. Between
+changes the size of the largest cluster, how many filaments are in anchored
+clusters, and whether the network percolates are kept up to date and answered
+without looking at the world.
+"""
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.csgraph
+
+from .bindings import protein
+
+
+LEFT, RIGHT = 0, 1
+
+
+class Connectivity:
+    """Connected components of a world's actin network, kept as it changes"""
+
+    def __init__(self, world):
+        """Find the components of the network now and listen for changes
+
+        Parameters
+        ----------
+        world : `flins.construct.World`
+            World whose network to follow
+        """
+        self.world = world
+        self.nodes = {}  # index of each filament
+        self.edges = {}  # crosslinks between each pair of filament indices
+        self.anchors = []  # anchors on each filament at [left, right] ends
+        self._anchor_ends = {}  # end each bound anchor ties down
+        self.rebuilds = 0
+        self._stale = True  # until first built, below
+        for tract in world.tractspace.all_tracts:
+            for actin in tract.mols.get("actin", []):
+                self._node(actin)
+            for anchor in tract.mols.get("anchor", []):
+                if anchor.bs.bound:
+                    self._anchor(anchor, anchor.bs.linked.filament, 1)
+            for kind in ("actinin", "motor"):
+                for mol in tract.mols.get(kind, []):
+                    if mol.fully_bound:
+                        self._link(*[head.bs.linked.filament for head in mol.heads])
+        self._rebuild()
+        world.tractspace.listen(self)
+
+    def __str__(self):
+        """String representation of connectivity"""
+        return "Connectivity of %i filaments in %i clusters%s" % (
+            len(self.nodes),
+            self.n_clusters,
+            ", percolating" if self.percolates else "",
+        )
+
+    def close(self):
+        """Stop listening to the world's space"""
+        self.world.tractspace.ignore(self)
+
+    # Union-find
+
+    def _find(self, i):
+        """Root of a node's component, halving the path to it"""
+        parent = self._parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def _union(self, i, j):
+        """Merge two nodes' components, updating what is known of clusters"""
+        i, j = self._find(i), self._find(j)
+        if i == j:
+            return
+        size, ends = self._size, self._ends
+        if size[i] < size[j]:
+            i, j = j, i
+        for root in (i, j):
+            if ends[root][LEFT] or ends[root][RIGHT]:
+                self._n_anchored -= size[root]
+        self._parent[j] = i
+        size[i] += size[j]
+        ends[i] = [a + b for a, b in zip(ends[i], ends[j])]
+        self._n_clusters -= 1
+        self._note(i)
+
+    def _note(self, root):
+        """Fold a grown or newly anchored component into the cluster stats"""
+        size, ends = self._size[root], self._ends[root]
+        if ends[LEFT] or ends[RIGHT]:
+            self._n_anchored += size
+        self._largest = max(self._largest, size)
+        self._percolates = self._percolates or (ends[LEFT] > 0 and ends[RIGHT] > 0)
+
+    def _drop_removed(self):
+        """Renumber nodes without those of removed filaments"""
+        kept = list(self.nodes.values())
+        new = {i: j for j, i in enumerate(kept)}
+        self.nodes = {actin: new[i] for actin, i in self.nodes.items()}
+        self.anchors = [self.anchors[i] for i in kept]
+        self.edges = {
+            (new[i], new[j]): n
+            for (i, j), n in self.edges.items()
+            if i in new and j in new
+        }
+
+    def _rebuild(self):
+        """Find components afresh from the edges, after unbinding"""
+        if len(self.nodes) < len(self.anchors):
+            self._drop_removed()
+        n = len(self.nodes)
+        pairs = np.array(list(self.edges), dtype=int).reshape(-1, 2)
+        graph = scipy.sparse.coo_matrix(
+            (np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])), shape=(n, n)
+        )
+        n_clusters, labels = scipy.sparse.csgraph.connected_components(
+            graph, directed=False
+        )
+        # Point every node at the first node of its component
+        roots = np.full(n_clusters, -1)
+        first = np.unique(labels, return_index=True)[1]
+        roots[labels[first]] = first
+        self._parent = roots[labels].tolist()
+        size = np.bincount(labels, minlength=n_clusters)
+        ends = np.zeros((n_clusters, 2), dtype=int)
+        if n > 0:
+            np.add.at(ends, labels, np.array(self.anchors).reshape(-1, 2))
+        self._size = [0] * n
+        self._ends = [[0, 0] for _ in range(n)]
+        for label, root in enumerate(roots.tolist()):
+            self._size[root] = int(size[label])
+            self._ends[root] = ends[label].tolist()
+        self._n_clusters = n_clusters
+        self._n_anchored = int(size[(ends > 0).any(axis=1)].sum())
+        self._largest = int(size.max()) if n > 0 else 0
+        self._percolates = bool((ends > 0).all(axis=1).any())
+        self._stale = False
+        self.rebuilds += 1
+
+    def _fresh(self):
+        """Make sure components are current, rebuilding if stale"""
+        if self._stale:
+            self._rebuild()
+
+    # Changes to the network
+
+    def _node(self, actin):
+        """Index of a filament's node, adding it if new"""
+        try:
+            return self.nodes[actin]
+        except KeyError:
+            i = self.nodes[actin] = len(self.anchors)
+            self.anchors.append([0, 0])
+            if not self._stale:
+                self._parent.append(i)
+                self._size.append(1)
+                self._ends.append([0, 0])
+                self._n_clusters += 1
+                self._largest = max(self._largest, 1)
+            return i
+
+    def _link(self, a, b):
+        """A crosslink has formed between two filaments"""
+        i, j = sorted((self._node(a), self._node(b)))
+        if i == j:
+            return
+        self.edges[(i, j)] = self.edges.get((i, j), 0) + 1
+        if not self._stale:
+            self._union(i, j)
+
+    def _unlink(self, a, b):
+        """A crosslink between two filaments has let go of one"""
+        i, j = sorted((self._node(a), self._node(b)))
+        if i == j:
+            return
+        self.edges[(i, j)] -= 1
+        if self.edges[(i, j)] == 0:
+            del self.edges[(i, j)]
+            self._stale = True
+
+    def _anchor(self, anchor, actin, change):
+        """An anchor has tied down, or let go of, a filament"""
+        i = self._node(actin)
+        if change > 0:
+            span = self.world.tractspace.span
+            end = RIGHT if span is not None and anchor.x >= span / 2 else LEFT
+            self._anchor_ends[anchor] = end
+        else:
+            end = self._anchor_ends.pop(anchor)
+        self.anchors[i][end] += change
+        if change < 0:
+            self._stale = True
+        elif not self._stale:
+            root = self._find(i)
+            if self._ends[root][LEFT] or self._ends[root][RIGHT]:
+                self._n_anchored -= self._size[root]
+            self._ends[root][end] += change
+            self._note(root)
+
+    def bound(self, site, other):
+        """A site has bound another, maybe linking filaments"""
+        mol = protein(site)
+        if mol.kind == "actin":
+            mol = protein(other)
+        if mol.kind == "anchor":
+            self._anchor(mol, mol.bs.linked.filament, 1)
+        elif mol.kind in ("actinin", "motor") and mol.fully_bound:
+            self._link(*[head.bs.linked.filament for head in mol.heads])
+
+    def unbound(self, site, other):
+        """A site has let go of another, maybe unlinking filaments"""
+        mol, pair = protein(site), other
+        if mol.kind == "actin":
+            mol, pair = protein(other), site
+        if mol.kind == "anchor":
+            self._anchor(mol, protein(pair), -1)
+        elif mol.kind in ("actinin", "motor"):
+            held = [head for head in mol.heads if head.bs.bound]
+            if len(held) == 1:  # was fully bound until now
+                self._unlink(protein(pair), held[0].bs.linked.filament)
+
+    def state_changed(self, head, old):
+        """Motor states don't change the network"""
+        pass
+
+    def added(self, mol):
+        """A protein has joined, adding a node if a filament"""
+        if mol.kind == "actin":
+            self._node(mol)
+
+    def removed(self, mol):
+        """A protein has left, unbound, dropping its node if a filament"""
+        if self.nodes.pop(mol, None) is not None:
+            self._stale = True
+
+    # Queries
+
+    @property
+    def percolates(self):
+        """Is some cluster anchored at both ends?"""
+        self._fresh()
+        return self._percolates
+
+    @property
+    def largest(self):
+        """Filaments in the largest cluster"""
+        self._fresh()
+        return self._largest
+
+    @property
+    def n_clusters(self):
+        """How many clusters, lone filaments included, are there?"""
+        self._fresh()
+        return self._n_clusters
+
+    @property
+    def n_anchored(self):
+        """Filaments in clusters tied to an anchor"""
+        self._fresh()
+        return self._n_anchored
+
+    def cluster(self, actin):
+        """Label of a filament's cluster, shared by all filaments in it"""
+        self._fresh()
+        return self._find(self.nodes[actin])
+
+    def anchored(self, actin):
+        """Anchors tying a filament's cluster down, as [left, right] counts"""
+        root = self.cluster(actin)  # first, as rebuilding replaces _ends
+        return list(self._ends[root])
+
+
+class ClusterStats:
+    """Percolation, largest cluster, clusters, and anchored filaments
+
+    A reducer for `World.observe`, reading a `Connectivity` kept alongside.
+    """
+
+    def __init__(self, connectivity):
+        self.connectivity = connectivity
+
+    def __call__(self, observers):
+        c = self.connectivity
+        return np.array([c.percolates, c.largest, c.n_clusters, c.n_anchored])
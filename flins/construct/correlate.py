@@ -0,0 +1,202 @@
+# encoding: utf-8
+"""
+Where have you been, and for how long?
+
+Stream mean-squared displacements and autocorrelations of molecules as a world
+steps, with the multi-tau scheme of Ramírez et al., J. Chem. Phys. 133, 154103
+(2010), rather than keeping whole trajectories to correlate afterwards.
+
+A `MultiTau` correlator keeps a short buffer of the last `p` samples at each
+of a number of levels. Level 0 sees every sample and correlates it with each
+of the samples in its buffer, giving lags 0 to p - 1. Every `m` samples of a
+level are averaged into one sample of the next, whose lags are `m` times as
+long. Lags so grow geometrically while work and memory per sample grow only
+with the number of levels, that is with the log of the longest lag.
+
+Lags from level 1 up correlate block averages, which slightly underestimates
+mean-squared displacements at the shortest lags of each level. Level 0 is
+exact.
+"""
+
+import numpy as np
+
+
+class MultiTau:
+    """A streaming multi-tau correlator of vectors of values
+
+    Each sample is a vector, one value per series (molecule), and the
+    correlation at each lag is averaged over series and over time.
+    """
+
+    def __init__(self, n, p=16, m=2, levels=16, msd=False):
+        """A correlator for n series
+
+        Parameters
+        ----------
+        n : int
+            Values in each sample
+        p : int
+            Samples buffered at each level
+        m : int
+            Samples averaged into each sample of the next level, must divide p
+        levels : int
+            Levels of lags, the longest lag being about p * m**(levels - 1)
+        msd : bool
+            Correlate as mean-squared displacements, mean((x(t + lag) -
+            x(t))**2), rather than as products, mean(x(t + lag) * x(t))
+        """
+        if p % m != 0:
+            raise Exception("m must divide p")
+        self.n, self.p, self.m, self.msd = n, p, m, msd
+        self.levels = levels
+        # Lags each level adds: all of level 0's, the longer ones above that
+        self._first = [0] + [p // m] * (levels - 1)
+        self.lags = np.concatenate(
+            [np.arange(first, p) * m**level for level, first in enumerate(self._first)]
+        )
+        self._buffers = []  # last p samples of each level, newest at row 0
+        self._filled = []  # samples in each level's buffer
+        self._sums = np.zeros((levels, p))
+        self._counts = np.zeros((levels, p), dtype=int)
+        self._blocks = []  # running sum of samples to average into the next level
+        self._in_block = []
+
+    def __str__(self):
+        """String representation of a correlator"""
+        kind = "MSD" if self.msd else "autocorrelation"
+        return "MultiTau %s of %i series to lag %i" % (kind, self.n, self.lags[-1])
+
+    def _level(self, level):
+        """Buffers of a level, made when first reached"""
+        while len(self._buffers) <= level:
+            self._buffers.append(np.zeros((self.p, self.n)))
+            self._filled.append(0)
+            self._blocks.append(np.zeros(self.n))
+            self._in_block.append(0)
+        return self._buffers[level]
+
+    def push(self, values):
+        """Add a sample, one value per series"""
+        values = np.asarray(values, dtype=float)
+        level = 0
+        while level < self.levels:
+            buffer = self._level(level)
+            buffer[1:] = buffer[:-1]
+            buffer[0] = values
+            filled = self._filled[level] = min(self._filled[level] + 1, self.p)
+            first = self._first[level]
+            if filled > first:
+                past = buffer[first:filled]
+                if self.msd:
+                    corr = ((past - values) ** 2).mean(axis=1)
+                else:
+                    corr = (past * values).mean(axis=1)
+                self._sums[level, first:filled] += corr
+                self._counts[level, first:filled] += 1
+            # Average m samples into one for the next level
+            self._blocks[level] += values
+            self._in_block[level] += 1
+            if self._in_block[level] < self.m:
+                break
+            values = self._blocks[level] / self.m
+            self._blocks[level] = np.zeros(self.n)
+            self._in_block[level] = 0
+            level += 1
+
+    @property
+    def result(self):
+        """Correlation at each of `lags`, in samples, nan where not yet seen"""
+        sums = np.concatenate(
+            [self._sums[level, first:] for level, first in enumerate(self._first)]
+        )
+        counts = np.concatenate(
+            [self._counts[level, first:] for level, first in enumerate(self._first)]
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+
+class _Tracked:
+    """Follow fixed molecules as they move, in unwrapped coordinates
+
+    In periodic spaces a molecule's position is kept as the sum of the
+    shortest separations between its successive positions. Molecules that
+    have left the world are held at their last position.
+    """
+
+    def __init__(self, mols):
+        self.mols = list(mols)
+        spaces = [mol.tract.space for mol in self.mols if mol.tract is not None]
+        self.periodic = len(spaces) > 0 and spaces[0].periodic
+        self.space = spaces[0] if len(spaces) > 0 else None
+        self._last = np.array([mol.x for mol in self.mols], dtype=float)
+        self._unwrapped = self._last.copy()
+
+    def positions(self):
+        """Unwrapped position of each molecule"""
+        x = self._last.copy()
+        for i, mol in enumerate(self.mols):
+            if mol.tract is not None:
+                x[i] = mol.x
+        if self.periodic:
+            self._unwrapped = self._unwrapped + self.space.separation(self._last, x)
+        else:
+            self._unwrapped = x
+        self._last = x
+        return self._unwrapped
+
+
+class MSD:
+    """Mean-squared displacement of molecules, a reducer for `World.observe`
+
+    Samples, one every stride ticks, give the mean-squared displacement at
+    each of `lags` samples, to compare with 2 D t for free diffusion.
+    """
+
+    def __init__(self, mols, **kwargs):
+        """Follow molecules, see `MultiTau` for the keyword arguments"""
+        self._tracked = _Tracked(mols)
+        self.correlator = MultiTau(len(self._tracked.mols), msd=True, **kwargs)
+        self.lags = self.correlator.lags
+        self.shape = self.lags.shape
+
+    def __call__(self, observers):
+        self.correlator.push(self._tracked.positions())
+        return self.correlator.result
+
+
+class VelocityACF:
+    """Velocity autocorrelation of molecules, a reducer for `World.observe`
+
+    Velocities, in nm per sample, are the displacement since the last sample.
+    """
+
+    def __init__(self, mols, **kwargs):
+        """Follow molecules, see `MultiTau` for the keyword arguments"""
+        self._tracked = _Tracked(mols)
+        self._x = self._tracked.positions()
+        self.correlator = MultiTau(len(self._tracked.mols), **kwargs)
+        self.lags = self.correlator.lags
+        self.shape = self.lags.shape
+
+    def __call__(self, observers):
+        x = self._tracked.positions()
+        self.correlator.push(x - self._x)
+        self._x = x
+        return self.correlator.result
+
+
+class ForceACF:
+    """Force autocorrelation of actin filaments, a reducer for `World.observe`"""
+
+    def __init__(self, actins, **kwargs):
+        """Follow filaments, see `MultiTau` for the keyword arguments"""
+        self.actins = list(actins)
+        self.correlator = MultiTau(len(self.actins), **kwargs)
+        self.lags = self.correlator.lags
+        self.shape = self.lags.shape
+
+    def __call__(self, observers):
+        forces = [0 if a.tract is None else a.force for a in self.actins]
+        self.correlator.push(forces)
+        return self.correlator.result
@@ -0,0 +1,164 @@
+# encoding: utf-8
+"""
+Stripes, eventually.
+
+Accumulate how actin, α-actinin, and motors are distributed along x in each
+tract, as histograms of fixed resolution updated with `np.bincount`, and look
+for periodicity in them with power spectra. Regular bands of α-actinin are
+the Z-lines of forming sarcomeres, their spacing the period of its profile.
+
+Positions are read from the world's `SharedState` arrays when it publishes
+one, and otherwise gathered from the tracts, one list per kind and tract.
+"""
+
+import math
+
+import numpy as np
+
+
+KINDS = ("actin", "actinin", "motor")
+
+
+def _positions(world, kind):
+    """Tract index, x, and for actin length, of each molecule of a kind"""
+    shared = world.shared
+    if shared is not None:
+        n = shared.arrays["count"][KINDS.index(kind)]
+        tract = shared.arrays[kind + "_tract"][:n]
+        x = shared.arrays[kind + "_x"][:n]
+        length = shared.arrays["actin_length"][:n] if kind == "actin" else None
+        return tract, x, length
+    tracts, xs, lengths = [], [], []
+    for i, t in enumerate(world.tractspace.all_tracts):
+        mols = t.mols.get(kind, ())
+        tracts.append(np.full(len(mols), i))
+        xs.append([mol.x for mol in mols])
+        if kind == "actin":
+            lengths.append([mol.length for mol in mols])
+    tract, x = np.concatenate(tracts).astype(int), np.concatenate(xs)
+    length = np.concatenate(lengths) if kind == "actin" else None
+    return tract, x, length
+
+
+def periodicity(profiles, bin_width):
+    """Dominant period of profiles along x, from their power spectra
+
+    Parameters
+    ----------
+    profiles : np.ndarray
+        Density of each tract along x, shape (n_tracts, n_bins)
+    bin_width : float
+        Width of each bin, in nm
+
+    Returns
+    -------
+    period : float
+        Wavelength with the most power in the tracts' mean power spectrum, in
+        nm, nan if the profiles are flat
+    strength : float
+        Fraction of the power, the mean excluded, at that wavelength
+    """
+    profiles = np.atleast_2d(profiles)
+    n_bins = profiles.shape[1]
+    centered = profiles - profiles.mean(axis=1, keepdims=True)
+    power = (np.abs(np.fft.rfft(centered, axis=1)) ** 2).mean(axis=0)[1:]
+    total = power.sum()
+    if total == 0:
+        return np.nan, 0.0
+    peak = np.argmax(power)
+    return n_bins * bin_width / (peak + 1), power[peak] / total
+
+
+class DensityProfile:
+    """Profiles of each kind along x in each tract, a reducer for `World.observe`
+
+    Each sample adds the counts of each kind in each bin to the profiles,
+    actin counting every bin a filament covers. With a decay below 1 the
+    profiles are exponentially weighted, forgetting old organization.
+    Samples give the period and strength, see `periodicity`, of each kind's
+    profile, refreshed every `every` samples.
+    """
+
+    def __init__(self, world, bin_width=10, decay=1.0, every=10):
+        """Start empty profiles for a world
+
+        Parameters
+        ----------
+        world : `flins.construct.World`
+            World to profile, its space needs a span
+        bin_width : float
+            Resolution of the profiles, in nm
+        decay : float
+            Weight of the profiles so far at each new sample
+        every : int
+            Samples between power spectra
+        """
+        space = world.tractspace
+        if space.span is None:
+            raise Exception("density profiles need a space with a span")
+        self.world = world
+        self.n_bins = int(math.ceil(space.span / bin_width))
+        self.bin_width = space.span / self.n_bins
+        self.n_tracts = len(space.all_tracts)
+        self.decay = decay
+        self.every = every
+        self.profiles = np.zeros((len(KINDS), self.n_tracts, self.n_bins))
+        self.n_samples = 0
+        self.shape = (len(KINDS), 2)
+        self._spectra = np.full(self.shape, np.nan)
+
+    def __str__(self):
+        """String representation of density profiles"""
+        return "DensityProfile of %i samples in %i bins of %0.1f nm" % (
+            self.n_samples,
+            self.n_bins,
+            self.bin_width,
+        )
+
+    def _bin(self, x):
+        """Bin of each x, wrapped into the span"""
+        bins = np.floor(self.world.tractspace.wrap(x) / self.bin_width).astype(int)
+        return np.clip(bins, 0, self.n_bins - 1)
+
+    def counts(self):
+        """How many of each kind are in each bin of each tract now"""
+        size = self.n_tracts * self.n_bins
+        counts = np.zeros((len(KINDS), size))
+        for k, kind in enumerate(KINDS):
+            tract, x, length = _positions(self.world, kind)
+            if len(x) == 0:
+                continue
+            lo = self._bin(x)
+            if kind != "actin":
+                counts[k] = np.bincount(tract * self.n_bins + lo, minlength=size)
+                continue
+            # Filaments cover every bin from their start to their end, so add
+            # one at starts and take one away past ends, and where they wrap
+            # around a periodic span add one at the first bin too
+            hi, width = self._bin(np.asarray(x) + length), self.n_bins + 1
+            n = self.n_tracts * width
+            change = np.bincount(tract * width + lo, minlength=n)
+            change -= np.bincount(tract * width + hi + 1, minlength=n)
+            np.add.at(change, tract[hi < lo] * width, 1)
+            change = change.reshape(self.n_tracts, width)
+            counts[k] = np.cumsum(change, axis=1)[:, :-1].ravel()
+        return counts.reshape(len(KINDS), self.n_tracts, self.n_bins)
+
+    def __call__(self, observers=None):
+        self.profiles *= self.decay
+        self.profiles += self.counts()
+        self.n_samples += 1
+        if (self.n_samples - 1) % self.every == 0:
+            self._spectra = np.array(
+                [periodicity(profile, self.bin_width) for profile in self.profiles]
+            )
+        return self._spectra
+
+    def period(self, kind):
+        """Dominant period of a kind's profiles, in nm, see `periodicity`"""
+        return periodicity(self.profiles[KINDS.index(kind)], self.bin_width)[0]
+
+    @property
+    def z_spacing(self):
+        """Spacing of α-actinin bands, the would-be Z-lines, in nm"""
+        return self.period("actinin")
@@ -0,0 +1,131 @@
+# encoding: utf-8
+"""
+Wait for it.
+
+Event-driven kinetics: rather than every head rolling the dice every tick, each
+head is given the time of its next transition and nothing is done for it until
+that time comes or its rates change.
+"""
+
+import heapq
+import itertools
+import numpy as np
+
+
+def _total(head, transitions):
+    """Summed rate of a head's transitions, checking none are nan"""
+    total = sum([rate for rate, _, _ in transitions])
+    if np.isnan(total):
+        raise Exception("%s has a nan transition rate: %s" % (head, transitions))
+    return total
+
+
+class EventScheduler:
+    """Schedule head transitions with a next-reaction priority queue
+
+    Each head's transitions (see `Head._transitions`) are Poisson processes
+    whose rates depend on its state and strain. We draw the time of its next
+    transition from an exponential distribution with the summed rate and queue
+    it. Mechanics and diffusion still advance each tick, after which only
+    heads whose molecule has changed (its `_version` has moved on from when
+    we last scheduled it) have their rates recomputed and are redrawn. As
+    transitions are memoryless, redrawing when rates change is exact for rates
+    held constant between ticks.
+
+    Molecules that aren't fully bound are redrawn every tick, since their free
+    heads are thermally jostled to new locations and new nearest sites each
+    tick. Fully bound molecules, the bulk of any long run, are left alone
+    until the actin they are bound to moves.
+
+    Heads strained so far that a rate is infinite transition at once, by one
+    of their infinite rates. A nan rate is an error.
+    """
+
+    def __init__(self):
+        """Start at time zero with nothing scheduled"""
+        self.time = 0.0
+        self._queue = []
+        self._entries = {}  # head -> its live queue entry
+        self._versions = {}  # molecule -> version when last scheduled
+        self._count = itertools.count()  # tie breaker for equal times
+
+    def __str__(self):
+        """String representation of the scheduler"""
+        return "EventScheduler at %.4fs with %i queued" % (self.time, len(self._queue))
+
+    def _schedule(self, head, now):
+        """Draw the next transition time for a head, replacing any queued"""
+        old = self._entries.get(head)
+        if old is not None:
+            old[-1] = False  # lazily deleted when popped
+        total = _total(head, head._transitions())
+        if total <= 0:
+            self._entries[head] = None
+            return
+        wait = 0.0 if total == np.inf else np.random.exponential(1 / total)
+        entry = [now + wait, next(self._count), head, True]
+        self._entries[head] = entry
+        heapq.heappush(self._queue, entry)
+
+    def _refresh(self, mols):
+        """Reschedule heads on molecules that have changed since last time"""
+        versions = {}
+        for mol in mols:
+            heads = getattr(mol, "heads", ())
+            if len(heads) == 0:
+                continue
+            changed = self._versions.get(mol) != mol._version
+            if changed or not mol.fully_bound:
+                for head in heads:
+                    self._schedule(head, self.time)
+            versions[mol] = mol._version
+        # Forget molecules that have left the world
+        for mol in self._versions.keys() - versions.keys():
+            for head in mol.heads:
+                self._entries.pop(head, None)
+        self._versions = versions
+
+    def _fire(self, head, now):
+        """Carry out one transition chosen in proportion to its rate
+
+        If any rates are infinite, one of those is chosen at random.
+        """
+        transitions = head._transitions()
+        total = _total(head, transitions)
+        if total == np.inf:
+            transitions = [t for t in transitions if t[0] == np.inf]
+            _, state, site = transitions[np.random.randint(len(transitions))]
+            head._transit(state, site)
+        elif total > 0:
+            pick = np.random.rand() * total
+            for rate, state, site in transitions:
+                pick -= rate
+                if pick < 0:
+                    break
+            head._transit(state, site)
+        # The molecule's strain has changed, so both heads are redrawn
+        mol = head.parent
+        for each in mol.heads:
+            self._schedule(each, now)
+        self._versions[mol] = mol._version
+
+    def step(self, mols, timestep):
+        """Carry out every transition due within the next timestep
+
+        Parameters
+        ----------
+        mols : `list`
+            All molecules in the world, those with heads are scheduled
+        timestep : `float`
+            Length of the step to take, in s
+        """
+        self._refresh(mols)
+        end = self.time + timestep
+        queue = self._queue
+        while len(queue) > 0 and queue[0][0] < end:
+            now, _, head, live = heapq.heappop(queue)
+            if not live or head.tract is None:
+                continue
+            self._entries[head] = None
+            self._fire(head, now)
+        self.time = end
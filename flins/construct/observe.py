@@ -0,0 +1,261 @@
+# encoding: utf-8
+"""
+Keep an eye on things.
+
+Summarize a world as it steps without visiting every molecule each tick. The
+`Observers` of a world listen to its space for binding, unbinding, and motor
+state changes, keeping running counts of what is bound and in which state.
+Reducers turn these into summaries (bound fractions, spring energy, actin
+force, motor state occupancy, crosslinker lengths) which are sampled every so
+many ticks into fixed-size arrays.
+
+Counts are kept up to date by events alone. Energies, forces, and lengths
+change whenever anything moves, so those reducers are evaluated only when
+sampled, and then only over the molecules known to be bound.
+"""
+
+import numpy as np
+
+from .bindings import KINDS, protein
+
+
+def _n_bound(mol):
+    """How many binding sites of a protein are bound"""
+    if mol.kind == "actin":
+        return len(mol._bound_pairs)
+    elif mol.kind == "anchor":
+        return int(mol.bs.bound)
+    return sum([head.bs.bound for head in mol.heads])
+
+
+class Series:
+    """Samples of a reducer, kept in fixed-size arrays
+
+    Once capacity samples are taken the oldest are overwritten, so the arrays
+    never grow.
+    """
+
+    def __init__(self, reducer, stride, capacity, shape):
+        self.reducer = reducer
+        self.stride = stride
+        self.capacity = capacity
+        self.n = 0  # samples taken, including those overwritten
+        self._ticks = np.zeros(capacity, dtype=int)
+        self._values = np.zeros((capacity,) + shape)
+
+    def __str__(self):
+        """String representation of a series"""
+        return "Series of %s, %i samples every %i ticks" % (
+            type(self.reducer).__name__,
+            len(self),
+            self.stride,
+        )
+
+    def __len__(self):
+        return min(self.n, self.capacity)
+
+    def record(self, tick, value):
+        """Add a sample, overwriting the oldest if full"""
+        i = self.n % self.capacity
+        self._ticks[i], self._values[i] = tick, value
+        self.n += 1
+
+    @property
+    def _order(self):
+        """Where each sample held is, oldest first"""
+        return np.arange(self.n - len(self), self.n) % self.capacity
+
+    @property
+    def ticks(self):
+        """Tick of each sample held, oldest first"""
+        return self._ticks[self._order]
+
+    @property
+    def values(self):
+        """Each sample held, oldest first"""
+        return self._values[self._order]
+
+
+class Observers:
+    """What a world is watched by, fed by binding events from its space"""
+
+    def __init__(self, world):
+        """Count what is bound now and start listening for changes
+
+        Parameters
+        ----------
+        world : `flins.construct.World`
+            World to observe, which samples us at the end of each step
+        """
+        self.world = world
+        self.series = {}
+        self.tracts = world.tractspace.all_tracts
+        self._tract_index = {tract: i for i, tract in enumerate(self.tracts)}
+        self._bound = {kind: {} for kind in KINDS}  # bound sites of bound mols
+        self._motor_states = np.zeros(3, dtype=int)  # motors in each bound state
+        for tract in self.tracts:
+            for kind in KINDS:
+                for mol in tract.mols.get(kind, []):
+                    self._count(mol, _n_bound(mol))
+            for motor in tract.mols.get("motor", []):
+                self._motor_states[motor.state] += 1
+        world.tractspace.listen(self)
+
+    def __str__(self):
+        """String representation of observers"""
+        return "Observers sampling %s" % (", ".join(self.series) or "nothing")
+
+    def __getitem__(self, name):
+        return self.series[name]
+
+    def add(self, name, reducer, stride=1, capacity=1000):
+        """Sample a reducer every stride ticks, keeping capacity samples
+
+        Reducers that change as they are called, such as the correlators of
+        `flins.construct.correlate`, give the shape of their samples as
+        `shape`, others are called once to find it.
+        """
+        shape = getattr(reducer, "shape", None)
+        if shape is None:
+            shape = np.shape(reducer(self))
+        self.series[name] = Series(reducer, stride, capacity, shape)
+        return self.series[name]
+
+    def sample(self):
+        """Record each reducer whose stride divides the current tick"""
+        tick = self.world.clock.tick
+        for series in self.series.values():
+            if tick % series.stride == 0:
+                series.record(tick, series.reducer(self))
+
+    def close(self):
+        """Stop listening to the world's space, and being sampled by it"""
+        self.world.tractspace.ignore(self)
+        if self.world.observers is self:
+            self.world.observers = None
+
+    def _count(self, mol, change):
+        """Note a change in how many sites of a protein are bound"""
+        if change == 0:
+            return
+        counts = self._bound[mol.kind]
+        n = counts.get(mol, 0) + change
+        if n > 0:
+            counts[mol] = n
+        else:
+            del counts[mol]
+
+    def bound(self, site, other):
+        """A site has bound another"""
+        self._count(protein(site), 1)
+        self._count(protein(other), 1)
+
+    def unbound(self, site, other):
+        """A site has let go of another"""
+        self._count(protein(site), -1)
+        self._count(protein(other), -1)
+
+    def state_changed(self, head, old):
+        """A motor head has changed state, maybe changing its motor's"""
+        other = head.other_head.state
+        before, after = max(old, other), max(head.state, other)
+        if before != after:
+            self._motor_states[before] -= 1
+            self._motor_states[after] += 1
+
+    def added(self, mol):
+        """A protein has joined, not yet bound and so uncounted"""
+        pass
+
+    def removed(self, mol):
+        """A protein has left, already unbound and so uncounted"""
+        pass
+
+    def totals(self):
+        """How many proteins of each kind are there?"""
+        return {
+            kind: sum([len(tract.mols.get(kind, ())) for tract in self.tracts])
+            for kind in KINDS
+        }
+
+    def bound_mols(self, kind):
+        """Proteins of a kind with any site bound"""
+        return self._bound[kind].keys()
+
+    def fully_bound(self, kind):
+        """Crosslinkers of a kind with both heads bound"""
+        return [mol for mol, n in self._bound[kind].items() if n == 2]
+
+
+class BoundFraction:
+    """Fraction of each kind of protein with anything bound, as in `KINDS`"""
+
+    def __call__(self, observers):
+        totals = observers.totals()
+        return np.array(
+            [
+                len(observers.bound_mols(kind)) / totals[kind] if totals[kind] else 0
+                for kind in KINDS
+            ]
+        )
+
+
+class SpringEnergy:
+    """Energy stored in the springs of anchors and bound crosslinkers, in pN nm"""
+
+    def __call__(self, observers):
+        energy = sum([mol.energy for mol in observers.fully_bound("actinin")])
+        energy += sum([mol.heads[0].energy() for mol in observers.fully_bound("motor")])
+        energy += sum(
+            [
+                anchor.energy(anchor.bs.linked.x)
+                for anchor in observers.bound_mols("anchor")
+            ]
+        )
+        return energy
+
+
+class ActinForce:
+    """Mean force on the actin of each tract, unbound actin feeling none"""
+
+    def __call__(self, observers):
+        index = observers._tract_index
+        force = np.zeros(len(observers.tracts))
+        for actin in observers.bound_mols("actin"):
+            force[index[actin.tract]] += actin.force
+        counts = [len(tract.mols.get("actin", ())) for tract in observers.tracts]
+        return force / np.maximum(counts, 1)
+
+
+class MotorStates:
+    """Fraction of motors in each state, 0 unbound, 1 weakly, 2 strongly bound"""
+
+    def __call__(self, observers):
+        states = observers._motor_states.copy()
+        total = observers.totals()["motor"]
+        states[0] = total - states[1:].sum()
+        return states / max(total, 1)
+
+
+class LengthHistogram:
+    """How many fully bound crosslinkers of a kind have each length"""
+
+    def __init__(self, kind, bins):
+        """Histogram crosslinker lengths
+
+        Parameters
+        ----------
+        kind : "actinin" or "motor"
+            Which crosslinkers to measure
+        bins : array-like
+            Edges of the length bins, in nm
+        """
+        self.kind = kind
+        self.bins = np.asarray(bins, dtype=float)
+
+    def __call__(self, observers):
+        lengths = [
+            abs(mol._separation(mol.heads[0].x, mol.heads[1].x))
+            for mol in observers.fully_bound(self.kind)
+        ]
+        return np.histogram(lengths, self.bins)[0]
@@ -0,0 +1,262 @@
+# encoding: utf-8
+"""
+Look, don't touch.
+
+Publish the array-like parts of a world's state into shared memory each tick
+so that other processes (analysis, rendering, recording) can read it live
+without pickling the world's object graph.
+"""
+
+import math
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+
+KINDS = ("actin", "actinin", "motor")
+
+
+def _layout(capacity):
+    """Name, dtype, and shape of each array, given capacity of each kind"""
+    n_actin, n_actinin, n_motor = [capacity[kind] for kind in KINDS]
+    return [
+        ("seq", "u8", (1,)),
+        ("tick", "i8", (1,)),
+        ("time", "f8", (1,)),
+        ("count", "i8", (len(KINDS),)),
+        ("actin_x", "f8", (n_actin,)),
+        ("actin_length", "f8", (n_actin,)),
+        ("actin_bound", "i4", (n_actin,)),
+        ("actin_tract", "i4", (n_actin,)),
+        ("actinin_x", "f8", (n_actinin,)),
+        ("actinin_bound", "i1", (n_actinin, 2)),
+        ("actinin_tract", "i4", (n_actinin,)),
+        ("motor_x", "f8", (n_motor,)),
+        ("motor_bound", "i1", (n_motor, 2)),
+        ("motor_state", "i1", (n_motor, 2)),
+        ("motor_tract", "i4", (n_motor,)),
+    ]
+
+
+def _offsets(layout):
+    """Where each array starts, on an 8 byte boundary, and the total size"""
+    offsets, offset = [], 0
+    for _, dtype, shape in layout:
+        offsets.append(offset)
+        offset += 8 * math.ceil(int(np.prod(shape)) * np.dtype(dtype).itemsize / 8)
+    return offsets, offset
+
+
+def _views(buffer, layout):
+    """Arrays of the layout backed by the buffer"""
+    offsets, _ = _offsets(layout)
+    return {
+        name: np.ndarray(shape, dtype, buffer, offset)
+        for (name, dtype, shape), offset in zip(layout, offsets)
+    }
+
+
+def _fill(array, values):
+    """Write values to the start of an array"""
+    n = len(values)
+    array[:n] = np.reshape(values, (n,) + array.shape[1:])
+
+
+def _attach(name):
+    """Attach to a block without taking ownership of it
+
+    Blocks tracked by a process are unlinked when it exits, which readers
+    mustn't do. Before Python 3.13 there is no opting out, so we briefly stop
+    tracking from being registered.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedState:
+    """A world's state, published to a shared memory block each tick
+
+    Positions of actin, α-actinin and motors, which of their heads are bound,
+    motor head states, and how many pairs each actin has bound are written to
+    arrays in one `multiprocessing.shared_memory` block, molecules being
+    ordered tract by tract. Readers in other processes attach to it by `spec`
+    with a `SharedReader`.
+
+    Writes are guarded by a sequence lock: the sequence number is made odd
+    before writing and even after, so a reader that sees the same even number
+    before and after reading knows it read one whole tick. Room is left for
+    molecules added by turnover, beyond which publishing fails.
+    """
+
+    def __init__(self, world, spare=0.5):
+        """Allocate the shared block for a world, which publishes every step
+
+        Parameters
+        ----------
+        world : `flins.construct.World`
+            World to publish, it becomes `world.shared` until closed, see
+            `World.share`
+        spare : float
+            Extra room, as a fraction of the current number of each kind
+        """
+        if world.shared is not None:
+            raise Exception("world already shares its state, see World.share")
+        self.world = world
+        counts = self._counts()
+        capacity = {k: int(math.ceil(counts[k] * (1 + spare))) for k in KINDS}
+        self.layout = _layout(capacity)
+        size = _offsets(self.layout)[1]
+        self._block = shared_memory.SharedMemory(create=True, size=size)
+        self.arrays = _views(self._block.buf, self.layout)
+        self.arrays["seq"][0] = 0
+        self.publish()
+        world.shared = self
+
+    def __str__(self):
+        """String representation of shared state"""
+        return "SharedState %s at tick %i" % (self.name, self.arrays["tick"][0])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def name(self):
+        """Name of the shared memory block"""
+        return self._block.name
+
+    @property
+    def spec(self):
+        """What a reader needs to attach, small and picklable"""
+        return (self.name, self.layout)
+
+    def _mols(self):
+        """Molecules of each kind, with the index of their tract"""
+        mols = {kind: [] for kind in KINDS}
+        for i, tract in enumerate(self.world.tractspace.all_tracts):
+            for kind in KINDS:
+                mols[kind].extend([(i, mol) for mol in tract.mols.get(kind, [])])
+        return mols
+
+    def _counts(self):
+        """How many of each kind are there?"""
+        return {kind: len(mols) for kind, mols in self._mols().items()}
+
+    def publish(self):
+        """Write the world's current state"""
+        arrays, mols = self.arrays, self._mols()
+        for kind in KINDS:
+            if len(mols[kind]) > len(arrays[kind + "_x"]):
+                raise Exception("more %ss than room was left for" % kind)
+        seq = arrays["seq"]
+        seq[0] += 1  # odd, writing
+        arrays["tick"][0] = self.world.clock.tick
+        arrays["time"][0] = self.world.clock.time
+        arrays["count"][:] = [len(mols[kind]) for kind in KINDS]
+        for kind in KINDS:
+            _fill(arrays[kind + "_tract"], [i for i, _ in mols[kind]])
+        actins, actinins, motors = [[m for _, m in mols[kind]] for kind in KINDS]
+        _fill(arrays["actin_x"], [actin.x for actin in actins])
+        _fill(arrays["actin_length"], [actin.length for actin in actins])
+        _fill(arrays["actin_bound"], [len(actin._bound_pairs) for actin in actins])
+        _fill(arrays["actinin_x"], [actinin.x for actinin in actinins])
+        _fill(
+            arrays["actinin_bound"],
+            [[head.bs.bound for head in actinin.heads] for actinin in actinins],
+        )
+        _fill(arrays["motor_x"], [motor.x for motor in motors])
+        _fill(
+            arrays["motor_bound"],
+            [[head.bs.bound for head in motor.heads] for motor in motors],
+        )
+        _fill(
+            arrays["motor_state"],
+            [[head.state for head in motor.heads] for motor in motors],
+        )
+        seq[0] += 1  # even, done
+
+    def close(self):
+        """Stop sharing, freeing the block once readers have closed it"""
+        if self.world.shared is self:
+            self.world.shared = None
+        self.arrays = None
+        self._block.close()
+        self._block.unlink()
+
+
+class SharedReader:
+    """Read a world's state published by a `SharedState`, from any process"""
+
+    def __init__(self, spec):
+        """Attach to the shared block
+
+        Parameters
+        ----------
+        spec : tuple
+            The `SharedState.spec` of the state to read
+        """
+        name, self.layout = spec
+        self._block = _attach(name)
+        self.arrays = _views(self._block.buf, self.layout)
+
+    def __str__(self):
+        """String representation of a shared state reader"""
+        return "SharedReader of %s" % self._block.name
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def seq(self):
+        """Sequence number of the last write, odd while one is under way"""
+        return int(self.arrays["seq"][0])
+
+    def view(self):
+        """Zero-copy views of the current state, and its sequence number
+
+        The views change as the writer publishes, check `changed_since` with
+        the returned sequence number after use to know they were consistent.
+        """
+        seq = self.seq
+        count = dict(zip(KINDS, self.arrays["count"]))
+        views = {"tick": int(self.arrays["tick"][0]), "time": self.arrays["time"][0]}
+        for name, array in self.arrays.items():
+            kind = name.split("_")[0]
+            if kind in count:
+                views[name] = array[: count[kind]]
+        return views, seq
+
+    def changed_since(self, seq):
+        """Has anything been written since sequence number seq was read?"""
+        return seq % 2 == 1 or self.seq != seq
+
+    def read(self, tries=1000):
+        """A consistent copy of the current state
+
+        Retries while the writer is mid-publish, as a sequence lock reader.
+        """
+        for _ in range(tries):
+            views, seq = self.view()
+            if seq % 2 == 1:
+                continue
+            state = {k: v.copy() if hasattr(v, "copy") else v for k, v in views.items()}
+            if not self.changed_since(seq):
+                return state
+        raise Exception("couldn't get a consistent read of shared state")
+
+    def close(self):
+        """Detach from the shared block"""
+        self.arrays = None
+        self._block.close()
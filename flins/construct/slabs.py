@@ -0,0 +1,343 @@
+# encoding: utf-8
+"""
+Divide and conquer.
+
+Split very long tracts along x into slabs, each stepped by its own worker
+process, for worlds too long and too few-tracted to gain from splitting by
+tract.
+"""
+
+import multiprocessing
+
+import numpy as np
+
+from ..support import binding_site
+
+
+def _pair_key(pair):
+    """Name a g-actin pair in a way that survives crossing processes"""
+    return (pair.filament.id, pair.index)
+
+
+def _state(mol):
+    """Everything about a molecule that stepping can change
+
+    This is its location and, for each head, the pair it is bound to and its
+    state (None for heads without states).
+    """
+    x = mol._x if mol.kind == "motor" else mol.x
+    heads = tuple(
+        (
+            _pair_key(head.bs.linked) if head.bs.bound else None,
+            getattr(head, "state", None),
+        )
+        for head in getattr(mol, "heads", ())
+    )
+    return (x, heads)
+
+
+def _extent(mol):
+    """Leftmost and rightmost x a molecule reaches"""
+    if mol.kind == "actin":
+        return mol.boundaries
+    elif mol.kind == "motor":
+        return tuple(sorted(mol.locs))
+    elif mol.kind == "actinin":
+        return (mol.x, mol.x + mol.spring.rest)
+    return (mol.x, mol.x)
+
+
+def _stepped(world):
+    """Molecules we track between processes, by id. Anchors never move."""
+    return {
+        mol.id: mol
+        for tract in world.tractspace.all_tracts
+        for kind, mols in tract.mols.items()
+        if kind != "anchor"
+        for mol in mols
+    }
+
+
+def _index(world):
+    """Molecules by id and g-actin pairs by key"""
+    index = _stepped(world)
+    for mol in list(index.values()):
+        if mol.kind == "actin":
+            for pair in mol.pairs:
+                index[_pair_key(pair)] = pair
+    return index
+
+
+def _apply(index, states):
+    """Bring molecules to the given states
+
+    Locations are set first, then changed heads let go, then bind, so a site
+    can pass from one head to another within a single update. A site still
+    held by a head not updated is taken from it, the head being detached, see
+    `Slabs._released`.
+    """
+    for key, (x, _) in states.items():
+        if index[key].x != x:
+            index[key].x = x
+    for key, (_, heads) in states.items():
+        for head, (site, _) in zip(getattr(index[key], "heads", ()), heads):
+            if head.bs.bound and _pair_key(head.bs.linked) != site:
+                head.bs.unbind()
+    for key, (_, heads) in states.items():
+        for head, (site, state) in zip(getattr(index[key], "heads", ()), heads):
+            if site is not None and not head.bs.bound:
+                if index[site].bs.bound:  # by a head we've heard nothing of
+                    index[site].bs.linked.detach()
+                head.bs.bind(index[site].bs)
+            if state is not None and head.state != state:
+                head.state = state
+
+
+def _work(world, conn):
+    """Step the molecules we're told to own until told to stop
+
+    Each tick we receive the timestep, updates to molecules in our region, and
+    the ids of those we own. We reply with the changed states of those we own
+    and the peaks seen by our clock.
+
+    Listeners to the world's space are the parent's, who hears of our binding
+    changes as it applies them, so our copies of them are dropped.
+    """
+    np.random.seed()  # each worker draws its own numbers
+    world.tractspace.listeners = []
+    binding_site.listening = 0
+    index, clock = _index(world), world.clock
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        timestep, updates, owned = message
+        _apply(index, updates)
+        clock.timestep = timestep
+        clock.advance()
+        mols = [index[key] for key in owned]
+        before = [_state(mol) for mol in mols]
+        world._step_mols(mols)
+        changed = {}
+        for key, mol, old in zip(owned, mols, before):
+            new = _state(mol)
+            if new != old:
+                changed[key] = new
+        peaks = (clock.peak_prob, clock.peak_dx, clock.peak_jump)
+        conn.send((changed, peaks))
+    conn.close()
+
+
+class Slabs:
+    """Step a world in slabs along x, each on a forked worker process
+
+    The span is cut into equal slabs. Each tick every molecule is owned by
+    the slab containing its location: the start of an α-actinin or motor, or
+    the midpoint of an actin filament. The owning worker alone steps it, so
+    each filament is force balanced by exactly one worker, which sees all its
+    bound partners as they were at the start of the tick. Ownership is worked
+    out afresh each tick, so molecules migrate between slabs as they move.
+
+    Workers are forked copies of the world. Each tick a worker is sent, as
+    deltas, the new states of molecules reaching into its region: its slab,
+    widened to cover the filaments it owns, plus a ghost margin either side at
+    least as wide as the longest crosslinker. Molecules outside its region may
+    be stale in a worker's copy, but nothing it owns can reach them.
+
+    Bindings are made concurrently, so two workers may bind heads to the same
+    free pair in a shared ghost region within one tick. The lower slab's
+    binding stands and the other head is left unbound.
+
+    Turnover and event kinetics aren't supported, being world-wide.
+    """
+
+    def __init__(self, world, n, ghost=None):
+        """Fork workers for each slab of a world
+
+        Parameters
+        ----------
+        world : `flins.construct.World`
+            World to step, which stays current after each step
+        n : int
+            Number of slabs, and worker processes
+        ghost : float, optional
+            Width in nm of the margin each worker sees beyond its slab,
+            defaults to the longest crosslinker in the world
+        """
+        space = world.tractspace
+        if space.span is None:
+            raise Exception("slabs need a world with a span")
+        if world.turnover is not None or world.scheduler is not None:
+            raise Exception("slabs don't support turnover or event kinetics")
+        index = _stepped(world)
+        mols = list(index.values())
+        rests = [mol.spring.rest for mol in mols if mol.kind == "actinin"]
+        rests += [s.rest for mol in mols if mol.kind == "motor" for s in mol.spring]
+        longest = max(rests + [0])
+        if ghost is None:
+            ghost = longest
+        elif ghost < longest:
+            raise Exception("ghost region narrower than a crosslinker")
+        self.world, self.n, self.ghost = world, n, ghost
+        self.edges = np.linspace(0, space.span, n + 1)
+        if space.span / n < ghost:
+            raise Exception("slabs narrower than their ghost regions")
+        self._index = _index(world)
+        self._states = {key: _state(mol) for key, mol in index.items()}
+        self._claims = {
+            site: (key, i)
+            for key, (_, heads) in self._states.items()
+            for i, (site, _) in enumerate(heads)
+            if site is not None
+        }
+        # What each worker's copy believes, to send only what has changed
+        self._sent = [dict(self._states) for _ in range(n)]
+        context = multiprocessing.get_context("fork")
+        self._conns, self._workers = [], []
+        for _ in range(n):
+            ours, theirs = context.Pipe()
+            worker = context.Process(target=_work, args=(world, theirs), daemon=True)
+            worker.start()
+            theirs.close()
+            self._conns.append(ours)
+            self._workers.append(worker)
+
+    def __str__(self):
+        """String representation of slabs"""
+        return "Slabs of %i workers, ghost %.0fnm" % (self.n, self.ghost)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Stop the workers"""
+        for conn, worker in zip(self._conns, self._workers):
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            worker.join()
+            conn.close()
+        self._conns, self._workers = [], []
+
+    def _owner(self, start, end, kind):
+        """Which slab owns a molecule with this extent?"""
+        space = self.world.tractspace
+        x = (start + end) / 2 if kind == "actin" else start
+        x = space.wrap(x) if space.periodic else min(max(x, 0), space.span)
+        return min(int(np.searchsorted(self.edges, x, side="right")) - 1, self.n - 1)
+
+    def _reaches(self, region, extent):
+        """Does an extent overlap a region, either directly or across the seam?"""
+        space = self.world.tractspace
+        shifts = (-space.span, 0, space.span) if space.periodic else (0,)
+        return any(
+            [extent[0] + s <= region[1] and extent[1] + s >= region[0] for s in shifts]
+        )
+
+    def _sees(self, region, extent, sent):
+        """Should a worker see a molecule? It should if the molecule now
+        reaches into its region, or did when last sent, lest the worker's
+        copy keep it bound to a site it has since let go of.
+        """
+        return self._reaches(region, extent) or self._reaches(region, (sent[0],) * 2)
+
+    def _plan(self):
+        """Find the owner of each molecule and the region each worker sees"""
+        space = self.world.tractspace
+        extents, owned = {}, [[] for _ in range(self.n)]
+        regions = [[lo, hi] for lo, hi in zip(self.edges[:-1], self.edges[1:])]
+        for key, mol in _stepped(self.world).items():
+            extent = extents[key] = _extent(mol)
+            slab = self._owner(*extent, mol.kind)
+            owned[slab].append(key)
+            if mol.kind == "actin":  # regions cover the filaments they own
+                mid = (extent[0] + extent[1]) / 2
+                shift = space.wrap(mid) - mid
+                regions[slab][0] = min(regions[slab][0], extent[0] + shift)
+                regions[slab][1] = max(regions[slab][1], extent[1] + shift)
+        regions = [(lo - self.ghost, hi + self.ghost) for lo, hi in regions]
+        return extents, owned, regions
+
+    def _released(self, sent, updates):
+        """Note heads a worker's copy detaches as it applies updates
+
+        Sites bound in the updates, but held by a molecule not updated as far
+        as we last told the worker, are taken from it by `_apply`, detaching
+        its head. We note that it has, so its state is sent if it differs.
+        """
+        taken = {site for _, heads in updates.values() for site, _ in heads}
+        taken.discard(None)
+        if len(taken) == 0:
+            return
+        for key, (x, heads) in list(sent.items()):
+            if key in updates or not any([site in taken for site, _ in heads]):
+                continue
+            heads = list(heads)
+            for i, (site, state) in enumerate(heads):
+                if site in taken:
+                    heads[i] = (None, None if state is None else 0)
+            sent[key] = (x, tuple(heads))
+
+    def _merge(self, results, owned):
+        """Combine workers' changes, settling any contested bindings"""
+        merged = {}
+        for slab, (changed, _) in enumerate(results):
+            for key in changed:
+                self._sent[slab][key] = changed[key]
+            merged.update(changed)
+        for key in merged:  # let go of old claims before taking new ones
+            for site, _ in self._states[key][1]:
+                if site is not None and self._claims.get(site, (None,))[0] == key:
+                    del self._claims[site]
+        for slab in range(self.n):
+            for key in owned[slab]:
+                if key not in merged:
+                    continue
+                x, heads = merged[key]
+                heads = list(heads)
+                for i, (site, state) in enumerate(heads):
+                    if site is None:
+                        continue
+                    if self._claims.get(site, (key, i)) != (key, i):
+                        heads[i] = (None, None if state is None else 0)
+                    else:
+                        self._claims[site] = (key, i)
+                merged[key] = (x, tuple(heads))
+        return merged
+
+    def step(self):
+        """Step forward one tick"""
+        world, clock = self.world, self.world.clock
+        clock.advance()
+        extents, owned, regions = self._plan()
+        for slab, conn in enumerate(self._conns):
+            sent = self._sent[slab]
+            region = regions[slab]
+            updates = {
+                key: state
+                for key, state in self._states.items()
+                if sent[key] != state and self._sees(region, extents[key], sent[key])
+            }
+            self._released(sent, updates)
+            sent.update(updates)
+            conn.send((clock.timestep, updates, owned[slab]))
+        results = [conn.recv() for conn in self._conns]
+        merged = self._merge(results, owned)
+        _apply(self._index, merged)
+        self._states.update(merged)
+        for _, (prob, dx, jump) in results:
+            clock.peak_prob = max(clock.peak_prob, prob)
+            clock.peak_dx = max(clock.peak_dx, dx)
+            clock.peak_jump = max(clock.peak_jump, jump)
+        if world.adaptive is not None:
+            world.adaptive.update(clock)
+        if world.shared is not None:
+            world.shared.publish()
+        if world.events is not None:
+            world.events.flush()
+        if world.observers is not None:
+            world.observers.sample()
@@ -13,15 +13,22 @@ from .. import space
 from .. import proteins
 
 
-def create_test_world(radius, span, n_actin, n_actinin, n_motors):
-    """Create a world of given radius with n_actin and n_actinin per tract"""
-    tractspace = space.Space("hex", radius, span)
+def create_test_world(
+    radius, span, n_actin, n_actinin, n_motors, context=None, periodic=False
+):
+    """Create a world of given radius with n_actin and n_actinin per tract
+
+    Periodic worlds have no ends to anchor actin to, so have no anchors.
+    """
+    tractspace = space.Space("hex", radius, span, context=context, periodic=periodic)
     for tract in tractspace.all_tracts:
         for _ in range(n_actin):
             length = np.random.uniform(0.1 * span, 0.9 * span)
             x = np.random.rand() * (span - length)
             actin = proteins.Actin(x, tract, length=length)
             # Anchor first and last tenth
+            if periodic:
+                continue
             if x < span * 0.1:
                 proteins.Anchor(x, actin.pairs[0], tract)
             x_end = actin.pairs_x[-1]
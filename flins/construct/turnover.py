@@ -0,0 +1,107 @@
+# encoding: utf-8
+"""
+Easy come, easy go.
+
+Stochastic insertion and removal of proteins while a world runs, letting
+protein densities drift or be changed without rebuilding the world.
+"""
+
+import numpy as np
+
+from .. import proteins
+from ..support import kinetics
+
+
+def _new_actinin(tract):
+    """A fresh α-actinin placed uniformly along the tract"""
+    span = tract.space.span
+    return proteins.AlphaActinin(np.random.rand() * (span - 36), tract)
+
+
+def _new_motor(tract):
+    """A fresh motor placed uniformly along the tract"""
+    span = tract.space.span
+    return proteins.Motor(np.random.rand() * (span - 30), tract)
+
+
+def _new_actin(tract):
+    """A fresh actin with length drawn as in `create_test_world`"""
+    span = tract.space.span
+    length = np.random.uniform(0.1 * span, 0.9 * span)
+    x = np.random.rand() * (span - length)
+    return proteins.Actin(x, tract, length=length)
+
+
+class Turnover:
+    """Add and remove proteins from each tract at given rates
+
+    Each kind has an insertion rate, the number of new molecules per second
+    appearing in each tract, and a removal rate, the per-molecule chance per
+    second of leaving. Insertions are Poisson distributed within a timestep
+    and removals are drawn as independent Poisson processes. Removed proteins
+    unbind their heads (or, for actin, everything bound to them) before
+    leaving the tract, so the remaining binding topology stays consistent.
+    """
+
+    CREATORS = {"actinin": _new_actinin, "motor": _new_motor, "actin": _new_actin}
+
+    def __init__(self, rates, creators=None):
+        """Set the turnover rates
+
+        Parameters
+        ----------
+        rates : `dict` or callable
+            Maps kind ("actinin", "motor", or "actin") to a tuple of
+            (insertion rate per tract per s, removal rate per molecule per s).
+            Kinds not listed are left alone. Pass a callable taking a tract and
+            returning such a dict to give each tract its own rates.
+        creators : `dict`, optional
+            Maps kind to a callable taking a tract and returning a new molecule
+            in it, overriding or extending `Turnover.CREATORS`.
+        """
+        self.rates = rates
+        self.creators = dict(self.CREATORS)
+        if creators is not None:
+            self.creators.update(creators)
+
+    def __str__(self):
+        """String representation of turnover"""
+        if callable(self.rates):
+            return "Turnover with per-tract rates"
+        kinds = ", ".join(sorted(self.rates))
+        return "Turnover of %s" % kinds
+
+    def _rates_for(self, tract):
+        """What are the rates in this tract?"""
+        if callable(self.rates):
+            return self.rates(tract)
+        return self.rates
+
+    def step(self, world):
+        """Remove, then insert, proteins in each tract for one timestep"""
+        timestep = world.clock.timestep
+        for tract in world.tractspace.all_tracts:
+            for kind, (k_in, k_out) in self._rates_for(tract).items():
+                self._remove(tract, kind, kinetics.rate_to_prob(k_out, timestep))
+                self._insert(tract, kind, np.random.poisson(k_in * timestep))
+
+    @staticmethod
+    def _remove(tract, kind, prob):
+        """Remove each molecule of a kind with probability prob"""
+        mols = tract.mols.get(kind, [])
+        if prob <= 0 or len(mols) == 0:
+            return
+        leaving = np.random.rand(len(mols)) < prob
+        for mol in [mol for mol, leave in zip(mols, leaving) if leave]:
+            mol.remove()
+
+    def _insert(self, tract, kind, n):
+        """Insert n new molecules of a kind"""
+        if n == 0:
+            return
+        try:
+            create = self.creators[kind]
+        except KeyError:
+            raise Exception("don't know how to create a new %s" % kind)
+        for _ in range(n):
+            create(tract)
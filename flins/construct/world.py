@@ -7,11 +7,27 @@ Each world tracks the execution of a run.
 
 import numpy as np
 
+from .bindings import EventBuffer
+from .events import EventScheduler
+from .observe import Observers
+from .shared import SharedState
+from ..support import diffuse
+
 
 class World:
     """Keep track of a tract space, simulation time, and metadata"""
 
-    def __init__(self, tractspace, random_state=None, **kwargs):
+    def __init__(
+        self,
+        tractspace,
+        random_state=None,
+        turnover=None,
+        kinetics="tick",
+        timestep=None,
+        adaptive=None,
+        batch_diffusion=False,
+        **kwargs
+    ):
         """Save the tractspace, initiate record keeping
 
         Parameters
@@ -22,6 +38,18 @@ class World:
             The internal state of numpy's Mersenne Twister implementation as
             given by `numpy.random.get_state()`. This allows us to recreate run
             trajectories.
+        turnover : `flins.construct.turnover.Turnover`, optional
+            Insert and remove proteins at the start of each step
+        kinetics : "tick" or "event"
+            Whether each head checks for a transition every tick, or only when
+            an `flins.construct.events.EventScheduler` says one is due
+        timestep : float, optional
+            Seconds per tick, defaults to `flins.support.units.world.timestep`
+        adaptive : `flins.support.clock.AdaptiveTimestep`, optional
+            Adjust the timestep after each tick, starting from timestep
+        batch_diffusion : bool
+            Diffuse all unbound molecules together at the start of each tick,
+            drawing their displacements at once, rather than each as it steps
         """
         if random_state is None:
             np.random.seed()  # Ensure proper seeding, making each world unique
@@ -30,16 +58,158 @@ class World:
             np.random.set_state(random_state)
             self._starting_random_state = random_state
         self.tractspace = tractspace
+        self.clock = tractspace.clock
+        if timestep is not None:
+            self.clock.timestep = timestep
+        self.adaptive = adaptive
+        self.batch_diffusion = batch_diffusion
+        self.shared = None  # state published to shared memory, see `share`
+        self.observers = None  # `flins.construct.observe.Observers`, see `observe`
+        self.events = None  # binding changes for subscribers, see `record_events`
+        self.turnover = turnover
+        if kinetics == "tick":
+            self.scheduler = None
+        elif kinetics == "event":
+            self.scheduler = EventScheduler()
+        else:
+            raise Exception("unrecognized kinetics mode")
         self.time = 0
 
+    @property
+    def context(self):
+        """Physical parameters of this world, kept by the tractspace"""
+        return self.tractspace.context
+
+    @property
+    def time(self):
+        """How many ticks have we taken? Kept by the tractspace's clock."""
+        return self.clock.tick
+
+    @time.setter
+    def time(self, tick):
+        self.clock.tick = tick
+
+    def observe(self, name, reducer, stride=1, capacity=1000):
+        """Sample a summary of the world as it steps
+
+        Parameters
+        ----------
+        name : str
+            What to call the samples, they're at `world.observers[name]`
+        reducer : callable
+            Takes the world's `flins.construct.observe.Observers` and returns
+            a number or fixed-shape array, such as `observe.BoundFraction()`
+        stride : int
+            Sample at the end of every tick divisible by stride
+        capacity : int
+            How many samples to keep, the oldest being overwritten
+
+        Returns
+        -------
+        series : `flins.construct.observe.Series`
+            Samples taken, with the tick of each
+        """
+        if self.observers is None:
+            self.observers = Observers(self)
+        return self.observers.add(name, reducer, stride, capacity)
+
+    def record_events(self, capacity=4096):
+        """Buffer the world's binding changes for subscribers
+
+        Parameters
+        ----------
+        capacity : int
+            How many events to hold before handing them on, they are handed
+            on at the end of each step regardless
+
+        Returns
+        -------
+        events : `flins.construct.bindings.EventBuffer`
+            Buffer to `subscribe` to
+        """
+        if self.events is None:
+            self.events = EventBuffer(self, capacity)
+        return self.events
+
+    def share(self, spare=0.5):
+        """Publish the world's state to shared memory as it steps
+
+        Parameters
+        ----------
+        spare : float
+            Extra room, as a fraction of the current number of each kind
+
+        Returns
+        -------
+        shared : `flins.construct.shared.SharedState`
+            Shared state, whose `spec` readers attach to, close when done
+        """
+        if self.shared is None:
+            self.shared = SharedState(self, spare)
+        return self.shared
+
     def step(self):
         """Step forward one tick"""
-        self.time += 1
+        self.clock.advance()
+        if self.turnover is not None:
+            self.turnover.step(self)
         all_mols = [
             m
             for t in self.tractspace.all_tracts
             for v in t.mols.values()
             for m in list(v)
         ]
-        for mol in np.random.permutation(all_mols):
-            mol.step()
+        self._step_mols(all_mols)
+        if self.adaptive is not None:
+            self.adaptive.update(self.clock)
+        if self.shared is not None:
+            self.shared.publish()
+        if self.events is not None:
+            self.events.flush()
+        if self.observers is not None:
+            self.observers.sample()
+
+    def _step_mols(self, mols):
+        """Move the molecules and let them transition, in a random order"""
+        moved = self._diffuse_unbound(mols) if self.batch_diffusion else ()
+        if self.scheduler is None:
+            for mol in np.random.permutation(mols):
+                if mol in moved:
+                    mol.transition()
+                else:
+                    mol.step()
+        else:
+            for mol in np.random.permutation(mols):
+                if mol not in moved:
+                    mol.move()
+            self.scheduler.step(mols, self.clock.timestep)
+
+    def _diffuse_unbound(self, mols):
+        """Freely diffuse every unbound molecule at once, returning them
+
+        Free molecules of a kind share a drag and extent, so the standard
+        deviation of their displacements is found once per kind, and all the
+        displacements drawn together. Reflection off the tract ends is done in
+        one fold, keeping each molecule's extent in bounds, or one wrap if the
+        space is periodic.
+        """
+        free = [mol for mol in mols if mol._diffuses_freely]
+        if len(free) == 0:
+            return set()
+        clock, species = self.clock, {}
+        for mol in free:
+            if mol.kind not in species:
+                std = self.context.std_dev(mol._diffusion_drag, clock.timestep)
+                species[mol.kind] = (std, mol._diffusion_extent)
+        std, extent = np.array([species[mol.kind] for mol in free]).T
+        x = np.array([mol.x for mol in free])
+        x += std * np.random.standard_normal(len(free))
+        space = self.tractspace
+        if space.periodic:
+            x = space.wrap(x)
+        elif space.span is not None:
+            x = diffuse.reflect(x, 0, space.span - extent)
+        for mol, new_x in zip(free, x.tolist()):
+            mol.x = new_x
+        clock.peak_dx = max(clock.peak_dx, std.max())
+        return set(free)
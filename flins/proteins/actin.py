@@ -11,9 +11,8 @@ import warnings
 import numpy as np
 import scipy.optimize
 
-from .base import Protein
+from .base import Protein, tick_cached
 from ..base import Base
-from ..support import units
 from ..support import diffuse
 from ..support import binding_site
 
@@ -45,6 +44,15 @@ class GActinPair(Base):
         """Where are you at? Referenced from parent actin."""
         return self.filament.pairs_x[self.index]
 
+    @property
+    def tract(self):
+        """Tract of the parent filament"""
+        return self.filament.tract
+
+    def _invalidate(self):
+        """Binding here changes what the filament has bound"""
+        self.filament._invalidate()
+
     @property
     def polarity(self):
         """Is the plus end to the right? NB: Myosin is plus-end directed.
@@ -119,6 +127,7 @@ class Actin(Protein):
             raise Exception("must pass n_pair or length to actin on creation")
         # Store locations
         self.n_pairs = n
+        self.pairs = []
         self.x = x
         self.pairs_x = self._calc_pairs_x()  # redundant, but here for reminder
         # Create g-actin pairs
@@ -163,6 +172,8 @@ class Actin(Protein):
     def x(self, start_x):
         self._x = start_x
         self.pairs_x = self._calc_pairs_x(start_x)
+        for pair in self._bound_pairs:  # their partners have moved
+            pair.bs.linked._invalidate()
 
     @property
     def length(self):
@@ -182,19 +193,38 @@ class Actin(Protein):
         try:
             return self.__drag
         except AttributeError:
-            L, r = self.length, self._radius
-            drag = diffuse.Drag.Cylinder.long_axis_translation(L, r)
-            cytoplasmic_subdiffusion = units.world.D_cyto_corr
+            L, r, context = self.length, self._radius, self._context
+            drag = context.drag(diffuse.Drag.Cylinder.long_axis_translation, L, r)
+            cytoplasmic_subdiffusion = context.D_cyto_corr
             self.__drag = drag * cytoplasmic_subdiffusion
         return self.__drag
 
+    @tick_cached
+    def _bound_pairs(self):
+        """Which pairs have something attached?"""
+        return [pair for pair in self.pairs if pair.bs.bound]
+
     @property
     def bound(self):
         """Do you have any attached pairs?"""
-        return any([pair.bs.bound for pair in self.pairs])
+        return len(self._bound_pairs) > 0
+
+    def _release(self):
+        """Detach everything bound along the filament"""
+        for pair in list(self._bound_pairs):
+            pair.bs.linked.detach()
 
     def nearest(self, x):
-        """What is the nearest pair to the given location"""
+        """What is the nearest pair to the given location
+
+        In a periodic space this is the nearest pair to any image of x.
+        """
+        if self.tract is not None and self.tract.space.periodic:
+            span = self.tract.space.span
+            offset = (x - self.x) % span  # along the filament from its start
+            if offset > self.length:  # off the end, which end is nearer?
+                return self.pairs[-1 if offset - self.length < span - offset else 0]
+            x = self.x + offset
         if x < self.x:
             return self.pairs[0]
         elif x > self.x + self.length:
@@ -214,8 +244,7 @@ class Actin(Protein):
         force balances without changing the state of the filament.
         """
         px = self._calc_pairs_x(x)
-        pairs_and_x = [(pair, x) for pair, x in zip(self.pairs, px) if pair.bs.bound]
-        force = np.sum([pair.force(x) for pair, x in pairs_and_x])
+        force = np.sum([pair.force(px[pair.index]) for pair in self._bound_pairs])
         return force
 
     @property
@@ -233,8 +262,7 @@ class Actin(Protein):
         What is the current energy in the bound α-actinins?
         """
         px = self._calc_pairs_x(x)
-        pairs_and_x = [(pair, x) for pair, x in zip(self.pairs, px) if pair.bs.bound]
-        energy = np.sum([pair.energy(x) for pair, x in pairs_and_x])
+        energy = np.sum([pair.energy(px[pair.index]) for pair in self._bound_pairs])
         return energy
 
     @property
@@ -248,12 +276,12 @@ class Actin(Protein):
     def freely_diffuse(self):
         """Move around a bit, see AlphaActinin.diffuse for more explanation"""
         L, r = self.length, self._radius
-        f_drag = diffuse.Drag.Cylinder.long_axis_translation(L, r)
-        d_x = diffuse.Dx(f_drag)
+        f_drag = self._context.drag(diffuse.Drag.Cylinder.long_axis_translation, L, r)
+        d_x = self._diffusion_dx(f_drag)
         self.x += d_x
         if self.tract is not None:  # then derive diffusion limits from tract
             start, end = self.boundaries
-            self.x, _ = diffuse.coerce_to_bounds(start, end, self._space_limits)
+            self.x, _ = self._coerce_to_space(start, end)
         return d_x
 
     def step(self):
@@ -271,11 +299,14 @@ class Actin(Protein):
         the system has changed by the drawn amount.
         """
         """Take a timestep subject to force balance and diffusion"""
-        # Find force balanced location
+        # Find force balanced location, noting how far we jump to get there
         force_x = self._x_with_balanced_forces
+        clock = self._clock
+        if clock is not None and abs(force_x - self.x) > clock.peak_jump:
+            clock.peak_jump = abs(force_x - self.x)
         # Find energy at that location and perturbed energy sampled
         base_energy = self._hypothetical_energy(force_x)
-        energy_target = np.random.normal(0, 0.5 * units.constants.kT)
+        energy_target = np.random.normal(0, 0.5 * self._context.kT)
         # Don't move if in energy constrained state already?
         if base_energy >= abs(energy_target):
             self.x = force_x  # update x to energy-locked location
@@ -283,6 +314,10 @@ class Actin(Protein):
         else:
             energy_x = self._move_to_dissipate_energy(energy_target, force_x)
             self.x = energy_x
+        if self.tract is not None and self.tract.space.periodic:
+            wrapped = self.tract.space.wrap(self.x)
+            if wrapped != self.x:
+                self.x = wrapped
         return (force_x, energy_x)
 
     @property
@@ -9,11 +9,9 @@ adjacent actin filaments.
 
 import numpy as np
 
-from .base import Protein, Head
+from .base import Protein, Head, tick_cached
 from ..support import spring
-from ..support import units
 from ..support import diffuse
-from ..support import kinetics
 
 
 class AlphaActinin(Protein):
@@ -75,8 +73,10 @@ class AlphaActinin(Protein):
         # Store tract if given, else create placeholders
         super().__init__("actinin", tract)
         # Create the spring that is our actinin and remember passed values
-        self.spring = spring.Spring(3.75, 36)  # See class doc for sources
-        self.x = x
+        self.spring = spring.Spring(
+            3.75, 36, self._context
+        )  # See class doc for sources
+        self._x = x
         # Create the heads at either end of the actinin
         self.heads = [ActininHead(self, 0), ActininHead(self, 1)]
 
@@ -87,6 +87,24 @@ class AlphaActinin(Protein):
         bound_str = "%i bound heads" % sum([h.bs.bound for h in self.heads])
         return "α-act with %s at x=%s on tract %s" % (bound_str, x_str, tract_str)
 
+    @property
+    def x(self):
+        """Location of the left end of the α-actinin"""
+        return self._x
+
+    @x.setter
+    def x(self, x):
+        if x != self._x:
+            self._x = x
+            self._invalidate()
+
+    def _invalidate(self):
+        """Drop cached values, including those of our heads"""
+        self._cache.clear()
+        self._version += 1
+        for head in self.heads:
+            head._cache.clear()
+
     @property
     def bound(self):
         """Are you bound?"""
@@ -97,16 +115,21 @@ class AlphaActinin(Protein):
         """Are both sides bound?"""
         return self.heads[0].bs.bound and self.heads[1].bs.bound
 
-    @property
+    @tick_cached
     def energy(self):
         """Current energy born by the stretched (or not) α-actinin"""
         if not (self.heads[0].bs.bound and self.heads[1].bs.bound):
             return 0
-        dist = np.abs(self.heads[0].x - self.heads[1].x)
+        dist = abs(self._separation(self.heads[1].x, self.heads[0].x))
         return self.spring.energy(dist)
 
-    def step(self):
-        """Take a timestep"""
+    def _release(self):
+        """Detach both heads"""
+        for head in self.heads:
+            head.detach()
+
+    def move(self):
+        """Diffuse if unbound, else follow the bound heads"""
         if not self.bound:
             self.freely_diffuse()
         else:
@@ -114,8 +137,26 @@ class AlphaActinin(Protein):
                 self.x = self.heads[0].bs.linked.x
             else:
                 self.x = self.heads[1].bs.linked.x - self.spring.rest
+
+    def transition(self):
+        """Let each head bind or unbind"""
         [head.step() for head in self.heads]
-        return
+
+    @property
+    def _diffuses_freely(self):
+        return not self.bound
+
+    @property
+    def _diffusion_drag(self):
+        """Drag while diffusing freely, see `freely_diffuse`"""
+        # NB This is checked well at this time, CDW20190221
+        b, a = 18, 3
+        return self._context.drag(diffuse.Drag.Ellipsoid.long_axis_translation, b, a)
+
+    @property
+    def _diffusion_extent(self):
+        """Length we keep within the tract while diffusing freely"""
+        return self.spring.rest
 
     def freely_diffuse(self):
         """ Diffuse to a new location.
@@ -131,25 +172,22 @@ class AlphaActinin(Protein):
         .. _Ribeiro_2014: https://dx.doi.org/10.1016%2Fj.cell.2014.10.056
         .. _BNID_104395: https://bionumbers.hms.harvard.edu/bionumber.aspx?id=104395
         """
-        # NB This is checked well at this time, CDW20190221
-        b, a = 18, 3
-        f_drag = diffuse.Drag.Ellipsoid.long_axis_translation(b, a)
-        d_x = diffuse.Dx(f_drag)
+        d_x = self._diffusion_dx(self._diffusion_drag)
         self.x += d_x
         if self.tract is not None:  # then derive diffusion limits from tract
             start, end = self.x, self.x + self.spring.rest
-            space_limits = (0, self.tract.space.span)
-            self.x, _ = diffuse.coerce_to_bounds(start, end, space_limits)
+            self.x, _ = self._coerce_to_space(start, end)
         return d_x
 
 
 class ActininHead(Head):
     """One of the two heads of an α-actinin"""
 
+    _RATE_TABLES = {"_r01": (0, 20, 1e-4), "_r10": (0, 80, 1e-4)}
+
     def __init__(self, actinin, side):
         super().__init__(actinin, side)
         self.address = (actinin.address[:], ("actininhead", side))
-        self._update_x()
 
     def __str__(self):
         """String representation of α-actinin head"""
@@ -167,47 +205,79 @@ class ActininHead(Head):
         else:
             return self._x
 
-    def _update_x(self):
-        """Update the α-actinin-vibration-based estimate of x
+    @tick_cached
+    def _x(self):
+        """The α-actinin-vibration-based estimate of x when unbound
 
-        NOTE This is recalculating the x even when the actinin-head is bound.
-        This isn't necessary and we could stop it by linking our updates to a
-        global timestep clock.
+        This is drawn lazily, at most once per tick, so bound heads never pay
+        for it. Moving the parent α-actinin redraws it.
         """
         spring = self.parent.spring
         if self.side == 0:
-            self._x = self.parent.x - 0.5 * spring.bop_dx()
+            return self.parent.x - 0.5 * spring.bop_dx()
         elif self.side == 1:
-            self._x = self.parent.x + spring.rest + 0.5 * spring.bop_dx()
+            return self.parent.x + spring.rest + 0.5 * spring.bop_dx()
 
     def step(self):
         """Take a timestep: bind, unbind, or stay current"""
-        self._update_x()
         if not self.bs.bound:
             self._bind_or_not()
         else:
             self._unbind_or_not()
 
-    def _bind_or_not(self):
-        """Maybe bind? Can't say for sure."""
+    def _bindable_site(self):
+        """The nearest binding site, if we are allowed to bind to it"""
         gactin = self.parent.tract.nearest_binding_site(self.x)
-        if gactin.bs.bound:  # don't bind if site is already taken
-            return
+        if gactin is None or gactin.bs.bound:  # no free site to bind
+            return None
         if self.other_head.bs.bound:
             if self.other_head.bs.linked.filament == gactin.filament:  # don't self bind
-                return
-        rate = self._r01(abs(gactin.x - self.x))
-        prob = kinetics.rate_to_prob(rate, units.world.timestep)
+                return None
+        return gactin
+
+    def _backbone_length(self):
+        """Length of the backbone, at rest if the other head is free"""
+        if self.other_head.bs.bound:
+            return abs(self._separation(self.other_head.x, self.x))
+        return self.parent.spring.rest  # bears no energy
+
+    def _bind_or_not(self):
+        """Maybe bind? Can't say for sure."""
+        gactin = self._bindable_site()
+        if gactin is None:
+            return
+        prob = self._prob("_r01", abs(self._separation(self.x, gactin.x)))
         if prob > np.random.rand():
             self.bs.bind(gactin.bs)
 
     def _unbind_or_not(self):
         """Maybe unbind? Can't say for sure."""
-        rate = self._r10()
-        prob = kinetics.rate_to_prob(rate, units.world.timestep)
+        prob = self._prob("_r10", self._backbone_length())
         if prob > np.random.rand():
             self.bs.unbind()
 
+    def _transitions(self):
+        """Bind to the nearest site if unbound, else unbind"""
+        if self.bs.bound:
+            return [(self._rate("_r10", self._backbone_length()), 0, None)]
+        gactin = self._bindable_site()
+        if gactin is None:
+            return []
+        dist = abs(self._separation(self.x, gactin.x))
+        return [(self._rate("_r01", dist), 1, gactin.bs)]
+
+    def _transit(self, state, site=None):
+        """Bind to site when moving to state 1, unbind when moving to 0"""
+        if state == 1:
+            self.bs.bind(site)
+        else:
+            self.bs.unbind()
+
+    @property
+    def _rate_key(self):
+        """Our rates depend on the backbone spring, see `Spring.key`"""
+        return self.parent.spring.key
+
     def _r01(self, dist):
         """Binding rate per second, given the distance to binding site.
 
@@ -219,11 +289,11 @@ class ActininHead(Head):
         """
         tau = 72
         k = self.parent.spring.k
-        kT = units.constants.kT
+        kT = self._context.kT
         rate = tau * np.exp(-(k * dist ** 2) / (2 * kT))
         return rate
 
-    def _r10(self):
+    def _r10(self, length=None):
         r"""See _r01. We have a free energy release of ~ 8kcal/mol when α-actinin
         binds to vinculin [1]_. We'll use that as an approximation for the
         energy released when α-actinin binds to actin. This is equivalent to
@@ -242,13 +312,19 @@ class ActininHead(Head):
         We don't include a pre-exponential correction. Or, rather, assume it to
         be one.
 
+        The energy is that currently borne by the parent α-actinin, or that of
+        its backbone at the given length if one is passed.
+
         .. [1] https://dx.doi.org/10.1016/j.bpj.2012.08.044
         .. [2] https://dx.doi.org/10.1074/jbc.273.16.9570
         """
         deltaG = 62  # pN*nm energy barrier between unbound and bound
-        U = self.parent.energy
+        if length is None:
+            U = self.parent.energy
+        else:
+            U = self.parent.spring.energy(length)
         A = 1
-        kT = units.constants.kT
+        kT = self._context.kT
         rate = A * np.exp(-(deltaG - U) / kT)
         return rate
 
@@ -260,7 +336,7 @@ class ActininHead(Head):
         # If no x is given, use current location
         if x is None:
             x = self.x
-        length = abs(x - self.other_head.x)
+        length = abs(self._separation(self.other_head.x, x))
         return spring_prop(length)
 
     def force(self, x=None):
@@ -293,7 +369,7 @@ class ActininHead(Head):
         in cases where the current head is the right-most of the two.
         """
         force_fn = self.parent.spring.force
-        mult = -1 if self.x > self.other_head.x else 1
+        mult = -1 if self._separation(self.other_head.x, self.x) > 0 else 1
         return self._spring_property(force_fn, x) * mult
 
     def energy(self, x=None):
@@ -42,7 +42,7 @@ class Anchor(Protein):
         self.bs = BindingSite(self)
         if anchor_to is not None:
             self.bs.bind(anchor_to.bs)
-        self.spring = Spring(k, rest)
+        self.spring = Spring(k, rest, self._context)
 
     def __str__(self):
         """String representation of an anchor"""
@@ -50,14 +50,23 @@ class Anchor(Protein):
 
     def force(self, x):
         """Force exerted by anchor if other end is stretched to x"""
-        dist = abs(x - self.x)
+        dist = abs(self._separation(self.x, x))
         return self.spring.force(dist)
 
     def energy(self, x):
         """Energy stored in anchor spring with other end stretched to x"""
-        dist = abs(x - self.x)
+        dist = abs(self._separation(self.x, x))
         return self.spring.energy(dist)
 
+    def _release(self):
+        """Let go of the anchored binding site"""
+        if self.bs.bound:
+            self.bs.unbind()
+
+    def detach(self):
+        """An anchor tethering nothing is meaningless, so leave with the link"""
+        self.remove()
+
     def step(self):
         """Sit there and remain bound"""
         pass
@@ -3,15 +3,50 @@
 Base protein class
 """
 
+import functools
 import numpy as np
 
 from ..base import Base
 from ..support import binding_site
+from ..support import diffuse
+from ..support import kinetics
+from ..support import units
+
+
+def tick_cached(method):
+    """Make a property that is computed at most once per tick
+
+    The value is stamped with the current tick of the protein's clock and kept
+    until either the tick advances or the protein's `_invalidate` is called,
+    which happens on binding, unbinding, and movement. Proteins without a clock
+    keep the value until invalidated.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def cached(self):
+        cache, tick = self._cache, self._tick
+        if cache.get("tick", -1) != tick:
+            cache.clear()
+            cache["tick"] = tick
+        try:
+            return cache[name]
+        except KeyError:
+            value = cache[name] = method(self)
+            return value
+
+    return property(cached)
+
+
+# Scalar rate table lookups by head type, rate, parameters, and timestep
+_lookups = {}
 
 
 class Protein(Base):
     def __init__(self, kind, tract=None):
         self.kind = kind
+        self._cache = {}
+        self._version = 0
         if tract is not None:
             self._link_tract(tract)
         else:
@@ -24,15 +59,117 @@ class Protein(Base):
         self.tract = tract
         self.id = tract.add_mol(self.kind, self)
         self.address = (tract.address[:], (self.kind, self.id))
+        if binding_site.listening:
+            binding_site.announce(self, "added", self)
+
+    def _unlink_tract(self):
+        """Leave the tract, dropping the local ID and address"""
+        if binding_site.listening:
+            binding_site.announce(self, "removed", self)
+        self.tract.remove_mol(self.kind, self)
+        self.tract = None
+        self.id = None
+        self.address = ((self.kind, None),)
+
+    def _release(self):
+        """Unbind everything bound to this protein, see `remove`"""
+        pass
+
+    def remove(self):
+        """Unbind from all partners and leave the tract
+
+        Partners are left in a consistent state: heads bound to a removed
+        filament return to their unbound state and anchors tethering it go too.
+        """
+        self._release()
+        if self.tract is not None:
+            self._unlink_tract()
+
+    @property
+    def _clock(self):
+        """The clock of the world we are in, None if we aren't in one"""
+        try:
+            return self.tract.space.clock
+        except AttributeError:
+            return None
+
+    @property
+    def _tick(self):
+        """The tick of the world we are in, None if we aren't in one"""
+        try:
+            return self.tract.space.clock.tick
+        except AttributeError:
+            return None
+
+    @property
+    def _context(self):
+        """Physical parameters of the world we are in, or the defaults"""
+        try:
+            return self.tract.space.context
+        except AttributeError:
+            return units.default_context
+
+    @property
+    def _timestep(self):
+        """Seconds per tick in the world we are in"""
+        clock = self._clock
+        return units.world.timestep if clock is None else clock.timestep
+
+    def _diffusion_dx(self, f_drag):
+        """Draw a diffusive displacement, noting its scale on our clock"""
+        clock, context = self._clock, self._context
+        if clock is None:
+            return diffuse.Dx(f_drag, context=context)
+        std = context.std_dev(f_drag, clock.timestep)
+        if std > clock.peak_dx:
+            clock.peak_dx = std
+        return np.random.normal(0, std)
+
+    def _invalidate(self):
+        """Drop values cached this tick, our geometry or binding has changed"""
+        self._cache.clear()
+        self._version += 1
+
+    def step(self):
+        """Take a timestep: move, then give heads a chance to transition"""
+        self.move()
+        self.transition()
+
+    def move(self):
+        """Move for a timestep by diffusing or following what we're bound to"""
+        pass
+
+    def transition(self):
+        """Let each head bind, unbind, or change state for a timestep"""
+        pass
+
+    def _separation(self, a, b):
+        """Signed distance from a to b, the nearest image if space is periodic"""
+        if self.tract is None:
+            return b - a
+        return self.tract.space.separation(a, b)
+
+    def _coerce_to_space(self, start, end):
+        """Bring an extent back within the tract, by reflection or wrapping"""
+        space = self.tract.space
+        return diffuse.coerce_to_bounds(start, end, (0, space.span), space.periodic)
+
+    @property
+    def _diffuses_freely(self):
+        """Is our next move a free diffusion? See `World`'s batch_diffusion"""
+        return False
 
     @property
     def _space_limits(self):
         """What are the X limits available to this protein?
 
-        Defined as 0 to tract span (if given tract) else 0 to infinity.
+        Defined as 0 to tract span (if given tract) else 0 to infinity. Periodic
+        tracts have no limits.
         """
         if self.tract is None:
             return (0, np.inf)
+        elif self.tract.space.periodic:
+            return (-np.inf, np.inf)
         else:
             return (0, self.tract.space.span)
 
@@ -40,6 +177,10 @@ class Protein(Base):
 class Head(Protein):
     """Generic head located on a parent protein"""
 
+    # Domain, in nm, over which the log of each rate method is tabulated by
+    # `_lookup`, and the tolerance of its tabulated log, its relative error
+    _RATE_TABLES = {}
+
     def __init__(self, parent, side):
         """A head on one side of a parent protein
 
@@ -53,8 +194,79 @@ class Head(Protein):
         self.parent = parent
         self.side = side
         self.bs = binding_site.BindingSite(self)
+        self._cache = {}
+
+    @property
+    def tract(self):
+        """Tract of the parent protein"""
+        return self.parent.tract
+
+    def _invalidate(self):
+        """A change to a head is a change to the whole protein"""
+        self.parent._invalidate()
 
     @property
     def other_head(self):
         """The other head"""
         return self.parent.heads[self.side ^ 1]
+
+    @property
+    def _rate_key(self):
+        """Everything other than their argument that our rates depend on"""
+        raise NotImplementedError
+
+    def _prob(self, rate, x):
+        """Chance the named rate method fires within this timestep at x
+
+        The peak chance seen each tick is noted on our clock.
+        """
+        clock = self._clock
+        if clock is None:
+            return self._lookup(rate, x, units.world.timestep)
+        prob = self._lookup(rate, x, clock.timestep)
+        if prob > clock.peak_prob:
+            clock.peak_prob = prob
+        return prob
+
+    def _rate(self, rate, x):
+        """Value of the named rate method at x"""
+        return self._lookup(rate, x, None)
+
+    def _lookup(self, rate, x, timestep):
+        """Rate, or chance of firing within timestep, of a rate method at x
+
+        This is looked up in a `flins.support.kinetics.RateTable` of its log,
+        shared by all heads whose rates have the same parameters, whatever the
+        timestep.
+        """
+        key = (type(self), rate, self._rate_key, timestep)
+        try:
+            lookup = _lookups[key]
+        except KeyError:
+            lo, hi, tol = self._rate_table(rate)
+            fn = getattr(self, rate)
+            table = kinetics.table(key[:-1], fn, lo, hi, tol=tol, log=True)
+            if len(_lookups) > 1024:  # don't grow without bound
+                _lookups.clear()
+            lookup = _lookups[key] = table.lookup(timestep)
+        return lookup(float(x))
+
+    def _rate_table(self, rate):
+        """Domain and tolerance to tabulate a rate method over, see `_lookup`"""
+        return self._RATE_TABLES[rate]
+
+    def _transitions(self):
+        """Available transitions as (rate per s, new state, binding site)
+
+        Used by event-driven kinetics, see `flins.construct.events`.
+        """
+        raise NotImplementedError
+
+    def _transit(self, state, site=None):
+        """Move to a new state, binding to the site if given"""
+        raise NotImplementedError
+
+    def detach(self):
+        """Let go of whatever we are bound to"""
+        if self.bs.bound:
+            self.bs.unbind()
@@ -20,22 +20,23 @@ sliding forces::
 import math as m
 import numpy as np
 
-from .base import Protein, Head
-from ..support import units
+from .base import Protein, Head, tick_cached
 from ..support import spring
 from ..support import diffuse
 from ..support import kinetics
+from ..support import binding_site
 
 
 class Motor(Protein):
     def __init__(self, x, tract=None):
         # Store tract if given, else create placeholders
         super().__init__("motor", tract)
-        self.x = x
-        kT = units.constants.kT
+        self._x = x
+        context = self._context
+        kT = context.kT
         ks = (kT, kT, kT * 2)
         rs = (30.0, 30.0, 24.0)
-        self.spring = [spring.Spring(k, r) for k, r in zip(ks, rs)]
+        self.spring = [spring.Spring(k, r, context) for k, r in zip(ks, rs)]
         self.heads = [MotorHead(self, side) for side in (0, 1)]
 
     def __str__(self):
@@ -54,11 +55,24 @@ class Motor(Protein):
 
     @x.setter
     def x(self, x):
-        self._x = x
+        if x != self._x:
+            self._x = x
+            self._invalidate()
+
+    def _invalidate(self):
+        """Drop cached values, including those of our heads"""
+        self._cache.clear()
+        self._version += 1
+        for head in self.heads:
+            head._cache.clear()
 
-    @property
+    @tick_cached
     def locs(self):
-        """Location of each node in motor. 2 in this case"""
+        """Location of each node in motor. 2 in this case
+
+        Cached for the tick, and recomputed on binding, unbinding, head state
+        changes, or movement of the motor or the actin it is bound to.
+        """
         bound = self._which_bound
         if bound == "none":
             x = self._x
@@ -70,7 +84,7 @@ class Motor(Protein):
             x = self.heads[1].bs.linked.x
             return (x - self.spring[self.state].rest, x)
         elif bound == "both":
-            return [h.bs.linked.x for h in self.heads]
+            return tuple([h.bs.linked.x for h in self.heads])
         else:
             raise ValueError("_which_bound value not in expected set")
 
@@ -117,15 +131,32 @@ class Motor(Protein):
         elif left and right:
             return "both"
 
-    def _freely_diffuse(self):
+    def _release(self):
+        """Detach both heads"""
+        for head in self.heads:
+            head.detach()
+
+    @property
+    def _diffuses_freely(self):
+        return not self.bound
+
+    @property
+    def _diffusion_drag(self):
+        """Drag while diffusing freely"""
         b, a = self.spring[0].rest, 15
-        drag = diffuse.Drag.Ellipsoid.long_axis_translation(b, a)
-        d_x = diffuse.Dx(drag)
+        return self._context.drag(diffuse.Drag.Ellipsoid.long_axis_translation, b, a)
+
+    @property
+    def _diffusion_extent(self):
+        """Length we keep within the tract while diffusing freely"""
+        return self.spring[self.state].rest
+
+    def _freely_diffuse(self):
+        d_x = self._diffusion_dx(self._diffusion_drag)
         self.x += d_x
         if self.tract is not None:  # then stay in tract limits
             start, end = self.locs
-            limits = (0, self.tract.space.span)
-            self.x, _ = diffuse.coerce_to_bounds(start, end, limits)
+            self.x, _ = self._coerce_to_space(start, end)
         return d_x
 
     def step(self):
@@ -134,17 +165,25 @@ class Motor(Protein):
         If the motor isn't bound, it freely diffuses. Both heads have the chance
         to transition from their current state to a new one.
         """
+        self.move()
+        self.transition()
+
+    def move(self):
+        """Diffuse if unbound, else keep our location current"""
         if not self.bound:
             self._freely_diffuse()
         else:
-            self.x = self.locs[0]  # Continue to update _x
+            self._x = self.locs[0]  # Continue to update _x, locs don't use it
+
+    def transition(self):
+        """Give both heads the chance to change state"""
         for head in self.heads:
             if head.state == 0:
                 gact = self.tract.nearest_binding_site(head.x)
-                if not gact.bs.bound:
+                if gact is not None and not gact.bs.bound:
                     head.step(bs=gact.bs)
             elif head.state == 1 or head.state == 2:
-                length = np.abs(np.subtract(*self.locs))
+                length = abs(self._separation(*self.locs))
                 head.step(length=length)
             else:
                 raise Exception("Head has state other than 0, 1, or 2")
@@ -153,6 +192,16 @@ class Motor(Protein):
 class MotorHead(Head):
     """A head that tracks binding, rates, and states"""
 
+    # Reverse rates' logs curve as the difference of spring constants, some
+    # 8 per nm**2, so a relative error of 1e-3 already needs a grid of 0.03 nm
+    _RATE_TABLES = {
+        "_r01": (0, 20, 1e-4),
+        "_r10": (0, 80, 1e-3),
+        "_r12": (0, 80, 1e-4),
+        "_r21": (0, 80, 1e-3),
+        "_r20": (-64, 64, 1e-4),  # about the strong rest length, see below
+    }
+
     def __init__(self, motor, side):
         """ Create a motor head.
 
@@ -169,12 +218,30 @@ class MotorHead(Head):
             Whether this head is on the left (0) or right (1) side of the motor
         """
         super().__init__(motor, side)
-        self.state = 0
+        self._state = 0
+
+    @property
+    def state(self):
+        """Which state are we in? 0 unbound, 1 weakly, or 2 strongly bound"""
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        if state != self._state:
+            old, self._state = self._state, state
+            self.parent._invalidate()
+            if binding_site.listening:
+                binding_site.announce(self, "state_changed", self, old)
 
     @property
     def x(self):
         return self.parent.locs[self.side]
 
+    def detach(self):
+        """Let go of the actin and return to the unbound state"""
+        super().detach()
+        self.state = 0
+
     @property
     def polarity(self):
         """Return true if this is the right-most head.
@@ -189,6 +256,67 @@ class MotorHead(Head):
         """
         return self.x > self.other_head.x
 
+    @property
+    def _rate_key(self):
+        """Our rates depend on the motor springs, see `Spring.key`"""
+        s0, s1, s2 = self.parent.spring
+        return (s0.key, s1.key, s2.key)
+
+    def _rate_table(self, rate):
+        """Domain and tolerance to tabulate a rate method over
+
+        The strong unbinding rate has a kink at the strong rest length, which
+        is put on a grid point by centering its domain there.
+        """
+        lo, hi, tol = self._RATE_TABLES[rate]
+        if rate == "_r20":
+            rest = self.parent.spring[2].rest
+            return (rest + lo, rest + hi, tol)
+        return (lo, hi, tol)
+
+    @property
+    def _length(self):
+        """Current length of the motor backbone"""
+        locs = self.parent.locs
+        return abs(self._separation(locs[0], locs[1]))
+
+    def _bindable_site(self):
+        """The nearest binding site, if we are allowed to bind to it"""
+        gact = self.parent.tract.nearest_binding_site(self.x)
+        if gact is None or gact.bs.bound:
+            return None
+        if self.other_head.bs.bound:
+            if self.other_head.bs.linked.filament == gact.filament:
+                return None  # Don't self bind
+        if gact.polarity not in (self.polarity, None):
+            return None  # can't bind if polarity doesn't match (or is off)
+        return gact
+
+    def _transitions(self):
+        """Bind if unbound, else move between weak, strong, and unbound"""
+        r = self._rate
+        if self.state == 0:
+            gact = self._bindable_site()
+            if gact is None:
+                return []
+            return [(r("_r01", abs(self._separation(self.x, gact.x))), 1, gact.bs)]
+        length = self._length
+        if self.state == 1:
+            return [(r("_r12", length), 2, None), (r("_r10", length), 0, None)]
+        elif self.state == 2:
+            return [(r("_r20", length), 0, None), (r("_r21", length), 1, None)]
+        else:
+            raise Exception("State other than 0, 1, or 2 given")
+
+    def _transit(self, state, site=None):
+        """Move to a new state, binding or unbinding as needed"""
+        if state == 0:
+            self.detach()
+        else:
+            if site is not None:
+                self.bs.bind(site)
+            self.state = state
+
     def _r01(self, dist):
         """dist is distance to binding site"""
         return 100 * m.exp(-((0.25 * dist) ** 2))
@@ -231,7 +359,7 @@ class MotorHead(Head):
 
     def _free_energy(self, dist, state):
         """Free energy for given spring length and state"""
-        kT = units.constants.kT
+        kT = self._context.kT
         if state == 0:
             return 0.0
         elif state == 1:
@@ -244,9 +372,7 @@ class MotorHead(Head):
     def step(self, bs=None, length=None):
         """Take a timestep, transitioning to a new state as needed"""
 
-        def p(r):
-            return kinetics.rate_to_prob(r, units.world.timestep)
-
+        p = self._prob
         check = np.random.rand()
         if self.state == 0:
             if bs is None:
@@ -258,25 +384,25 @@ class MotorHead(Head):
                     return
             if bs.parent.polarity not in (self.polarity, None):
                 return  # can't bind if polarity doesn't match (or is off)
-            dist = abs(bs.parent.x - self.x)
-            if p(self._r01(dist)) > check:
+            dist = abs(self._separation(self.x, bs.parent.x))
+            if p("_r01", dist) > check:
                 self.bs.bind(bs)
                 self.state = 1
         elif self.state == 1:
             if length is None:
                 raise Exception("Need length when in state 1")
-            if p(self._r12(length)) > check:
+            if p("_r12", length) > check:
                 self.state = 2
-            elif 1 - p(self._r10(length)) < check:
+            elif 1 - p("_r10", length) < check:
                 self.state = 0
                 self.bs.unbind()
         elif self.state == 2:
             if length is None:
                 raise Exception("Need length when in state 2")
-            if p(self._r20(length)) > check:
+            if p("_r20", length) > check:
                 self.state = 0
                 self.bs.unbind()
-            elif 1 - p(self._r21(length)) < check:
+            elif 1 - p("_r21", length) < check:
                 self.state = 1
         else:
             raise Exception("State other than 0, 1, or 2 given")
@@ -289,13 +415,13 @@ class MotorHead(Head):
         # If no x is given, use current location
         if x is None:
             x = self.x
-        length = abs(x - self.other_head.x)
+        length = abs(self._separation(self.other_head.x, x))
         return spring_prop(length)
 
     def force(self, x=None):
         """What force does this head exert or feel?"""
         force_fn = self.parent.spring[self.parent.state].force
-        mult = -1 if self.x > self.other_head.x else 1
+        mult = -1 if self._separation(self.other_head.x, self.x) > 0 else 1
         return self._spring_property(force_fn, x) * mult
 
     def energy(self, x=None):
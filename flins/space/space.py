@@ -6,9 +6,14 @@ A space accounts for the interactions of tracts that are arranged according
 to some grid layout.
 """
 
+import numpy as np
+
 from .grids import HexGrid, RectGrid
 from .tract import Tract
 from ..base import Base
+from ..support import binding_site
+from ..support import clock
+from ..support import units
 
 
 class Space(Base):
@@ -18,7 +23,9 @@ class Space(Base):
     many of the properties of 3D space but with easier mechanics.
     """
 
-    def __init__(self, kind, size, span=None, mirror=True):
+    def __init__(
+        self, kind, size, span=None, mirror=True, context=None, periodic=False
+    ):
         """ A generic template for
         Parameters
         ----------
@@ -30,11 +37,21 @@ class Space(Base):
             Length of the tracts in x dimension, optional
         tracts: None or list
             List of tracts
+        context: None or flins.support.units.Context
+            Physical parameters of the proteins in this space, optional
+        periodic: boolean (False)
+            Whether tracts wrap around in x, joining their ends, requires span
         """
         self.kind = kind
         self.size = size
         self.span = span
         self.mirror = mirror
+        if periodic and span is None:
+            raise Exception("periodic space needs a span")
+        self.periodic = periodic
+        self.clock = clock.Clock()
+        self.context = units.default_context if context is None else context
+        self.listeners = []  # told of binding changes, see `listen`
         if kind == "hex":
             self.grid = HexGrid(size)
         elif kind == "rect":
@@ -51,7 +68,41 @@ class Space(Base):
         """String representation of space"""
         size, n = str(self.size), len(self.all_tracts)
         sp = self.span if self.span is not None else 0
-        return "Space with size %s, %i tracts, and span %i" % (size, n, sp)
+        wrapped = " (periodic)" if self.periodic else ""
+        return "Space with size %s, %i tracts, and span %i%s" % (size, n, sp, wrapped)
+
+    def listen(self, listener):
+        """Tell a listener of every binding change in this space
+
+        Listeners have `bound(site, other)` and `unbound(site, other)` methods,
+        called as binding sites bind and unbind, `state_changed(head, old)`,
+        called as motor heads change state, and `added(mol)` and `removed(mol)`,
+        called as proteins join the space and, once unbound, leave it. See
+        `binding_site.announce`.
+        """
+        self.listeners.append(listener)
+        binding_site.listening += 1
+
+    def ignore(self, listener):
+        """Stop telling a listener of binding changes"""
+        self.listeners.remove(listener)
+        binding_site.listening -= 1
+
+    def wrap(self, x):
+        """Bring x locations into [0, span) if we are periodic"""
+        if not self.periodic:
+            return x
+        return np.mod(x, self.span)
+
+    def separation(self, a, b):
+        """Signed distance from a to b, to the nearest image of b if periodic
+
+        Either can be an array, but not a list.
+        """
+        d = b - a
+        if not self.periodic:
+            return d
+        return d - self.span * np.floor(d / self.span + 0.5)
 
     @property
     def all_tracts(self):
@@ -78,13 +78,25 @@ class Tract(Base):
         self.mols_named[kind][id] = mol
         return id
 
+    def remove_mol(self, kind, mol):
+        """Remove a molecule from our lists and dicts thereof
+
+        The caller is responsible for unbinding the molecule first, see
+        `flins.proteins.base.Protein.remove`.
+        """
+        assert mol in self.mols.get(kind, ()), "Can't remove mol not in tract"
+        self.mols[kind].remove(mol)
+        del self.mols_named[kind][mol.id]
+
     def nearest_binding_site(self, x):
-        """The nearest reachable actin binding site"""
+        """The nearest reachable actin binding site, None if there is no actin"""
         # Get all candidate actins
-        actins = [t.mols["actin"] for t in self.reachable]
+        actins = [t.mols.get("actin", []) for t in self.reachable]
         actins = list(itertools.chain(*actins))  # flatten
+        if len(actins) == 0:
+            return None
         # Find the g-actin pair nearest our location
         near = [act.nearest(x) for act in actins]
-        distances = np.abs(np.subtract([g.x for g in near], x))
+        distances = np.abs(self.space.separation(x, np.array([g.x for g in near])))
         nearest = near[np.argmin(distances)]
         return nearest
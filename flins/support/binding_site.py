@@ -6,6 +6,25 @@ Let different proteins link to and unlink from each other.
 """
 
 
+# Listeners across all spaces, see `flins.space.Space.listen`. While there are
+# none, binding changes skip announcing altogether.
+listening = 0
+
+
+def announce(owner, event, *args):
+    """Tell whatever listens to the owner's space that something happened
+
+    Listeners, such as a world's `flins.construct.observe.Observers`, are kept
+    in the space's `listeners` list and called by event name. Owners outside a
+    tract cost only the lookup.
+    """
+    tract = getattr(owner, "tract", None)
+    if tract is None:
+        return
+    for listener in tract.space.listeners:
+        getattr(listener, event)(*args)
+
+
 class BindingSite:
     """A link between this (thing) and that (thing)"""
 
@@ -15,7 +34,8 @@ class BindingSite:
         Parameters
         ----------
         parent : `protein`
-            Protein on which this binding site is located
+            Protein on which this binding site is located. It is told of
+            binding and unbinding through its `_invalidate` method.
         """
         self.parent = parent
         self.link = None
@@ -46,10 +66,19 @@ class BindingSite:
         assert not other.bound, "Tried to link to an already-bound site"
         self.link = other
         self.link.link = self
+        self.parent._invalidate()
+        other.parent._invalidate()
+        if listening:
+            announce(self.parent, "bound", self, other)
 
     def unbind(self):
         """Unbind from other object"""
         assert self.bound, "Tried to unlink an unbound site"
         assert self.link.bound, "Linked site already unbound? Weird."
+        other = self.link
         self.link.link = None
         self.link = None
+        self.parent._invalidate()
+        other.parent._invalidate()
+        if listening:
+            announce(self.parent, "unbound", self, other)
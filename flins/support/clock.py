@@ -0,0 +1,133 @@
+# encoding: utf-8
+"""
+Tick tock.
+
+Keep the time of a world where the proteins in it can see it, letting them
+cache values derived from their geometry for the rest of a tick and use the
+world's own timestep.
+"""
+
+import math as m
+
+from . import units
+
+
+class Clock:
+    """A counter of the ticks a world has taken and the time they spanned
+
+    Over each tick the clock also notes the peak per-tick transition
+    probability, diffusive step size (standard deviation), and actin force
+    relaxation jump seen, which `AdaptiveTimestep` uses to pick the next step.
+    """
+
+    def __init__(self, timestep=None):
+        """Start at tick zero
+
+        Parameters
+        ----------
+        timestep : float, optional
+            Seconds each tick spans, defaults to `units.world.timestep`
+        """
+        self.tick = 0
+        self.time = 0.0
+        self.timestep = units.world.timestep if timestep is None else timestep
+        self._reset_peaks()
+
+    def __str__(self):
+        """String representation of clock"""
+        return "Clock at tick %i, %.4fs, stepping %.2gs" % (
+            self.tick,
+            self.time,
+            self.timestep,
+        )
+
+    def _reset_peaks(self):
+        """Forget the peaks seen over the last tick"""
+        self.peak_prob = 0.0
+        self.peak_dx = 0.0
+        self.peak_jump = 0.0
+
+    def advance(self):
+        """Move forward one tick, expiring everything cached on the last"""
+        self.tick += 1
+        self.time += self.timestep
+        self._reset_peaks()
+
+
+class AdaptiveTimestep:
+    """Pick the largest timestep that keeps each tick well resolved
+
+    Timesteps are chosen from a ladder of power-of-two multiples of a base
+    step, which keeps the number of distinct rate tables (see
+    `flins.support.kinetics.table`) small. After each tick we find the largest
+    rung on which the peak transition probability and diffusive step size
+    would have stayed under their thresholds. We drop to that rung at once, but
+    climb at most one rung per tick. When the largest actin relaxation jump, a
+    proxy for the force gradients the filaments feel, spikes above its running
+    typical value, we drop straight back to the base step.
+    """
+
+    def __init__(self, base=None, max_prob=0.1, max_dx=None, max_level=6, spike=4.0):
+        """Set the thresholds
+
+        Parameters
+        ----------
+        base : float, optional
+            Smallest timestep in s, defaults to the clock's timestep
+        max_prob : float
+            Largest acceptable chance of any one transition within a tick
+        max_dx : float, optional
+            Largest acceptable diffusive step standard deviation in nm
+        max_level : int
+            Largest timestep is base * 2**max_level
+        spike : float
+            How many times its typical size an actin relaxation jump must be
+            to count as a spike
+        """
+        self.base = base
+        self.max_prob = max_prob
+        self.max_dx = max_dx
+        self.max_level = max_level
+        self.spike = spike
+        self.level = 0
+        self._typical_jump = None
+
+    def __str__(self):
+        """String representation of adaptive timestep"""
+        return "AdaptiveTimestep on rung %i of %i" % (self.level, self.max_level)
+
+    def _fitting_level(self, clock):
+        """Highest rung keeping this tick's peaks under their thresholds"""
+        timestep, limit = clock.timestep, float("inf")
+        if clock.peak_prob >= 1:
+            return 0
+        if clock.peak_prob > 0:
+            rate = -m.log(1 - clock.peak_prob) / timestep
+            limit = -m.log(1 - self.max_prob) / rate
+        if self.max_dx is not None and clock.peak_dx > 0:
+            limit = min(limit, timestep * (self.max_dx / clock.peak_dx) ** 2)
+        if limit == float("inf"):
+            return self.max_level
+        if limit < self.base:
+            return 0
+        return int(m.floor(m.log2(limit / self.base)))
+
+    def _spiked(self, jump):
+        """Is this jump far beyond those typically seen?"""
+        typical = self._typical_jump
+        if typical is None:
+            self._typical_jump = jump
+            return False
+        self._typical_jump = 0.9 * typical + 0.1 * jump
+        return typical > 0 and jump > self.spike * typical
+
+    def update(self, clock):
+        """Set the clock's timestep for the next tick"""
+        if self.base is None:
+            self.base = clock.timestep
+        if self._spiked(clock.peak_jump):
+            level = 0
+        else:
+            level = min(self._fitting_level(clock), self.level + 1)
+        self.level = max(0, min(level, self.max_level))
+        clock.timestep = self.base * 2**self.level
@@ -13,7 +13,8 @@ from . import units
 class Drag:
     r"""Drag coefficients drawn from Howard_2001_, Pg 107 and Berg_1983_.
     We assume that our coefficient of viscosity, :math:`\eta`, defaults to that
-    of water (0.0114 poise at 288K), referenced from units
+    of water (0.0114 poise at 288K), referenced from units when called. Worlds
+    pass their own, see `flins.support.units.Context`.
 
     .. _Howard_2001: http://books.google.com/books?vid=ISBN9780878933334
     .. _Berg_1983: https://press.princeton.edu/titles/112.html
@@ -26,23 +27,27 @@ class Drag:
         unbounded space.
         """
 
-        def long_axis_translation(L, r, eta=units.constants.eta):
+        def long_axis_translation(L, r, eta=None):
             """Drag coefficient for cylinder moving along long axis"""
+            eta = units.constants.eta if eta is None else eta
             drag = 2 * np.pi * eta * L / (np.log(L / (2 * r)) - 0.20)
             return drag
 
-        def short_axis_translation(L, r, eta=units.constants.eta):
+        def short_axis_translation(L, r, eta=None):
             """Drag coefficient for cylinder moving along the radial axis"""
+            eta = units.constants.eta if eta is None else eta
             drag = 4 * np.pi * eta * L / (np.log(L / (2 * r)) + 0.84)
             return drag
 
-        def long_axis_rotation(L, r, eta=units.constants.eta):
+        def long_axis_rotation(L, r, eta=None):
             """Drag coefficient for cylinder rotating about the long axis"""
+            eta = units.constants.eta if eta is None else eta
             drag = (1 / 3) * np.pi * eta * L ** 3 / (np.log(L / (2 * r)) - 0.66)
             return drag
 
-        def short_axis_rotation(L, r, eta=units.constants.eta):
+        def short_axis_rotation(L, r, eta=None):
             """Drag coefficient for cylinder rotating about the radial axis"""
+            eta = units.constants.eta if eta is None else eta
             drag = 4 * np.pi * eta * r ** 2 * L
             return drag
 
@@ -53,23 +58,27 @@ class Drag:
         assumes :math:`b>>a` and an unbounded space.
         """
 
-        def long_axis_translation(b, a, eta=units.constants.eta):
+        def long_axis_translation(b, a, eta=None):
             """Drag coefficient for an ellipsoid moving along long axis"""
+            eta = units.constants.eta if eta is None else eta
             drag = 4 * np.pi * eta * b / (np.log(2 * b / a) - 0.5)
             return drag
 
-        def short_axis_translation(b, a, eta=units.constants.eta):
+        def short_axis_translation(b, a, eta=None):
             """Drag coefficient for an ellipsoid moving along the minor axis"""
+            eta = units.constants.eta if eta is None else eta
             drag = 8 * np.pi * eta * b / (np.log(2 * b / a) + 0.5)
             return drag
 
-        def long_axis_rotation(b, a, eta=units.constants.eta):
+        def long_axis_rotation(b, a, eta=None):
             """Drag coefficient for an ellipsoid rotating about the long axis"""
+            eta = units.constants.eta if eta is None else eta
             drag = (8 / 3) * np.pi * eta * b ** 3 / (np.log(2 * b / a) - 0.5)
             return drag
 
-        def short_axis_rotation(b, a, eta=units.constants.eta):
+        def short_axis_rotation(b, a, eta=None):
             """Drag coefficient for an ellipsoid rotating about the minor axis"""
+            eta = units.constants.eta if eta is None else eta
             drag = 16 / 3 * np.pi * eta * a ** 2 * b
             return drag
 
@@ -79,18 +88,41 @@ class Drag:
         viscosity :math:`\eta`.
         """
 
-        def translation(r, eta=units.constants.eta):
+        def translation(r, eta=None):
             """Drag coefficient for a sphere moving through a fluid"""
+            eta = units.constants.eta if eta is None else eta
             drag = 6 * np.pi * eta * r
             return drag
 
-        def rotation(r, eta=units.constants.eta):
+        def rotation(r, eta=None):
             """Drag coefficient for a sphere rotating in a fluid"""
+            eta = units.constants.eta if eta is None else eta
             drag = 8 * np.pi * eta * r ** 3
             return drag
 
 
-def Dx(f_drag):
+def std_dev(f_drag, timestep=None, context=None):
+    """Standard deviation of diffusive displacements within a timestep, see Dx
+
+    Parameters
+    ----------
+    f_drag : `float` or `array`
+        Drag coefficient(s) in g/s
+    timestep : `float`, optional
+        Seconds to diffuse for, defaults to `units.world.timestep`
+    context : `units.Context`, optional
+        Physical parameters to use, defaults to `units.default_context`
+    """
+    if context is None:
+        context = units.default_context
+    kT = context.kT
+    D_corr = context.D_cyto_corr  # Cytoplasm correction factor
+    t = units.world.timestep if timestep is None else timestep
+    D = kT / (f_drag * D_corr)
+    return np.sqrt(2 * D * t)
+
+
+def Dx(f_drag, timestep=None, context=None):
     """How far do we move because of diffusion subject to drag?
     From the Einstein-Smoluchowski relation via Berg_1983_ we know that the
     diffusion coefficient for a particle subject to a viscous drag, :math:`f`
@@ -105,51 +137,89 @@ def Dx(f_drag):
     approximating them as spheres. There is an argument that anything beyond the
     spherical approximation is false precision.
 
+    The timestep defaults to `units.world.timestep` but is usually that of the
+    world doing the diffusing, see `flins.support.clock.Clock`. Similarly kT and
+    the correction factor come from the world's `units.Context`.
+
     .. _Berg_1983: https://press.princeton.edu/titles/112.html
     .. _Howard_2001: http://books.google.com/books?vid=ISBN9780878933334
     .. _Swaminathan_1997: https://doi.org/10.1016/S0006-3495(97)78835-0
     """
-    # Gather info
-    kT = units.constants.kT
-    D_corr = units.world.D_cyto_corr  # Cytoplasm correction factor
-    t = units.world.timestep
-    # Calculate
-    D = kT / (f_drag * D_corr)
-    std_dev = np.sqrt(2 * D * t)
-    d_x = np.random.normal(0, std_dev)
+    d_x = np.random.normal(0, std_dev(f_drag, timestep, context))
     return d_x
 
 
-def coerce_to_bounds(mol_start, mol_end, boundaries):
+def reflect(x, lo, hi):
+    """Fold positions back into [lo, hi] as if reflected off either end
+
+    Reflecting off two walls is a triangle wave in the unbounded position, so
+    any number of reflections can be made at once, and on arrays.
+
+    Parameters
+    ----------
+    x : `float` or `array`
+        Unbounded position(s)
+    lo, hi : `float` or `array`
+        Lower and upper bound(s)
+    """
+    width = np.subtract(hi, lo)
+    if np.any(width < 0):
+        raise Exception("boundaries passed in reverse order")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        folded = np.mod(np.subtract(x, lo), 2 * width)
+    folded = np.where(folded > width, 2 * width - folded, folded)
+    return np.where(width > 0, lo + folded, lo)
+
+
+def coerce_to_bounds(mol_start, mol_end, boundaries, periodic=False):
     """When a molecule has diffused out of bounds, coerce it back into bounds
 
     A choice is made here to reflect the molecule back into bounds rather than
     stopping it dead at the boundary. This is to prevent the boundaries of the
     system from acting as absorbing ends that will tend to build up diffusing
-    proteins over time.
+    proteins over time. However far out of bounds the molecule is, it is
+    reflected back in one go, see `reflect`. Molecules already in bounds are
+    returned untouched.
 
     Parameters
     ----------
-    mol_start : `float`
-        X location of the right side of the protein
-    mol_end : `float`
-        X location of left side of the protein
+    mol_start : `float` or `array`
+        X location of the left side of the protein(s)
+    mol_end : `float` or `array`
+        X location of right side of the protein(s)
     boundaries : `tuple`
         Upper and lower bounds of the 1D space the molecule is diffusing within
+    periodic : `bool`
+        Wrap the start around to the other end of the bounds rather than
+        reflecting, the end then being the start plus the molecule's length
     """
     m1, m2, b1, b2 = mol_start, mol_end, boundaries[0], boundaries[1]
+    scalar = np.isscalar(m1) and np.isscalar(m2)  # the common case, kept cheap
+    if not scalar:
+        m1, m2 = np.asarray(m1, dtype=float), np.asarray(m2, dtype=float)
+    length = m2 - m1
     # Do some checking
-    if m2 - m1 > b2 - b1:
+    too_long = length > b2 - b1
+    if too_long if scalar else np.any(too_long):
         raise Exception("molecule is too long to fit in boundaries")
-    if m1 > m2 or b1 > b2:
+    backward = length < 0
+    if (backward if scalar else np.any(backward)) or b1 > b2:
         raise Exception("molecule/boundaries passed in reverse order")
-    # And now the bouncing around
-    if m1 < b1:
-        diff = b1 - m1
-        m1, m2 = m1 + 2 * diff, m2 + 2 * diff
-        m1, m2 = coerce_to_bounds(m1, m2, boundaries)
-    elif m2 > b2:
-        diff = m2 - b2
-        m1, m2 = m1 - 2 * diff, m2 - 2 * diff
-        m1, m2 = coerce_to_bounds(m1, m2, boundaries)
-    return m1, m2
+    # And now the bouncing around, all at once
+    if scalar:
+        if periodic and not b1 <= m1 < b2:
+            m1 = b1 + (m1 - b1) % (b2 - b1)
+            m2 = m1 + length
+        elif not periodic and (m1 < b1 or m2 > b2):
+            width = b2 - b1 - length
+            m1 = (m1 - b1) % (2 * width) if width > 0 else 0
+            m1 = b1 + (2 * width - m1 if m1 > width else m1)
+            m2 = m1 + length
+        return m1, m2
+    if periodic:
+        out = (m1 < b1) | (m1 >= b2)
+        moved = b1 + np.mod(m1 - b1, b2 - b1)
+    else:
+        out = (m1 < b1) | (m2 > b2)
+        moved = reflect(m1, b1, b2 - length)
+    return np.where(out, moved, m1), np.where(out, moved + length, m2)
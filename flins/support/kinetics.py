@@ -6,6 +6,9 @@ Help us decide when we change from one state to another.
 """
 
 import math as m
+import warnings
+
+import numpy as np
 
 
 def rate_to_prob(rate, obs_duration):
@@ -26,7 +29,7 @@ def rate_to_prob(rate, obs_duration):
     probability : float
         probability the event occurs during the ms we watched
     """
-    return 1 - m.exp(-rate * obs_duration)
+    return -m.expm1(-rate * obs_duration)
 
 
 def reverse_rate(rate_12, free_energy_1, free_energy_2):
@@ -55,3 +58,202 @@ def reverse_rate(rate_12, free_energy_1, free_energy_2):
     except ZeroDivisionError:
         rate = float("inf")
     return rate
+
+
+class RateTable:
+    """A function of one variable, tabulated and linearly interpolated
+
+    Rates here are functions of a single distance or spring length, given
+    fixed spring parameters, but are built from `exp`, `tanh`, and `sqrt`
+    calls. Tabulating them on a uniform grid replaces those calls with a
+    lookup. The grid is refined by halving its spacing until the error of
+    interpolating at the midpoints between grid points, where linear
+    interpolation of a smooth function errs the most, is below a tolerance.
+
+    Rates that are exponentials of spring energies span hundreds of orders of
+    magnitude over a few nm, which no uniform grid of their values follows.
+    Their logs are close to quadratic, so these are tabulated as logs, the
+    tolerance then bounding the relative error. A table of the log of a rate
+    gives the chance of it firing within any timestep, see `lookup`.
+
+    Values outside the tabulated domain fall back to the function itself, as
+    do values in intervals where it (or its log) isn't finite, such as reverse
+    rates whose free energy difference overflows, or where it is too steep to
+    tabulate within tolerance by the finest grid allowed.
+    """
+
+    def __init__(
+        self, fn, lo, hi, timestep=None, tol=1e-5, n=64, max_n=2**12, log=False
+    ):
+        """Tabulate fn between lo and hi
+
+        Parameters
+        ----------
+        fn : callable
+            Scalar function to tabulate, typically a rate per s
+        lo, hi : float
+            Domain over which to tabulate
+        timestep : float, optional
+            If given, look up the probability of fn's rate firing within a
+            timestep of this many s, see `rate_to_prob`. Unless tabulating
+            logs, the probability is what is tabulated.
+        tol : float
+            Largest acceptable interpolation error at grid midpoints, of the
+            log if tabulating logs
+        n : int
+            Starting number of grid intervals
+        max_n : int
+            Largest number of grid intervals to refine to, intervals still
+            erring by more than tol are then left to fn, with a warning
+        log : bool
+            Tabulate and interpolate the log of fn, which must be positive
+        """
+        self._rate = fn
+        if timestep is not None:
+
+            def fn(x):
+                return rate_to_prob(self._rate(x), timestep)
+
+        self._fn = fn
+        self.lo, self.hi, self.log, self.timestep = lo, hi, log, timestep
+        xs = np.linspace(lo, hi, n + 1)
+        ys = self._values(xs)
+        while True:
+            mids = 0.5 * (xs[:-1] + xs[1:])
+            y_mids = self._values(mids)
+            errors = self._errors(ys, y_mids)
+            finite = np.isfinite(errors)
+            self.error = np.max(errors[finite]) if finite.any() else 0.0
+            if self.error <= tol or n >= max_n:
+                break
+            xs = np.insert(xs, np.arange(1, n + 1), mids)
+            ys = np.insert(ys, np.arange(1, n + 1), y_mids)
+            n *= 2
+        # Leave intervals we can't interpolate, or not well enough, to fn
+        self._exact = ~(errors <= tol)
+        if self.error > tol:
+            warnings.warn(
+                "Rate table over %g-%g leaves %i of %i intervals, erring by up "
+                "to %.2g, to the function"
+                % (lo, hi, (errors[finite] > tol).sum(), n, self.error)
+            )
+            self.error = np.max(errors[~self._exact], initial=0.0)
+        self.xs, self.ys, self.n = xs, ys, n
+        self.scalar = self.lookup(timestep)
+
+    def _values(self, xs):
+        """Values, or logs of values, of the function to tabulate at xs"""
+        # Saturated rates overflow harmlessly, and vanishing ones have log -inf
+        with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+            if self.log:
+                return np.log(np.array([self._rate(x) for x in xs], dtype=float))
+            return np.array([self._fn(x) for x in xs], dtype=float)
+
+    @staticmethod
+    def _errors(ys, y_mids):
+        """Interpolation error at the midpoint of each interval
+
+        This is inf for intervals with an infinite or nan end or midpoint,
+        which can't be interpolated.
+        """
+        with np.errstate(invalid="ignore", over="ignore"):
+            errors = np.abs(y_mids - (0.5 * ys[:-1] + 0.5 * ys[1:]))
+        errors[~np.isfinite(errors)] = np.inf
+        return errors
+
+    def lookup(self, timestep=None):
+        """Fast lookup of a single float, closing over plain python values
+
+        Tables of logs give the rate, or if a timestep is given the chance of
+        it firing within that timestep, see `rate_to_prob`. Other tables give
+        what they tabulated.
+        """
+        lo, inv_h, n = self.lo, self.n / (self.hi - self.lo), self.n
+        ys, exact = self.ys.tolist(), self._exact.tolist()
+        if not self.log:
+            if timestep != self.timestep:
+                raise Exception("only tables of logs give any timestep's chances")
+            fn = self._fn
+
+            def lookup(x):
+                pos = (x - lo) * inv_h
+                if 0 <= pos < n:
+                    i = int(pos)
+                    if not exact[i]:
+                        y0 = ys[i]
+                        return y0 + (pos - i) * (ys[i + 1] - y0)
+                return fn(x)
+
+            return lookup
+
+        exp, expm1, rate_fn = m.exp, m.expm1, self._rate
+        if timestep is None:
+
+            def lookup(x):
+                pos = (x - lo) * inv_h
+                if 0 <= pos < n:
+                    i = int(pos)
+                    if not exact[i]:
+                        y0 = ys[i]
+                        return exp(y0 + (pos - i) * (ys[i + 1] - y0))
+                return rate_fn(x)
+
+            return lookup
+
+        def lookup(x):
+            pos = (x - lo) * inv_h
+            if 0 <= pos < n:
+                i = int(pos)
+                if not exact[i]:
+                    y0 = ys[i]
+                    return -expm1(-exp(y0 + (pos - i) * (ys[i + 1] - y0)) * timestep)
+            return rate_to_prob(rate_fn(x), timestep)
+
+        return lookup
+
+    def __str__(self):
+        """String representation of a rate table"""
+        return "RateTable of %i %spoints over %g-%g, max error %.2g" % (
+            self.xs.size,
+            "log " if self.log else "",
+            self.lo,
+            self.hi,
+            self.error,
+        )
+
+    def __call__(self, x):
+        """Look up the value at x, a float or an array of floats"""
+        if not isinstance(x, np.ndarray):
+            return self.scalar(float(x))
+        with np.errstate(invalid="ignore", over="ignore"):
+            out = np.interp(x, self.xs, self.ys)
+            if self.log:
+                out = np.exp(out)
+                if self.timestep is not None:
+                    out = -np.expm1(-out * self.timestep)
+        i = np.searchsorted(self.xs, x, side="right") - 1
+        i = np.clip(i, 0, self._exact.size - 1)
+        exact = (x < self.lo) | (x > self.hi) | self._exact[i]
+        if exact.any():
+            out[exact] = [self._fn(v) for v in x[exact]]
+        return out
+
+
+_tables = {}
+
+
+def table(key, fn, lo, hi, timestep=None, **kwargs):
+    """A cached `RateTable`, built on first use for each key
+
+    The key must capture everything fn depends on, such as spring constants,
+    rest lengths, kT and the timestep. Changing any of them changes the key,
+    and so a new table is built automatically. Keyword arguments, such as
+    tol and log, are passed on to `RateTable`.
+    """
+    try:
+        return _tables[key]
+    except KeyError:
+        if len(_tables) > 1024:  # don't grow without bound
+            _tables.clear()
+        _tables[key] = RateTable(fn, lo, hi, timestep, **kwargs)
+        return _tables[key]
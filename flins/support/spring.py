@@ -11,11 +11,14 @@ from numpy import pi, sqrt
 import math as m
 import numpy.random as random
 
+# Small integers standing in for each set of spring parameters seen, see `key`
+_keys = {}
+
 
 class Spring:
     """A generic one-state spring"""
 
-    def __init__(self, k, rest):
+    def __init__(self, k, rest, context=None):
         """Give me a spring
 
         The spring can be extensional or torsional, the module works in both
@@ -27,10 +30,14 @@ class Spring:
             Spring constant in pN per nm
         rest : float
             Rest angle or length of spring in radians or nm
+        context : `units.Context`, optional
+            Physical parameters, whose kT sets the thermal forcing, defaults to
+            `units.default_context`
         """
         # Passed variables
+        self.context = units.default_context if context is None else context
+        self._rest = rest
         self.k = k
-        self.rest = rest
 
     @property
     def k(self):
@@ -40,11 +47,31 @@ class Spring:
     def k(self, new_k):
         self._k = new_k
         self._update_bop_distribution()
+        self._update_key()
+
+    @property
+    def rest(self):
+        return self._rest
+
+    @rest.setter
+    def rest(self, new_rest):
+        self._rest = new_rest
+        self._update_key()
+
+    def _update_key(self):
+        """Update the small integer that identifies our parameters
+
+        Springs with the same parameters share a key, letting anything derived
+        from those parameters, like rate lookup tables, be shared and rebuilt
+        when they change. Cheaper to hash and compare than the parameters.
+        """
+        params = (self._k, self._rest, self.context.kT)
+        self.key = _keys.setdefault(params, len(_keys))
 
     def _update_bop_distribution(self):
         """Update the mean, std used to energy-bop this spring"""
         # Diffusion governors
-        kT = units.constants.kT
+        kT = self.context.kT
         # Normalize: a factor used to normalize the PDF of the segment values
         self._normalize = sqrt(2 * pi * kT / self.k)
         self._stand_dev = sqrt(kT / self.k)  # of segment values
@@ -40,7 +40,8 @@ class constants:
 class world:
     """Things that are constant for our (simulated) world
 
-    * timestep is the number of ms we advance each tick
+    * timestep is the default number of ms we advance each tick, worlds can
+      set their own (see `flins.support.clock.Clock`)
     * D_cyto_corr comes from the difference in diffusion between water and
       eukaryotic cytoplasm (Swaminathan_1997_).
 
@@ -49,3 +50,88 @@ class world:
 
     timestep = milliseconds(1)  # 1ms timestep
     D_cyto_corr = 3.2  # Cytoplasmic crowding sub-diffusion
+
+
+class Context:
+    """The physical parameters of one world
+
+    Worlds each keep a context (through their `flins.space.Space`) so that
+    worlds at different temperatures or viscosities can exist side by side in
+    one process. Constants derived from the parameters are computed once, on
+    creation or on first use, and cached here. Treat a context as immutable,
+    using `replace` to make one that differs.
+    """
+
+    def __init__(
+        self,
+        temperature=constants.temperature,
+        eta=constants.eta,
+        D_cyto_corr=world.D_cyto_corr,
+    ):
+        """Set the parameters, defaulting to those of `constants` and `world`
+
+        Parameters
+        ----------
+        temperature : float
+            Temperature in K
+        eta : float
+            Viscosity in g/nm*s
+        D_cyto_corr : float
+            Cytoplasmic crowding sub-diffusion correction factor
+        """
+        self.temperature = temperature
+        self.eta = eta
+        self.D_cyto_corr = D_cyto_corr
+        self.kT = constants.boltzmann * temperature
+        self._drags = {}
+        self._std_devs = {}
+
+    def __str__(self):
+        """String representation of a context"""
+        return "Context at %gK, eta %.3g g/nm*s, kT %.3g pN*nm" % (
+            self.temperature,
+            self.eta,
+            self.kT,
+        )
+
+    def replace(self, **kwargs):
+        """A new context with the given parameters changed"""
+        params = dict(
+            temperature=self.temperature, eta=self.eta, D_cyto_corr=self.D_cyto_corr
+        )
+        params.update(kwargs)
+        return Context(**params)
+
+    def drag(self, shape, *dims):
+        """Drag coefficient of a shape in our fluid, cached per shape and size
+
+        Parameters
+        ----------
+        shape : callable
+            A drag function from `flins.support.diffuse.Drag` taking the
+            dimensions and then eta
+        dims : floats
+            Dimensions of the shape, in nm
+        """
+        key = (shape, dims)
+        try:
+            return self._drags[key]
+        except KeyError:
+            self._drags[key] = shape(*dims, eta=self.eta)
+            return self._drags[key]
+
+    def std_dev(self, f_drag, timestep):
+        """Standard deviation of diffusive displacement, cached per drag
+
+        See `flins.support.diffuse.Dx` for the derivation.
+        """
+        key = (f_drag, timestep)
+        try:
+            return self._std_devs[key]
+        except KeyError:
+            D = self.kT / (f_drag * self.D_cyto_corr)
+            std = self._std_devs[key] = (2 * D * timestep) ** 0.5
+            return std
+
+
+default_context = Context()
@@ -3,3 +3,6 @@ from . import svg  # noqa: F401
 from . import vis_actin  # noqa: F401
 from . import vis_space  # noqa: F401
 from . import movie  # noqa: F401
+from . import flat_writer  # noqa: F401
+from . import raster  # noqa: F401
+from . import trajectory  # noqa: F401
@@ -3,6 +3,11 @@
 Support for rendering the tracts (and proteins within them) at the current
 timestep as an SVG. When changing this, [a list of named
 colors](https://www.december.com/html/spec/colorsvg.html) is useful.
+
+Rendering is done in two parts: `snapshot` cheaply pulls the state that
+matters for drawing out of a world into plain arrays, and `plot_snapshot` turns
+that into an SVG. Snapshots can be pickled, so the drawing can be done in
+another process while the world keeps stepping, see `movie.MovieGen`.
 """
 
 import flins as fl  # noqa: F401
@@ -22,103 +27,348 @@ CSS_STYLES = """
     .tract { stroke: darkslategray; fill: whitesmoke; stroke-width: 3px; }
     .clear { fill-opacity: 0.0; }
     .fade { opacity: 0.3; }
+    .density { stroke: none; }
 """
 
 
-def _plot_anchor(anchor, params):
-    """Plot anc as part of group at y"""
-    x = anchor.x * params["xm"]
-    y = anchor.bs.linked.filament.__y * params["ym"]
-    group = anchor.bs.linked.filament.tract.__groups["anchor"]
-    group.add(svgwrite.shapes.Circle((x, y), 4, class_="anchor"))
-    return
+def _wrap(x, snap):
+    """Bring x into the span if the snapshot's space is periodic"""
+    return np.mod(x, snap["span"]) if snap["periodic"] else x
+
+
+def _images(start, end, snap):
+    """Pairs of x locations to draw a line at, more than one if it is cut
+
+    In a periodic space a line is drawn from the wrapped start, and again on the
+    other side if it runs over an edge, the canvas clipping each.
+    """
+    if not snap["periodic"]:
+        return [(start, end)]
+    span = snap["span"]
+    wrapped = _wrap(start, snap)
+    start, end = wrapped, end - start + wrapped
+    images = [(start, end)]
+    if max(start, end) > span:
+        images.append((start - span, end - span))
+    if min(start, end) < 0:
+        images.append((start + span, end + span))
+    return images
+
+
+def _image_arrays(start, end, snap):
+    """Line ends to draw for arrays of lines, as `_images` does for one
+
+    Returns the starts and ends, the index of the line each came from, and
+    which of the line's images each is, in the order `_images` gives them.
+    """
+    start, end = np.asarray(start, dtype=float), np.asarray(end, dtype=float)
+    index = np.arange(len(start))
+    if not snap["periodic"]:
+        return start, end, index, np.zeros_like(index)
+    span = snap["span"]
+    wrapped = np.mod(start, span)
+    start, end = wrapped, end - start + wrapped
+    over = np.maximum(start, end) > span
+    under = np.minimum(start, end) < 0
+    return (
+        np.concatenate([start, start[over] - span, start[under] + span]),
+        np.concatenate([end, end[over] - span, end[under] + span]),
+        np.concatenate([index, index[over], index[under]]),
+        np.repeat([0, 1, 2], [len(index), over.sum(), under.sum()]),
+    )
+
 
+def _crosslinkers(tracts, rows, kind):
+    """Snapshot of the α-actinins or motors in the tracts
 
-def _plot_motor(motor, y, params):
-    """Plot an actinin as part of group within y_lim"""
-    if not motor.bound:  # none bound
-        _plot_unbound(motor, y, params, "motor")
-        return
-    if sum([h.bs.bound for h in motor.heads]) == 2:  # both bound
-        if motor.state == 2:
-            _plot_body(motor, params, "motor.post")
+    For each molecule we note its tract, its row within the tract, and its x.
+    For each head we note if it is bound, its x, the tract and row of the
+    filament it is bound to, and where the other head is, seen from this one.
+    """
+    mols = [
+        (i, j, len(tract.mols.get(kind, [])), mol)
+        for i, tract in enumerate(tracts)
+        for j, mol in enumerate(tract.mols.get(kind, []))
+    ]
+    n = len(mols)
+    snap = {
+        "tract": np.array([i for i, _, _, _ in mols], dtype=int),
+        "row": np.array([j for _, j, _, _ in mols], dtype=int),
+        "rows": np.array([k for _, _, k, _ in mols], dtype=int),
+        "x": np.array([mol.x for _, _, _, mol in mols], dtype=float),
+        "bound": np.zeros((n, 2), dtype=bool),
+        "head_x": np.zeros((n, 2)),
+        "far_x": np.zeros((n, 2)),
+        "head_tract": np.full((n, 2), -1),
+        "head_row": np.zeros((n, 2), dtype=int),
+        "head_rows": np.zeros((n, 2), dtype=int),
+        "post": np.zeros(n, dtype=bool),
+    }
+    for m, (_, _, _, mol) in enumerate(mols):
+        for h, head in enumerate(mol.heads):
+            if not head.bs.bound:
+                continue
+            x, other_x = head.x, head.other_head.x
+            snap["bound"][m, h] = True
+            snap["head_x"][m, h] = x
+            snap["far_x"][m, h] = x + mol._separation(x, other_x)
+            filament_tract, row, n_rows = rows[head.bs.linked.filament]
+            snap["head_tract"][m, h] = filament_tract
+            snap["head_row"][m, h] = row
+            snap["head_rows"][m, h] = n_rows
+        snap["post"][m] = getattr(mol, "state", 0) == 2
+    return snap
+
+
+def snapshot(world):
+    """Pull what we need to draw a world into plain, picklable, arrays
+
+    Parameters
+    ----------
+    world: flins.construct.World
+        World to take a snapshot of
+
+    Returns
+    -------
+    snapshot: dict
+        The span, whether the space is periodic, the number of tracts, and a
+        dict of arrays for each kind of protein
+    """
+    space = world.tractspace
+    tracts = space.all_tracts
+    # Actins, noting where each is drawn for the proteins bound to it
+    rows, actins = {}, []
+    for i, tract in enumerate(tracts):
+        tract_actins = tract.mols.get("actin", [])
+        for k, actin in enumerate(tract_actins):
+            rows[actin] = (i, k, len(tract_actins))
+            actins.append(actin)
+    actin = {
+        "start": np.array([a.boundaries[0] for a in actins], dtype=float),
+        "end": np.array([a.boundaries[1] for a in actins], dtype=float),
+        "tract": np.array([rows[a][0] for a in actins], dtype=int),
+        "row": np.array([rows[a][1] for a in actins], dtype=int),
+        "rows": np.array([rows[a][2] for a in actins], dtype=int),
+    }
+    anchors = [
+        (anchor, rows[anchor.bs.linked.filament])
+        for tract in tracts
+        for anchor in tract.mols.get("anchor", [])
+    ]
+    anchor = {
+        "x": np.array([a.x for a, _ in anchors], dtype=float),
+        "tract": np.array([r[0] for _, r in anchors], dtype=int),
+        "row": np.array([r[1] for _, r in anchors], dtype=int),
+        "rows": np.array([r[2] for _, r in anchors], dtype=int),
+    }
+    return {
+        "span": space.span,
+        "periodic": space.periodic,
+        "n_tracts": len(tracts),
+        "actin": actin,
+        "anchor": anchor,
+        "actinin": _crosslinkers(tracts, rows, "actinin"),
+        "motor": _crosslinkers(tracts, rows, "motor"),
+    }
+
+
+# Coordinates along x of each kind of snapshot, shifted when cropping
+X_FIELDS = {
+    "actin": ("start", "end"),
+    "anchor": ("x",),
+    "actinin": ("x", "head_x", "far_x"),
+    "motor": ("x", "head_x", "far_x"),
+}
+
+
+def _extents(mols, kind):
+    """Leftmost and rightmost x each molecule of a kind is drawn at"""
+    if kind == "actin":
+        ends = np.stack([mols["start"], mols["end"]], axis=1)
+    elif kind == "anchor":
+        ends = mols["x"][:, None]
+    else:
+        x = mols["x"][:, None]
+        bound = mols["bound"]
+        ends = np.concatenate(
+            [x, np.where(bound, mols["head_x"], x), np.where(bound, mols["far_x"], x)],
+            axis=1,
+        )
+    return ends.min(axis=1), ends.max(axis=1)
+
+
+def crop(snap, lo, hi):
+    """Only the molecules of a snapshot drawn within a window along x
+
+    The cropped snapshot spans hi - lo, its x coordinates shifted so the window
+    starts at zero. A periodic snapshot is unrolled, molecules being taken at
+    each image that falls in the window, and the crop isn't periodic.
+    """
+    span = snap["span"]
+    cropped = dict(snap, span=hi - lo, periodic=False)
+    for kind, fields in X_FIELDS.items():
+        mols = snap[kind]
+        start, end = _extents(mols, kind)
+        if snap["periodic"]:
+            base = np.mod(start, span) - start
+            shifts = [base - span, base, base + span]
         else:
-            _plot_body(motor, params, "motor")
-    for head in motor.heads:
-        _plot_head(head, params, "motor")
-    return
-
-
-def _plot_actinin(actinin, y, params):
-    """Plot an actinin as part of group within y_lim"""
-    if not actinin.bound:  # none bound
-        _plot_unbound(actinin, y, params, "actinin")
-        return
-    if sum([h.bs.bound for h in actinin.heads]) == 2:  # both bound
-        _plot_body(actinin, params, "actinin")
-    for head in actinin.heads:
-        _plot_head(head, params, "actinin")
-    return
-
-
-def _plot_actin(actin, params):
-    """Plot actin and affiliated proteins as part of group within y_lim"""
-    # Locally load params
-    xm = params["xm"]
-    ym = params["ym"]
-    y = actin.__y
-    group = actin.tract.__groups["actin"]
-    # Find limits and convert to user units
-    x = np.multiply(xm, actin.boundaries)
-    y *= ym
-    # Plot actin
-    group.add(svgwrite.shapes.Line((x[0], y), (x[1], y)))
-    return
-
-
-def _plot_unbound(mol, y, params, kind):
-    """Plot a free floating ellipse for an unbound component"""
-    y *= params["ym"]
-    x = mol.x * params["xm"]
-    group = mol.tract.__groups["unbound_" + kind]
-    group.add(svgwrite.shapes.Ellipse((x, y), (5, 1)))
-    return
-
-
-def _plot_head(head, params, kind):
-    """Plot actinin head on actin"""
-    if not head.bs.bound:
-        return
-    x = head.x * params["xm"]
-    y = head.bs.linked.filament.__y * params["ym"]
-    group = head.bs.linked.filament.tract.__groups["bound_" + kind]
-    group.add(svgwrite.shapes.Circle((x, y), 2, class_=kind))
-    return
-
-
-def _plot_body(mol, params, kind):
+            shifts = [np.zeros_like(start)]
+        index, offsets = [], []
+        for shift in shifts:
+            inside = (start + shift <= hi) & (end + shift >= lo)
+            index.append(np.flatnonzero(inside))
+            offsets.append(shift[inside] - lo)
+        index, offsets = np.concatenate(index), np.concatenate(offsets)
+        cropped[kind] = {name: array[index] for name, array in mols.items()}
+        for name in fields:
+            shape = (-1,) + (1,) * (mols[name].ndim - 1)
+            cropped[kind][name] = cropped[kind][name] + offsets.reshape(shape)
+    return cropped
+
+
+def view(snap, params):
+    """The snapshot and parameters to draw, given any window and pixel budget
+
+    A "window" param of (lo, hi) crops the snapshot to that range of x and a
+    "width" param sets xm so the drawing is that many pixels wide.
+    """
+    params = _with_defaults(params)
+    if params.get("window") is not None:
+        snap = crop(snap, *params["window"])
+    if params.get("width") is not None:
+        params["xm"] = params["width"] / snap["span"]
+    return snap, params
+
+
+def _row_y(row, rows, params):
+    """Height within a tract of the given row of rows"""
+    return params["y_span"] * (row + 1) / (rows + 1)
+
+
+def _plot_actins(snap, groups, params):
+    """Plot each actin filament in its tract"""
+    xm, ym, actin = params["xm"], params["ym"], snap["actin"]
+    for i in range(len(actin["tract"])):
+        y = _row_y(actin["row"][i], actin["rows"][i], params) * ym
+        group = groups[actin["tract"][i]]["actin"]
+        for start, end in _images(actin["start"][i], actin["end"][i], snap):
+            group.add(svgwrite.shapes.Line((start * xm, y), (end * xm, y)))
+
+
+def _plot_anchors(snap, groups, params):
+    """Plot each anchor on the filament it holds"""
+    anchor = snap["anchor"]
+    for i in range(len(anchor["tract"])):
+        x = _wrap(anchor["x"][i], snap) * params["xm"]
+        y = _row_y(anchor["row"][i], anchor["rows"][i], params) * params["ym"]
+        group = groups[anchor["tract"][i]]["anchor"]
+        group.add(svgwrite.shapes.Circle((x, y), 4, class_="anchor"))
+
+
+def _crowded(snap, params, kind):
+    """Counts in crowded strips of a kind, and which molecules they hold
+
+    Each tract is cut into strips bin_px pixels wide. Strips with more than lod
+    of a kind per pixel column are too crowded to draw one by one and are
+    drawn whole by `_plot_density`. Gives the count in each strip of each tract
+    that is crowded, zero in the rest, and whether each molecule is in one.
+    """
+    mols = snap[kind]
+    n = len(mols["tract"])
+    if params.get("lod") is None or n == 0:
+        return None, np.zeros(n, dtype=bool)
+    xm, bin_px = params["xm"], params["bin_px"]
+    n_bins = int(np.ceil(xm * snap["span"] / bin_px))
+    x = _wrap(mols["x"], snap) * xm
+    strip = mols["tract"] * n_bins + np.clip((x // bin_px).astype(int), 0, n_bins - 1)
+    counts = np.bincount(strip, minlength=snap["n_tracts"] * n_bins)
+    counts[counts <= params["lod"] * bin_px] = 0
+    return counts.reshape(-1, n_bins), counts[strip] > 0
+
+
+def _plot_density(snap, groups, params, kind, counts):
+    """Plot a kind in crowded strips shaded by how many are in each
+
+    A strip's opacity is its count over four times the count expected at the
+    lod threshold density, so strips saturate where molecules are four times
+    too crowded to draw.
+    """
+    bin_px = params["bin_px"]
+    saturate = 4 * params["lod"] * bin_px
+    height = params["y_span"] * params["ym"]
+    for tract, i in zip(*np.nonzero(counts)):
+        opacity = min(1.0, float(counts[tract, i]) / saturate)
+        groups[tract]["bound_" + kind].add(
+            svgwrite.shapes.Rect(
+                (int(i) * bin_px, 0),
+                (bin_px, height),
+                class_="density " + kind,
+                opacity="%.3f" % opacity,
+            )
+        )
+
+
+def _plot_crosslinkers(snap, groups, params, kind):
+    """Plot α-actinins or motors, bound ones between their filaments
+
+    Where there are too many to draw one by one they get density strips instead.
+    """
+    mols = snap[kind]
+    counts, crowded = _crowded(snap, params, kind)
+    if counts is not None:
+        _plot_density(snap, groups, params, kind, counts)
+    for m in range(len(mols["tract"])):
+        if crowded[m]:
+            continue
+        bound = mols["bound"][m]
+        if not bound.any():
+            y = _row_y(mols["row"][m], mols["rows"][m], params) * params["ym"]
+            x = _wrap(mols["x"][m], snap) * params["xm"]
+            group = groups[mols["tract"][m]]["unbound_" + kind]
+            group.add(svgwrite.shapes.Ellipse((x, y), (5, 1)))
+            continue
+        if bound.all():
+            body_kind = kind + ".post" if mols["post"][m] else kind
+            _plot_body(snap, groups, params, mols, m, body_kind)
+        for h in (0, 1):
+            if bound[h]:
+                _plot_head(snap, groups, params, mols, m, h, kind)
+
+
+def _plot_head(snap, groups, params, mols, m, h, kind):
+    """Plot a bound head on its filament"""
+    x = _wrap(mols["head_x"][m, h], snap) * params["xm"]
+    y = _row_y(mols["head_row"][m, h], mols["head_rows"][m, h], params)
+    group = groups[mols["head_tract"][m, h]]["bound_" + kind]
+    group.add(svgwrite.shapes.Circle((x, y * params["ym"]), 2, class_=kind))
+
+
+def _plot_body(snap, groups, params, mols, m, kind):
     """Only plot body in case where both heads are bound"""
-    tracts = [head.bs.linked.filament.tract for head in mol.heads]
+    xm, ym, y_span = params["xm"], params["ym"], params["y_span"]
+    tracts = mols["head_tract"][m]
+    rows, n_rows = mols["head_row"][m], mols["head_rows"][m]
+    ys = [_row_y(rows[h], n_rows[h], params) for h in (0, 1)]
     if tracts[0] == tracts[1]:  # same tract
-        x = [head.x * params["xm"] for head in mol.heads]
-        y = [h.bs.linked.filament.__y * params["ym"] for h in mol.heads]
-        group = tracts[0].__groups["bound_" + kind]
-        group.add(svgwrite.shapes.Line((x[0], y[0]), (x[1], y[1]), class_=kind))
+        x_0, x_1 = mols["head_x"][m, 0], mols["far_x"][m, 0]
+        group = groups[tracts[0]]["bound_" + kind]
+        for x_i, x_f in _images(x_0, x_1, snap):
+            ends = ((x_i * xm, ys[0] * ym), (x_f * xm, ys[1] * ym))
+            group.add(svgwrite.shapes.Line(*ends, class_=kind))
     else:  # different tracts
-        for head, tract in zip(mol.heads, tracts):
-            x_i = head.x * params["xm"]
-            x_f = head.other_head.x * params["xm"]
-            ym, y_span = params["ym"], params["y_span"]
-            y = head.bs.linked.filament.__y
-            y_i = y * ym
-            y_f = np.round(y / y_span) * y_span * ym  # end links at top or bottom
-            group = tract.__groups["bound_" + kind]
-            group.add(svgwrite.shapes.Line((x_i, y_i), (x_f, y_f), class_=kind))
-        return
-
-
-def _plot_tract(dwg, tract, tract_i, params):
-    """Plot tract in dwg offset to loc for tract_i"""
+        for h in (0, 1):
+            x_0, x_1 = mols["head_x"][m, h], mols["far_x"][m, h]
+            y_i = ys[h] * ym
+            y_f = np.round(ys[h] / y_span) * y_span * ym  # end links at top or bottom
+            group = groups[tracts[h]]["bound_" + kind]
+            for x_i, x_f in _images(x_0, x_1, snap):
+                ends = ((x_i * xm, y_i), (x_f * xm, y_f))
+                group.add(svgwrite.shapes.Line(*ends, class_=kind))
+
+
+def _plot_tract(dwg, tract_i, params):
+    """Plot tract in dwg offset to loc for tract_i, returning its groups"""
     # Locally load params
     ym = params["ym"]
     y_span = params["y_span"]
@@ -131,7 +381,7 @@ def _plot_tract(dwg, tract, tract_i, params):
         svgwrite.shapes.Rect(size=(dwg.attribs["width"], ym * y_span), class_="tract")
     )
     group.translate(0, tract_y_offset)
-    tract.__groups = {
+    groups = {
         "self": group,
         "actin": group.add(svgwrite.container.Group(class_="actin")),
         "anchor": group.add(svgwrite.container.Group(class_="anchor")),
@@ -146,76 +396,71 @@ def _plot_tract(dwg, tract, tract_i, params):
             size=(dwg.attribs["width"], ym * y_span), class_="clear tract"
         )
     )
-    return group
-
-
-def _entry_or_empty_list(dict, key):
-    """Give the value of the key or, if not present, an empty list"""
-    try:
-        return dict[key]
-    except KeyError:
-        return []
+    return groups
 
 
-def plot_world(world, params={}):
-    """Plot a world as a flat, unrolled, svg
-    Parameters
-    ---------
-    world: flins.construct.World
-        World to render as svg
-    params: dict keys in (y_span, y_sep, xm, ym)
-        Set how tall tracts are (y_span), how far apart they are (y_sep), and
-        the multipliers used to convert SVG units to pixels (ym, xm)
-    """
-    # Visualization parameters: manage parameters for passing to sub-plotting
+def _with_defaults(params):
+    """Fill in any visualization parameters not given"""
     defaults = {
         "y_span": 50,  # how tall we treat tracts as being
         "y_sep": 4,  # distance between tracts
         "xm": 2,  # unit to pixel multiplier
         "ym": 2,  # unit to pixel multiplier
+        "window": None,  # range of x to draw, all of it if None
+        "width": None,  # pixels wide to draw, sets xm if given
+        "lod": None,  # molecules per pixel column beyond which we draw strips
+        "bin_px": 4,  # width of density strips
+        "css": CSS_STYLES,  # style sheet giving colors and widths
     }
-    for key, val in defaults.items():
-        if key not in params:
-            params[key] = val
+    defaults.update(params)
+    return defaults
+
+
+def plot_snapshot(snap, params={}):
+    """Plot a snapshot of a world as a flat, unrolled, svg
+
+    Parameters
+    ---------
+    snap: dict
+        Snapshot of a world, from `snapshot`
+    params: dict keys in (y_span, y_sep, xm, ym, window, width, lod, bin_px, css)
+        As for `plot_world`
+    """
+    snap, params = view(snap, params)
     # Locally used params
     y_span = params["y_span"]
     y_sep = params["y_sep"]
     xm = params["xm"]
     ym = params["ym"]
-    n_tracts = len(world.tractspace.all_tracts)  # n to plot
-    x_span = world.tractspace.span  # length of tracts
+    n_tracts = snap["n_tracts"]  # n to plot
+    x_span = snap["span"]  # length of tracts
     y_tot = n_tracts * (y_sep + y_span)  # calculated total height
     # Plotting: Create drawing
     dwg = svgwrite.Drawing(size=(xm * x_span, ym * y_tot), class_="background")
-    dwg.defs.add(dwg.style(CSS_STYLES))  # lets us use class defs from CSS_STYLES
+    dwg.defs.add(dwg.style(params["css"]))  # lets us use class defs from the css
     # Create each tract and plot contents
-    # Tracts
-    for i, tract in enumerate(world.tractspace.all_tracts):
-        _plot_tract(dwg, tract, i, params)
-    # Actins
-    for tract in world.tractspace.all_tracts:
-        actins = _entry_or_empty_list(tract.mols, "actin")
-        n_actin = len(actins)
-        for k, actin in enumerate(actins):
-            actin.__y = y_span * (k + 1) / (n_actin + 1)
-            _plot_actin(actin, params)
-    # Alpha-actinins
-    for tract in world.tractspace.all_tracts:
-        actinins = _entry_or_empty_list(tract.mols, "actinin")
-        n_actinin = len(actinins)
-        for j, actinin in enumerate(actinins):
-            y_actinin = y_span * (j + 1) / (n_actinin + 1)
-            _plot_actinin(actinin, y_actinin, params)
-    # Motors
-    for tract in world.tractspace.all_tracts:
-        motors = _entry_or_empty_list(tract.mols, "motor")
-        n_motor = len(motors)
-        for j, motor in enumerate(motors):
-            y_motor = y_span * (j + 1) / (n_motor + 1)
-            _plot_motor(motor, y_motor, params)
-    # Anchors
-    for tract in world.tractspace.all_tracts:
-        if "anchor" in tract.mols:
-            for anchor in tract.mols["anchor"]:
-                _plot_anchor(anchor, params)
+    groups = [_plot_tract(dwg, i, params) for i in range(n_tracts)]
+    _plot_actins(snap, groups, params)
+    _plot_crosslinkers(snap, groups, params, "actinin")
+    _plot_crosslinkers(snap, groups, params, "motor")
+    _plot_anchors(snap, groups, params)
     return dwg
+
+
+def plot_world(world, params={}):
+    """Plot a world as a flat, unrolled, svg
+    Parameters
+    ---------
+    world: flins.construct.World
+        World to render as svg
+    params: dict keys in (y_span, y_sep, xm, ym, window, width, lod, bin_px, css)
+        Set how tall tracts are (y_span), how far apart they are (y_sep), and
+        the multipliers used to convert SVG units to pixels (ym, xm). Only
+        draw x within window, a (start, end) tuple, at width pixels wide in
+        place of xm. If lod is given, cut tracts into strips bin_px wide and
+        where a strip holds more than lod α-actinins or motors per pixel
+        column, shade the strip by their density (0.25 suits crowded worlds),
+        otherwise draw each. Style
+        with css in place of CSS_STYLES.
+    """
+    return plot_snapshot(snapshot(world), params)
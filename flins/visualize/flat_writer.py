@@ -0,0 +1,352 @@
+# encoding: utf-8
+"""
+Straight to text.
+
+Write flat renders of world snapshots as SVG text directly, giving the same
+document `flat_render.plot_snapshot` builds with svgwrite, but with positions
+worked out with numpy a kind at a time and elements written through a buffer
+rather than assembled as a tree of objects first.
+"""
+
+import functools
+import hashlib
+import io
+
+import numpy as np
+
+from . import flat_render
+
+
+HEADER = (
+    '<svg baseProfile="full" class="background" height="%s" version="1.1" '
+    'width="%s" xmlns="http://www.w3.org/2000/svg" '
+    'xmlns:ev="http://www.w3.org/2001/xml-events" '
+    'xmlns:xlink="http://www.w3.org/1999/xlink"><defs>'
+    '<style type="text/css"><![CDATA[%s]]></style></defs>'
+)
+
+# Groups within each tract in the order they are written, and their classes
+GROUPS = (
+    ("actin", "actin"),
+    ("anchor", "anchor"),
+    ("bound_actinin", "actinin"),
+    ("unbound_actinin", "actinin fade"),
+    ("bound_motor", "motor"),
+    ("bound_motor.post", "motor post"),
+    ("unbound_motor", "motor fade"),
+)
+
+# Order in which `flat_render` adds each kind, elements being sorted by it
+PHASES = {"actin": 0, "actinin": 1, "motor": 2, "anchor": 3}
+
+
+def _num(value):
+    """Format a number as svgwrite does"""
+    return repr(value.item() if hasattr(value, "item") else value)
+
+
+class _Elements:
+    """Side table of the elements of each group of each tract
+
+    Elements are added in batches sharing a group and a text template, with
+    the tract, sort key, and values filling the template of each. The sort
+    key gives the order `flat_render` would have added an element in, so
+    elements worked out a kind at a time can be written in the same order.
+    Elements are only formatted as text when their tract is written.
+    """
+
+    def __init__(self, n_tracts):
+        self.n_tracts = n_tracts
+        self.batches = []
+        self._split = {}  # rows of each batch in each tract
+
+    def add(self, tracts, group, phase, m, sub, template, columns, quanta=None):
+        """Add a batch of elements
+
+        Parameters
+        ----------
+        tracts, m, sub: np.ndarray
+            Tract each element is drawn in, and the molecule and part of it
+            that each is, sorting elements as `flat_render` adds them
+        group: str
+            Name of the group the elements go in, see `GROUPS`
+        phase: int
+            Order in which the kind is added, see `PHASES`
+        template: str
+            Text of each element with a place for each column
+        columns: list of np.ndarray
+            Values filling the template, in pixels
+        quanta: list of float, optional
+            How finely each column is resolved by `fingerprints`, defaults to
+            whole pixels
+        """
+        if len(tracts) == 0:
+            return
+        quanta = [1.0] * len(columns) if quanta is None else quanta
+        self.batches.append(
+            (np.asarray(tracts), group, phase, m, sub, template, columns, quanta)
+        )
+
+    def _rows(self, i):
+        """Rows of the ith batch in each tract, in order"""
+        if i not in self._split:
+            tracts = self.batches[i][0]
+            order = np.argsort(tracts, kind="stable")
+            bounds = np.searchsorted(tracts[order], np.arange(self.n_tracts + 1))
+            rows = [order[bounds[t] : bounds[t + 1]] for t in range(self.n_tracts)]
+            self._split[i] = rows
+        return self._split[i]
+
+    def fingerprints(self):
+        """A digest of what is drawn in each group of each tract
+
+        Digests are of the elements' templates and values rounded to their
+        quanta, whole pixels for positions.
+        """
+        digests = {}
+        for i, batch in enumerate(self.batches):
+            _, group, phase, m, sub, template, columns, quanta = batch
+            ident = ("%i %s" % (phase, template)).encode()
+            quantized = np.stack(
+                [m, sub] + [np.round(c / q) for c, q in zip(columns, quanta)], axis=1
+            ).astype(np.int64)
+            for tract, rows in enumerate(self._rows(i)):
+                if len(rows) > 0:
+                    key = (tract, group)
+                    if key not in digests:
+                        digests[key] = hashlib.blake2b(digest_size=16)
+                    digests[key].update(ident)
+                    digests[key].update(quantized[rows].tobytes())
+        return {key: digest.digest() for key, digest in digests.items()}
+
+    def group_text(self, tract, group):
+        """Text of a group of a tract, its elements formatted and in order"""
+        name = dict(GROUPS)[group]
+        elements = []
+        for i, batch in enumerate(self.batches):
+            _, batch_group, phase, m, sub, template, columns, _ = batch
+            if batch_group != group:
+                continue
+            rows = self._rows(i)[tract]
+            values = zip(*[column[rows].tolist() for column in columns])
+            keys = zip([phase] * len(rows), m[rows].tolist(), sub[rows].tolist())
+            elements.extend(zip(keys, [template % value for value in values]))
+        if len(elements) == 0:
+            return '<g class="%s" />' % name
+        elements.sort()
+        return '<g class="%s">%s</g>' % (name, "".join([t for _, t in elements]))
+
+    def write(self, out, tract, rect, offset, cache=None, fingerprints=None):
+        """Write a tract's group and all the groups within it
+
+        With a cache, groups whose fingerprints are unchanged are reused.
+        """
+        out.write('<g transform="translate(0,%s)">' % _num(offset))
+        out.write('<rect class="tract" ' + rect)
+        for group, _ in GROUPS:
+            if cache is None:
+                out.write(self.group_text(tract, group))
+                continue
+            key = (tract, group)
+            write = functools.partial(self.group_text, tract, group)
+            out.write(cache.fragment(key, fingerprints.get(key), write))
+        out.write('<rect class="clear tract" ' + rect)
+        out.write("</g>")
+
+
+LINE = '<line %sx1="%%r" x2="%%r" y1="%%r" y2="%%r" />'
+CIRCLE = '<circle class="%s" cx="%%r" cy="%%r" r="%i" />'
+ELLIPSE = '<ellipse cx="%r" cy="%r" rx="5" ry="1" />'
+DENSITY = (
+    '<rect class="density %s" height="%s" opacity="%%.3f" width="%s" '
+    'x="%%r" y="0" />'
+)
+
+
+def _add_actins(elements, snap, params):
+    """Each filament along its row"""
+    actin = snap["actin"]
+    xm, ym = params["xm"], params["ym"]
+    y = flat_render._row_y(actin["row"], actin["rows"], params) * ym
+    start, end, i, image = flat_render._image_arrays(actin["start"], actin["end"], snap)
+    columns = [start * xm, end * xm, y[i], y[i]]
+    phase, template = PHASES["actin"], LINE % ""
+    elements.add(actin["tract"][i], "actin", phase, i, image, template, columns)
+
+
+def _add_anchors(elements, snap, params):
+    """Each anchor on its filament"""
+    anchor = snap["anchor"]
+    x = flat_render._wrap(anchor["x"], snap) * params["xm"]
+    y = flat_render._row_y(anchor["row"], anchor["rows"], params) * params["ym"]
+    i = np.arange(len(x))
+    phase, template = PHASES["anchor"], CIRCLE % ("anchor", 4)
+    elements.add(anchor["tract"], "anchor", phase, i, 0 * i, template, [x, y])
+
+
+def _add_density(elements, snap, params, kind, counts):
+    """Crowded strips of a kind, see `flat_render._plot_density`"""
+    bin_px = params["bin_px"]
+    saturate = 4 * params["lod"] * bin_px
+    height = params["y_span"] * params["ym"]
+    tracts, i = np.nonzero(counts)
+    opacity = np.minimum(1.0, counts[tracts, i] / saturate)
+    template = DENSITY % (kind, _num(height), _num(bin_px))
+    columns, quanta = [opacity, i * bin_px], [1e-3, 1.0]
+    phase, m = PHASES[kind], np.full(len(i), -1)
+    elements.add(tracts, "bound_" + kind, phase, m, i, template, columns, quanta)
+
+
+def _add_bodies(elements, snap, params, kind, drawn):
+    """Bodies of fully bound molecules, see `flat_render._plot_body`"""
+    mols, phase = snap[kind], PHASES[kind]
+    xm, ym, y_span = params["xm"], params["ym"], params["y_span"]
+    tracts = mols["head_tract"]
+    ys = flat_render._row_y(mols["head_row"], mols["head_rows"], params)
+    both = drawn & mols["bound"].all(axis=1)
+    # Same tract, one line between the heads
+    same = np.flatnonzero(both & (tracts[:, 0] == tracts[:, 1]))
+    ends = [mols["head_x"][same, 0], mols["far_x"][same, 0]]
+    x0, x1, i, image = flat_render._image_arrays(*ends, snap)
+    m = same[i]
+    y0, y1 = ys[m, 0] * ym, ys[m, 1] * ym
+    # Different tracts, a line from each head to its tract's edge
+    different = np.flatnonzero(both & (tracts[:, 0] != tracts[:, 1]))
+    parts = [(x0, x1, y0, y1, m, image, tracts[m, 0])]
+    for h in (0, 1):
+        ends = [mols["head_x"][different, h], mols["far_x"][different, h]]
+        x0, x1, i, image = flat_render._image_arrays(*ends, snap)
+        m = different[i]
+        y_i = ys[m, h] * ym
+        y_f = np.round(ys[m, h] / y_span) * y_span * ym
+        parts.append((x0, x1, y_i, y_f, m, image + 3 * h, tracts[m, h]))
+    for x0, x1, y0, y1, m, sub, tract in parts:
+        for name, post in ((kind, False), (kind + ".post", True)):
+            w = mols["post"][m] == post
+            template = LINE % ('class="%s" ' % name)
+            columns = [x0[w] * xm, x1[w] * xm, y0[w], y1[w]]
+            group = "bound_" + name
+            elements.add(tract[w], group, phase, m[w], sub[w], template, columns)
+
+
+def _add_crosslinkers(elements, snap, params, kind):
+    """α-actinins or motors, see `flat_render._plot_crosslinkers`"""
+    mols, phase = snap[kind], PHASES[kind]
+    xm, ym = params["xm"], params["ym"]
+    counts, crowded = flat_render._crowded(snap, params, kind)
+    if counts is not None:
+        _add_density(elements, snap, params, kind, counts)
+    drawn = ~crowded
+    bound = mols["bound"]
+    # Unbound, faded in their own tract
+    m = np.flatnonzero(drawn & ~bound.any(axis=1))
+    x = flat_render._wrap(mols["x"][m], snap) * xm
+    y = flat_render._row_y(mols["row"][m], mols["rows"][m], params) * ym
+    group = "unbound_" + kind
+    elements.add(mols["tract"][m], group, phase, m, 0 * m, ELLIPSE, [x, y])
+    _add_bodies(elements, snap, params, kind, drawn)
+    # Bound heads, on their filaments
+    for h in (0, 1):
+        m = np.flatnonzero(drawn & bound[:, h])
+        x = flat_render._wrap(mols["head_x"][m, h], snap) * xm
+        rows = mols["head_row"][m, h], mols["head_rows"][m, h]
+        y = flat_render._row_y(*rows, params) * ym
+        sub, template = np.full(len(m), 10 + h), CIRCLE % (kind, 2)
+        tracts = mols["head_tract"][m, h]
+        elements.add(tracts, "bound_" + kind, phase, m, sub, template, [x, y])
+
+
+class FragmentCache:
+    """Svg text of tracts' groups from earlier frames, reused while unchanged
+
+    The text of each group of each tract (its actin, bound α-actinins, faded
+    unbound motors, and so on) is kept with a fingerprint of what is drawn in
+    it: the shapes and their positions rounded to whole pixels. When a
+    group's fingerprint is unchanged from the last frame its text is reused,
+    so groups that haven't moved, or have only moved by less than a pixel,
+    cost nothing to render. In a steady state that is most bound groups, as
+    bound proteins only move with their filaments. Changes to the layout clear
+    the cache.
+    """
+
+    def __init__(self):
+        self.fragments = {}
+        self.layout = None
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self):
+        """String representation of a fragment cache"""
+        return "FragmentCache of %i groups, %i hits, %i misses" % (
+            len(self.fragments),
+            self.hits,
+            self.misses,
+        )
+
+    def fragment(self, key, fingerprint, write):
+        """Cached text of a group, or that given by write() if it has changed"""
+        cached = self.fragments.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        text = write()
+        self.fragments[key] = (fingerprint, text)
+        return text
+
+
+def write_snapshot(snap, out, params={}, cache=None):
+    """Write a snapshot of a world as a flat svg
+
+    Parameters
+    ----------
+    snap: dict
+        Snapshot of a world, from `flat_render.snapshot`
+    out: file-like
+        Where to write the svg text
+    params: dict
+        As for `flat_render.plot_world`
+    cache: FragmentCache, optional
+        Reuse the text of groups of tracts that look as they did when last
+        written with this cache
+    """
+    snap, params = flat_render.view(snap, params)
+    y_span, y_sep = params["y_span"], params["y_sep"]
+    xm, ym = params["xm"], params["ym"]
+    width = xm * snap["span"]
+    height = ym * snap["n_tracts"] * (y_sep + y_span)
+    elements = _Elements(snap["n_tracts"])
+    _add_actins(elements, snap, params)
+    _add_crosslinkers(elements, snap, params, "actinin")
+    _add_crosslinkers(elements, snap, params, "motor")
+    _add_anchors(elements, snap, params)
+    rect = 'height="%s" width="%s" x="0" y="0" />' % (_num(ym * y_span), _num(width))
+    out.write(HEADER % (_num(height), _num(width), params["css"]))
+    fingerprints = None
+    if cache is not None:
+        layout = (sorted(params.items()), snap["span"], snap["n_tracts"])
+        if cache.layout != layout:
+            cache.fragments, cache.layout = {}, layout
+        fingerprints = elements.fingerprints()
+    for tract in range(snap["n_tracts"]):
+        offset = ym * (tract * y_span + (tract + 0.5) * y_sep)
+        elements.write(out, tract, rect, offset, cache, fingerprints)
+    out.write("</svg>")
+
+
+def plot_snapshot(snap, params={}, cache=None):
+    """A snapshot of a world as flat svg text, see `write_snapshot`"""
+    out = io.StringIO()
+    write_snapshot(snap, out, params, cache)
+    return out.getvalue()
+
+
+def plot_world(world, params={}, cache=None):
+    """A world as flat svg text, as `flat_render.plot_world(...).tostring()`"""
+    return plot_snapshot(flat_render.snapshot(world), params, cache)
+
+
+def save(snap, filename, params={}, cache=None):
+    """Write a snapshot of a world as a flat svg file"""
+    with open(filename, "w") as out:
+        write_snapshot(snap, out, params, cache)
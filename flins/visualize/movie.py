@@ -3,7 +3,11 @@
 Support for movie generation
 """
 
+import collections
+import concurrent.futures
+import multiprocessing
 import os
+import queue
 import subprocess
 import shutil
 import tempfile
@@ -11,13 +15,59 @@ import tqdm
 import IPython.display
 from . import svg
 from . import flat_render
+from . import flat_writer
+from . import trajectory
+
+
+def _ordered(pool, fn, items, window):
+    """Map fn over items on a pool, yielding results in order
+
+    At most window items are in flight at once, so results waiting on a slow
+    consumer don't pile up in memory.
+    """
+    pending = collections.deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(fn, item))
+    while len(pending) > 0:
+        yield pending.popleft().result()
+
+
+def _convert(svg_fn, png_fn=None):
+    """Convert an svg to png, returning the png's bytes if no file is given"""
+    call = ["rsvg-convert", svg_fn]
+    if png_fn is not None:
+        call += ["-o", png_fn]
+    done = subprocess.run(call, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if done.returncode != 0:
+        raise Exception("couldn't convert %s: %s" % (svg_fn, done.stderr.decode()))
+    return done.stdout
+
+
+def _render(jobs):
+    """Render snapshots to svgs as they arrive, until sent None"""
+    cache = flat_writer.FragmentCache()
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        snap, params, filename = job
+        flat_writer.save(snap, filename, params, cache)
 
 
 class MovieGen:
     """Generate a movie from a set of steps in the world or SVGs"""
 
     def __init__(
-        self, outname="out", temp_dir=None, fps=25, zoom=(1.0, 1.0), quiet=False
+        self,
+        outname="out",
+        temp_dir=None,
+        fps=25,
+        zoom=(1.0, 1.0),
+        quiet=False,
+        workers=0,
+        queue_size=16,
     ):
         """Support the creation of movies from runs
 
@@ -33,6 +83,12 @@ class MovieGen:
             x and y zoom levels
         quiet: boolean
             don't show current status if True
+        workers: int (0)
+            Processes rendering worlds in the background, if 0 worlds are
+            rendered as they are added
+        queue_size: int (16)
+            How many worlds may wait to be rendered before `add_world` waits
+            for the workers to catch up
         """
         # Create the dir where we'll do the processing
         if temp_dir is None:
@@ -55,11 +111,18 @@ class MovieGen:
         self._quiet = quiet
         self._save_renders = False  # secret way to save files
         self._movie_written = False
+        # Background rendering, started on the first world added
+        self._workers = []
+        self._n_workers = workers
+        self._queue_size = queue_size
+        self._jobs = None
+        self._cache = flat_writer.FragmentCache()  # for rendering inline
 
     def clean_up(self):
         """Delete the temporary renders and the temp dirs if they were
         automatically created
         """
+        self.finish_renders()
         if self.temp_delete:
             shutil.rmtree(self.temp_dir, True)
         elif not self._save_renders:
@@ -70,44 +133,177 @@ class MovieGen:
                     pass  # we don't care if the files were already cleaned
 
     def __del__(self):
-        """Call clean up if not already done"""
-        self.clean_up()
+        """Call clean up if not already done
+
+        Nothing can use the frames of an unreachable movie, so its render
+        workers are stopped rather than waited on, and nothing is raised as
+        the interpreter may be shutting down around us.
+        """
+        try:
+            for worker in self._workers:
+                worker.terminate()
+            self._workers = []
+            self.clean_up()
+        except Exception:
+            pass
+
+    def _next_filename(self):
+        """Claim the name of the next frame's svg"""
+        assert len(self.svgs) < 1_000_000
+        filename = os.path.join(self.temp_dir, "%06i.svg" % (len(self.svgs) + 1))
+        self.svgs.append(filename)
+        return filename
+
+    def _start_renders(self):
+        """Start the background rendering workers"""
+        self._jobs = multiprocessing.Queue(self._queue_size)
+        for _ in range(self._n_workers):
+            worker = multiprocessing.Process(
+                target=_render, args=(self._jobs,), daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _queue_render(self, job):
+        """Queue a job, waiting while the queue is full"""
+        while True:
+            try:
+                self._jobs.put(job, timeout=1)
+                return
+            except queue.Full:
+                if not any([worker.is_alive() for worker in self._workers]):
+                    raise Exception("movie rendering workers have all died")
+
+    def finish_renders(self):
+        """Wait for all worlds added to be rendered and stop the workers"""
+        workers = getattr(self, "_workers", [])
+        if len(workers) == 0:
+            return
+        for worker in workers:
+            if worker.is_alive():
+                self._queue_render(None)
+        for worker in workers:
+            worker.join()
+        self._workers, self._jobs = [], None
+        if any([worker.exitcode != 0 for worker in workers]):
+            raise Exception("movie rendering worker failed, frames are missing")
 
     def add_world(self, world):
-        """Add a world and render it as an svg"""
+        """Add a world and render it as an svg
+
+        With workers, a snapshot of the world is queued to be rendered in the
+        background and the world can be stepped on at once. Groups of tracts
+        that look as they did in the last frame a renderer drew are reused,
+        see `flat_writer.FragmentCache`.
+        """
         xm, ym = self._zoom
-        dwg = flat_render.plot_world(world, {"xm": xm, "ym": ym})
-        self.add_svg(dwg)
+        params = {"xm": xm, "ym": ym}
+        snap = flat_render.snapshot(world)
+        if self._n_workers == 0:
+            flat_writer.save(snap, self._next_filename(), params, self._cache)
+            return
+        if len(self._workers) == 0:
+            self._start_renders()
+        self._queue_render((snap, params, self._next_filename()))
+
+    def add_trajectory(self, path, frames=None, params=None, workers=None):
+        """Add frames of a recorded trajectory, rendered on a process pool
+
+        Parameters
+        ----------
+        path: str
+            Directory of a trajectory, see `trajectory.TrajectoryWriter`
+        frames: iterable of int
+            Which frames to add, defaults to all of them
+        params: dict
+            As for `flat_render.plot_world`, zoom defaulting to this movie's
+        workers: int
+            Processes to render with, defaults to the number of cpus
+        """
+        xm, ym = self._zoom
+        params = dict({"xm": xm, "ym": ym}, **(params or {}))
+        if frames is None:
+            frames = range(len(trajectory.Trajectory(path)))
+        frames = list(frames)
+        n = len(frames)
+        filenames = [self._next_filename() for _ in range(n)]
+        bar = None if self._quiet else tqdm.tqdm(total=n, desc="render", leave=False)
+        progress = None if bar is None else bar.update
+        trajectory.render(path, filenames, frames, params, workers, progress)
+        if bar is not None:
+            bar.close()
 
     def add_svg(self, dwg):
         """Render an svg to the temp dir"""
-        assert len(self.svgs) < 1_000_000
-        filename = os.path.join(self.temp_dir, "%06i.svg" % (len(self.svgs) + 1))
-        svg.save(dwg, filename)
-        self.svgs.append(filename)
+        svg.save(dwg, self._next_filename())
 
-    def write_movie(self):
-        """Convert svgs to pngs and then to an mp4 via ffmpeg"""
-        # Writing svgs to pngs
-        self.pngs = []
+    def _progress(self, frames, task):
+        """Wrap frames in a progress bar unless quiet"""
         if self._quiet:
-            svg_iter = self.svgs
-        else:
-            svg_iter = tqdm.tqdm(self.svgs, "svg->png", leave=False)
-        for svg_fn in svg_iter:
-            fn = os.path.splitext(svg_fn)[0]
-            call = "rsvg-convert -o %s.png %s.svg" % (fn, fn)
-            subprocess.run(call, shell=True)
-            self.pngs.append(fn + ".png")
-        # Convert pngs to mp4
-        call = "ffmpeg -y -r %f " % self._fps
-        call += "-i %s " % os.path.join(self.temp_dir, "%06d.png")
-        call += "-c:v libx264 -vf fps=25 -pix_fmt yuv420p %s " % self.outname
+            return frames
+        return tqdm.tqdm(frames, task, total=len(self.svgs), leave=False)
+
+    def _ffmpeg_call(self, source):
+        """Arguments to run ffmpeg encoding frames from a source"""
+        call = ["ffmpeg", "-y", "-r", "%f" % self._fps] + source
+        call += ["-c:v", "libx264", "-vf", "fps=25", "-pix_fmt", "yuv420p"]
+        call += [self.outname]
         if self._quiet:
-            call += "-loglevel panic"
-        subprocess.run(call, shell=True)
+            call += ["-loglevel", "panic"]
+        return call
+
+    def write_movie(self, workers=None, pipe=False):
+        """Convert svgs to pngs and then to an mp4 via ffmpeg
+
+        Parameters
+        ----------
+        workers: int
+            How many conversions to run at once, defaults to the number of
+            cpus
+        pipe: boolean
+            Stream pngs straight into ffmpeg, in order, rather than writing
+            them to the temp dir first
+        """
+        self.finish_renders()
+        if workers is None:
+            workers = os.cpu_count() or 1
+        with concurrent.futures.ThreadPoolExecutor(workers) as pool:
+            if pipe:
+                self._pipe_movie(pool, workers)
+            else:
+                self._convert_movie(pool, workers)
         self._movie_written = True
 
+    def _convert_movie(self, pool, workers):
+        """Write pngs in parallel to the temp dir, then encode them"""
+        self.pngs = [os.path.splitext(fn)[0] + ".png" for fn in self.svgs]
+        converted = _ordered(
+            pool, lambda fns: _convert(*fns), zip(self.svgs, self.pngs), 2 * workers
+        )
+        for _ in self._progress(converted, "svg->png"):
+            pass
+        source = ["-i", os.path.join(self.temp_dir, "%06d.png")]
+        done = subprocess.run(self._ffmpeg_call(source))
+        if done.returncode != 0:
+            raise Exception("ffmpeg failed writing %s" % self.outname)
+
+    def _pipe_movie(self, pool, workers):
+        """Convert svgs in parallel, streaming the pngs into ffmpeg"""
+        self.pngs = []
+        source = ["-f", "image2pipe", "-c:v", "png", "-i", "-"]
+        ffmpeg = subprocess.Popen(self._ffmpeg_call(source), stdin=subprocess.PIPE)
+        try:
+            converted = _ordered(pool, _convert, self.svgs, 2 * workers)
+            for png in self._progress(converted, "svg->mp4"):
+                ffmpeg.stdin.write(png)
+        except BrokenPipeError:
+            pass  # ffmpeg has stopped, its return code says why
+        finally:
+            ffmpeg.stdin.close()
+            returncode = ffmpeg.wait()
+        if returncode != 0:
+            raise Exception("ffmpeg failed writing %s" % self.outname)
+
     def show(self):
         """Use ipython to display movie, intended for use in notebooks"""
         if not self._movie_written:
@@ -0,0 +1,261 @@
+# encoding: utf-8
+"""
+Paint by numbers.
+
+Render worlds straight into RGB arrays, laid out and colored as the flat SVG
+renders of `flat_render` are, but stamped with numpy rather than built up as
+an SVG document. Frames can go straight to an encoder or be saved with numpy.
+"""
+
+import re
+
+import matplotlib.colors
+import numpy as np
+
+from . import flat_render
+
+
+def _styles(css=flat_render.CSS_STYLES):
+    """Properties of each class in a style sheet, as {class: {prop: value}}"""
+    styles = {}
+    for name, body in re.findall(r"\.([\w-]+)\s*\{([^}]*)\}", css):
+        props = [prop.split(":") for prop in body.split(";") if ":" in prop]
+        styles[name] = {k.strip(): v.strip() for k, v in props}
+    return styles
+
+
+def _color(styles, name, prop):
+    """RGB color of a class's property as uint8s"""
+    rgb = matplotlib.colors.to_rgb(styles[name][prop])
+    return np.round(np.array(rgb) * 255).astype(np.uint8)
+
+
+def _width(styles, name):
+    """Stroke width in pixels of a class, SVG's default being 1"""
+    return float(styles[name].get("stroke-width", "1px").rstrip("px"))
+
+
+def _disc(radius):
+    """Pixel offsets covered by a disc centered on a pixel"""
+    r = int(np.ceil(radius))
+    dy, dx = np.mgrid[-r : r + 1, -r : r + 1]
+    inside = dx**2 + dy**2 <= radius**2 + 1e-9
+    return np.stack([dx[inside], dy[inside]], axis=1)
+
+
+def _ellipse(rx, ry):
+    """Pixel offsets covered by an axis aligned ellipse centered on a pixel"""
+    r = int(np.ceil(max(rx, ry)))
+    dy, dx = np.mgrid[-r : r + 1, -r : r + 1]
+    inside = (dx / rx) ** 2 + (dy / ry) ** 2 <= 1 + 1e-9
+    return np.stack([dx[inside], dy[inside]], axis=1)
+
+
+def _stamp(image, x, y, kernel, color, alpha=1.0):
+    """Stamp a kernel of pixel offsets at each x, y in one color
+
+    Semi-transparent stamps are blended with what was beneath them as a group,
+    overlapping stamps don't darken each other, as with SVG group opacity.
+    """
+    if len(x) == 0:
+        return
+    px = (np.rint(x).astype(int)[:, None] + kernel[:, 0]).ravel()
+    py = (np.rint(y).astype(int)[:, None] + kernel[:, 1]).ravel()
+    height, width = image.shape[:2]
+    inside = (px >= 0) & (px < width) & (py >= 0) & (py < height)
+    px, py = px[inside], py[inside]
+    if alpha >= 1:
+        image[py, px] = color
+    else:
+        blend = (1 - alpha) * image[py, px] + alpha * color
+        image[py, px] = np.round(blend).astype(np.uint8)
+
+
+def _fill(image, x0, y0, x1, y1, color):
+    """Fill the pixels of a rectangle, given in pixels, with one color"""
+    height, width = image.shape[:2]
+    x0, x1 = [min(max(int(round(x)), 0), width) for x in (x0, x1)]
+    y0, y1 = [min(max(int(round(y)), 0), height) for y in (y0, y1)]
+    if x1 > x0 and y1 > y0:
+        # Filling rows as flat runs of bytes is far quicker than per pixel
+        rows = image[y0:y1, x0:x1].reshape(y1 - y0, -1)
+        rows[:] = np.tile(color, x1 - x0)
+
+
+def _lines(image, x0, y0, x1, y1, width, color, alpha=1.0):
+    """Draw lines of a given stroke width between each pair of points
+
+    Each line is sampled at least once a pixel along its length and a disc as
+    wide as the stroke stamped at each sample.
+    """
+    x0, y0, x1, y1 = [np.asarray(v, dtype=float) for v in (x0, y0, x1, y1)]
+    if len(x0) == 0:
+        return
+    n = np.ceil(np.hypot(x1 - x0, y1 - y0)).astype(int) + 1
+    line = np.repeat(np.arange(len(n)), n)
+    first = np.cumsum(n) - n
+    t = (np.arange(n.sum()) - first[line]) / np.maximum(n - 1, 1)[line]
+    x = x0[line] + t * (x1 - x0)[line]
+    y = y0[line] + t * (y1 - y0)[line]
+    _stamp(image, x, y, _disc(width / 2), color, alpha)
+
+
+class _Canvas:
+    """An RGB array laid out in tracts as `flat_render.plot_snapshot` does"""
+
+    def __init__(self, snap, params, styles):
+        self.snap, self.params, self.styles = snap, params, styles
+        y_span, y_sep = params["y_span"], params["y_sep"]
+        width = int(round(params["xm"] * snap["span"]))
+        height = int(round(params["ym"] * snap["n_tracts"] * (y_sep + y_span)))
+        self.image = np.empty((height, width, 3), dtype=np.uint8)
+        background = _color(styles, "background", "background-color")
+        _fill(self.image, 0, 0, width, height, background)
+
+    def offset(self, tract):
+        """Top of each tract in pixels"""
+        p = self.params
+        return p["ym"] * (tract * p["y_span"] + (tract + 0.5) * p["y_sep"])
+
+    def row_y(self, row, rows, tract):
+        """Pixel height of rows within their tracts"""
+        y = flat_render._row_y(row, rows, self.params)
+        return y * self.params["ym"] + self.offset(tract)
+
+    def lines(self, x0, x1, y0, y1, name, width=None, alpha=1.0):
+        """Draw lines in a class's style, x in nm, across periodic edges"""
+        x0, x1, i, _ = flat_render._image_arrays(x0, x1, self.snap)
+        xm, color = self.params["xm"], _color(self.styles, name, "stroke")
+        width = _width(self.styles, name) if width is None else width
+        y0, y1 = np.asarray(y0)[i], np.asarray(y1)[i]
+        _lines(self.image, x0 * xm, y0, x1 * xm, y1, width, color, alpha)
+
+    def shapes(self, x, y, kernel, name, alpha=1.0):
+        """Stamp filled and stroked shapes in a class's style, x in nm"""
+        x = flat_render._wrap(np.asarray(x, dtype=float), self.snap)
+        color = _color(self.styles, name, "fill")
+        _stamp(self.image, x * self.params["xm"], y, kernel, color, alpha)
+
+
+def _draw_tracts(canvas, outline):
+    """Fill each tract or draw its outline"""
+    image, styles = canvas.image, canvas.styles
+    width, height = image.shape[1], canvas.params["ym"] * canvas.params["y_span"]
+    fill, stroke = _color(styles, "tract", "fill"), _color(styles, "tract", "stroke")
+    half = _width(styles, "tract") / 2
+    for tract in range(canvas.snap["n_tracts"]):
+        top, bottom = canvas.offset(tract), canvas.offset(tract) + height
+        if not outline:
+            _fill(image, 0, top, width, bottom, fill)
+            continue
+        _fill(image, 0, top - half, width, top + half, stroke)
+        _fill(image, 0, bottom - half, width, bottom + half, stroke)
+        _fill(image, -half, top, half, bottom, stroke)
+        _fill(image, width - half, top, width + half, bottom, stroke)
+
+
+def _draw_actins(canvas):
+    """Draw each filament on its row"""
+    actin = canvas.snap["actin"]
+    y = canvas.row_y(actin["row"], actin["rows"], actin["tract"])
+    canvas.lines(actin["start"], actin["end"], y, y, "actin")
+
+
+def _draw_anchors(canvas):
+    """Stamp each anchor on its filament"""
+    anchor = canvas.snap["anchor"]
+    y = canvas.row_y(anchor["row"], anchor["rows"], anchor["tract"])
+    radius = 4 + _width(canvas.styles, "anchor") / 2
+    canvas.shapes(anchor["x"], y, _disc(radius), "anchor")
+
+
+def _draw_bodies(canvas, kind, post):
+    """Draw the bodies of fully bound molecules, spanning between their heads"""
+    mols, params = canvas.snap[kind], canvas.params
+    both = mols["bound"].all(axis=1) & (mols["post"] == post)
+    tracts = mols["head_tract"]
+    ys = flat_render._row_y(mols["head_row"], mols["head_rows"], params)
+    ends = []
+    same = both & (tracts[:, 0] == tracts[:, 1])
+    offset = canvas.offset(tracts)
+    ends.append(
+        (
+            mols["head_x"][same, 0],
+            mols["far_x"][same, 0],
+            ys[same, 0] * params["ym"] + offset[same, 0],
+            ys[same, 1] * params["ym"] + offset[same, 0],
+        )
+    )
+    different = both & (tracts[:, 0] != tracts[:, 1])
+    for h in (0, 1):
+        y = ys[different, h]
+        y_f = np.round(y / params["y_span"]) * params["y_span"]
+        top = offset[different, h]
+        ends.append(
+            (
+                mols["head_x"][different, h],
+                mols["far_x"][different, h],
+                y * params["ym"] + top,
+                y_f * params["ym"] + top,
+            )
+        )
+    x0, x1, y0, y1 = [np.concatenate(each) for each in zip(*ends)]
+    width = _width(canvas.styles, "post") if post else None
+    canvas.lines(x0, x1, y0, y1, kind, width)
+
+
+def _draw_crosslinkers(canvas, kind):
+    """Draw bound α-actinins or motors, then faded unbound ones"""
+    mols, styles = canvas.snap[kind], canvas.styles
+    stroke = _width(styles, kind)
+    _draw_bodies(canvas, kind, False)
+    if kind == "motor":
+        _draw_bodies(canvas, kind, True)
+    bound = mols["bound"]
+    y = canvas.row_y(mols["head_row"], mols["head_rows"], mols["head_tract"])
+    canvas.shapes(mols["head_x"][bound], y[bound], _disc(2 + stroke / 2), kind)
+    unbound = ~bound.any(axis=1)
+    y = canvas.row_y(mols["row"], mols["rows"], mols["tract"])[unbound]
+    kernel = _ellipse(5 + stroke / 2, 1 + stroke / 2)
+    alpha = float(styles["fade"]["opacity"])
+    canvas.shapes(mols["x"][unbound], y, kernel, kind, alpha)
+
+
+def plot_snapshot(snap, params={}):
+    """Render a snapshot of a world into an RGB array
+
+    Parameters
+    ----------
+    snap: dict
+        Snapshot of a world, from `flat_render.snapshot`
+    params: dict keys in (y_span, y_sep, xm, ym, window, width, css)
+        As for `flat_render.plot_world`, the multipliers giving pixels per
+        unit. Every molecule is drawn, as crowding costs nothing in pixels.
+
+    Returns
+    -------
+    image: np.ndarray
+        Array of shape (height, width, 3) and dtype uint8
+    """
+    snap, params = flat_render.view(snap, params)
+    canvas = _Canvas(snap, params, _styles(params["css"]))
+    _draw_tracts(canvas, outline=False)
+    _draw_actins(canvas)
+    _draw_anchors(canvas)
+    _draw_crosslinkers(canvas, "actinin")
+    _draw_crosslinkers(canvas, "motor")
+    _draw_tracts(canvas, outline=True)
+    return canvas.image
+
+
+def plot_world(world, params={}):
+    """Render a world into an RGB array, as `flat_render.plot_world` would
+
+    Parameters
+    ----------
+    world: flins.construct.World
+        World to render
+    params: dict keys in (y_span, y_sep, xm, ym)
+        As for `flat_render.plot_world`
+    """
+    return plot_snapshot(flat_render.snapshot(world), params)
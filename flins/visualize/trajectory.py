@@ -0,0 +1,236 @@
+# encoding: utf-8
+"""
+Roll the tape.
+
+Record the state of a world needed to draw it, frame after frame, to a
+directory on disk, and render movies from such recordings later, as often as
+wanted and at whatever zoom or style, on a pool of processes rather than in
+step with the simulation.
+
+A trajectory directory holds a `layout.json`, giving the span, periodicity and
+number of tracts along with how many frames are recorded and the first frame
+of each chunk, and the frames themselves, `flat_render` snapshots in chunks of
+consecutive frames, one compressed `.npz` file per chunk. Chunks are usually
+full, but needn't be if flushed early.
+"""
+
+import json
+import multiprocessing
+import os
+
+import numpy as np
+
+from . import flat_render
+from . import flat_writer
+
+
+LAYOUT = "layout.json"
+KINDS = ("actin", "anchor", "actinin", "motor")
+
+
+def _chunk_name(path, chunk):
+    """Path of the file holding a chunk of frames"""
+    return os.path.join(path, "chunk_%06i.npz" % chunk)
+
+
+class TrajectoryWriter:
+    """Record snapshots of a world to a trajectory directory"""
+
+    def __init__(self, path, chunk=100):
+        """Start a new trajectory
+
+        Parameters
+        ----------
+        path : str
+            Directory to record to, created if needed, mustn't hold a
+            trajectory already
+        chunk : int
+            How many frames to keep in memory before writing them as a chunk
+        """
+        if os.path.exists(os.path.join(path, LAYOUT)):
+            raise Exception("there's already a trajectory at %s" % path)
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.chunk = chunk
+        self.layout = None
+        self.n_frames = 0
+        self.starts = []  # first frame of each chunk written
+        self._frames = []
+
+    def __str__(self):
+        """String representation of a trajectory writer"""
+        return "TrajectoryWriter of %i frames to %s" % (self.n_frames, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add_world(self, world):
+        """Record the current state of a world as the next frame"""
+        snap = flat_render.snapshot(world)
+        snap["tick"], snap["time"] = world.clock.tick, world.clock.time
+        self.add_snapshot(snap)
+
+    def add_snapshot(self, snap):
+        """Record a snapshot as the next frame"""
+        layout = {k: snap[k] for k in ("span", "periodic", "n_tracts")}
+        if self.layout is None:
+            self.layout = layout
+        elif layout != self.layout:
+            raise Exception("frames of a trajectory must share a layout")
+        self._frames.append(snap)
+        self.n_frames += 1
+        if len(self._frames) >= self.chunk:
+            self.flush()
+
+    def flush(self):
+        """Write frames held in memory as a chunk"""
+        if len(self._frames) == 0:
+            return
+        frames, arrays = self._frames, {}
+        arrays["tick"] = np.array([f.get("tick", -1) for f in frames], dtype=int)
+        arrays["time"] = np.array([f.get("time", np.nan) for f in frames])
+        for kind in KINDS:
+            fields = frames[0][kind].keys()
+            arrays[kind + ".count"] = [len(f[kind]["tract"]) for f in frames]
+            for field in fields:
+                arrays[kind + "." + field] = np.concatenate(
+                    [f[kind][field] for f in frames]
+                )
+        np.savez_compressed(_chunk_name(self.path, len(self.starts)), **arrays)
+        self.starts.append(self.n_frames - len(frames))
+        self._frames = []
+        self._write_layout()
+
+    def _write_layout(self):
+        """Note the layout and how many frames are written so far"""
+        layout = dict(
+            self.layout, chunk=self.chunk, n_frames=self.n_frames, starts=self.starts
+        )
+        with open(os.path.join(self.path, LAYOUT), "w") as layout_file:
+            json.dump(layout, layout_file)
+
+    def close(self):
+        """Write any frames still held in memory"""
+        self.flush()
+
+
+class Trajectory:
+    """Read frames, as snapshots, from a trajectory directory"""
+
+    def __init__(self, path):
+        """Open a recorded trajectory
+
+        Parameters
+        ----------
+        path : str
+            Directory a `TrajectoryWriter` recorded to
+        """
+        with open(os.path.join(path, LAYOUT)) as layout_file:
+            self.layout = json.load(layout_file)
+        self.path = path
+        self._starts = np.array(self.layout["starts"])
+        self._loaded = (None, None)  # last chunk read, and its frames
+
+    def __str__(self):
+        """String representation of a trajectory"""
+        return "Trajectory of %i frames at %s" % (len(self), self.path)
+
+    def __len__(self):
+        return self.layout["n_frames"]
+
+    def _chunk(self, chunk):
+        """All the frames of a chunk, read once while they're being used"""
+        if self._loaded[0] == chunk:
+            return self._loaded[1]
+        with np.load(_chunk_name(self.path, chunk)) as data:
+            arrays = {name: data[name] for name in data.files}
+        frames = [
+            {
+                "tick": int(tick),
+                "time": float(time),
+                "span": self.layout["span"],
+                "periodic": self.layout["periodic"],
+                "n_tracts": self.layout["n_tracts"],
+            }
+            for tick, time in zip(arrays["tick"], arrays["time"])
+        ]
+        for kind in KINDS:
+            bounds = np.concatenate([[0], np.cumsum(arrays[kind + ".count"])])
+            fields = [
+                name.split(".", 1)[1]
+                for name in arrays
+                if name.startswith(kind + ".") and name != kind + ".count"
+            ]
+            for i, frame in enumerate(frames):
+                lo, hi = bounds[i], bounds[i + 1]
+                frame[kind] = {f: arrays[kind + "." + f][lo:hi] for f in fields}
+        self._loaded = (chunk, frames)
+        return frames
+
+    def __getitem__(self, frame):
+        """Snapshot of a frame, as `flat_render.snapshot` gives"""
+        if frame < 0:
+            frame += len(self)
+        if not 0 <= frame < len(self):
+            raise IndexError("no frame %i in trajectory" % frame)
+        chunk = int(np.searchsorted(self._starts, frame, side="right")) - 1
+        return self._chunk(chunk)[frame - self._starts[chunk]]
+
+
+def _render_block(job):
+    """Render a block of frames from a trajectory, in a worker"""
+    path, frames, filenames, params = job
+    trajectory, cache = Trajectory(path), flat_writer.FragmentCache()
+    for frame, filename in zip(frames, filenames):
+        flat_writer.save(trajectory[frame], filename, params, cache)
+    return len(frames)
+
+
+def render(path, filenames, frames=None, params={}, workers=None, progress=None):
+    """Render frames of a trajectory to svgs on a pool of processes
+
+    Frames are handed out in blocks of consecutive frames so that each
+    worker reads each chunk once and reuses unchanged tract groups between
+    frames, see `flat_writer.FragmentCache`.
+
+    Parameters
+    ----------
+    path : str
+        Directory of the trajectory
+    filenames : list of str, or str
+        Where to write each frame, or a format for the frame number, such as
+        "frames/%06i.svg"
+    frames : iterable of int, optional
+        Which frames to render, defaults to all of them
+    params : dict
+        Zoom, window, styles and so on, as for `flat_render.plot_world`
+    workers : int, optional
+        Processes to render with, defaults to the number of cpus
+    progress : callable, optional
+        Called with the number of frames in each block as it is done
+
+    Returns
+    -------
+    filenames: list of str
+        The files written, in frame order
+    """
+    trajectory = Trajectory(path)
+    frames = range(len(trajectory)) if frames is None else list(frames)
+    if isinstance(filenames, str):
+        filenames = [filenames % frame for frame in frames]
+    if len(filenames) != len(frames):
+        raise Exception("need a filename for each frame")
+    block = trajectory.layout["chunk"]
+    jobs = [
+        (path, frames[i : i + block], filenames[i : i + block], params)
+        for i in range(0, len(frames), block)
+    ]
+    workers = workers or os.cpu_count() or 1
+    with multiprocessing.Pool(min(workers, max(len(jobs), 1))) as pool:
+        for done in pool.imap(_render_block, jobs):
+            if progress is not None:
+                progress(done)
+    return filenames
@@ -5,17 +5,71 @@ Plot things about our hex spaces and their tracts on matplotlib axes
 
 import matplotlib.pyplot as plt
 import matplotlib
-import matplotlib.patches
+import matplotlib.collections
+import numpy as np
 from ..support.hexmath import cube
 
 
-def plot_tractspace(ts, callback=None, show=False):
-    """Plot the tracts and what's in them, optionally using a callback"""
+# Angles of the corners of a pointy side up hexagon
+CORNERS = np.pi / 2 + np.arange(6) * np.pi / 3
+
+
+def tract_centers(ts):
+    """Cartesian centers of all the tracts in a space, as x and y arrays"""
+    locs = np.array([tract.loc for tract in ts.all_tracts]).reshape(-1, 3)
+    return cube.to_cart(*locs.T)
+
+
+def hex_vertices(x, y, radius=1):
+    """Corners of hexagons centered on each x, y, shape (n, 6, 2)"""
+    corners = radius * np.stack([np.cos(CORNERS), np.sin(CORNERS)], axis=1)
+    centers = np.stack([x, y], axis=1)
+    return centers[:, None, :] + corners[None, :, :]
+
+
+def _label_fits(ax, text, fontsize):
+    """Would text fit in a hexagon of unit radius at the current zoom?"""
+    radius = np.diff(ax.transData.transform([[0, 0], [1, 0]]), axis=0)
+    radius = np.hypot(*radius[0])
+    height = fontsize * ax.figure.dpi / 72
+    width = 0.6 * height * len(text)  # a typical glyph's aspect
+    return height <= radius and width <= np.sqrt(3) * radius
+
+
+def plot_tractspace(
+    ts, callback=None, show=False, values=None, cmap="viridis", labels=None, ax=None
+):
+    """Plot the tracts and what's in them
+
+    All tracts are drawn as one collection of hexagons, shaded by values if
+    given, and labelled using a callback where the labels are legible.
+
+    Parameters
+    ----------
+    ts: flins.space.Space
+        Space of tracts to plot
+    callback: callable, optional
+        Takes a tract and returns what to label it with, defaults to its cube
+        coordinates
+    show: boolean
+        Show the plot once drawn
+    values: callable or array-like, optional
+        Scalar per tract to color tracts by, such as a bound fraction or mean
+        force. Either an array in the order of `ts.all_tracts` or a callable
+        taking that list and returning one.
+    cmap: str or matplotlib colormap
+        Colors for values
+    labels: boolean, optional
+        Force labels on or off, by default they're drawn where legible
+    ax: matplotlib axes, optional
+        Axes to draw on, a new figure's by default
+    """
     # Set up callback
     if callback is None:
         callback = lambda t: t.loc  # noqa: E731, default to cube coordinates
     # Set up figure
-    fig, ax = plt.subplots(1, 1, figsize=(8, 8))
+    if ax is None:
+        fig, ax = plt.subplots(1, 1, figsize=(8, 8))
     ax.axis("off")
     try:
         xlim, ylim = ts.size
@@ -24,14 +78,28 @@ def plot_tractspace(ts, callback=None, show=False):
     except TypeError:
         lim = 2 * ts.size + 1
         ax.set(xlim=(-lim, lim), ylim=(lim, -lim), aspect=1)
-    # Work through each tract
-    for tract in ts.all_tracts:
-        x, y = cube.to_cart(*tract.loc)
-        hex = matplotlib.patches.RegularPolygon(
-            (x, y), numVertices=6, radius=1, facecolor="White", edgecolor="k"
-        )
-        ax.add_patch(hex)
-        ax.text(x, y, str(callback(tract)), ha="center", va="center")
+    # All the tracts at once
+    tracts = ts.all_tracts
+    x, y = tract_centers(ts)
+    hexes = matplotlib.collections.PolyCollection(
+        hex_vertices(x, y), facecolors="White", edgecolors="k"
+    )
+    if values is not None:
+        if callable(values):
+            values = values(tracts)
+        hexes.set_array(np.asarray(values, dtype=float))
+        hexes.set_cmap(cmap)
+        ax.figure.colorbar(hexes, ax=ax, shrink=0.8)
+    ax.add_collection(hexes)
+    # Label tracts where we can read them
+    fontsize = matplotlib.rcParams["font.size"]
+    ax.apply_aspect()
+    legible = labels is None and _label_fits(ax, "0", fontsize)
+    if labels or legible:  # skip calling back at all when too small to read
+        for tract, x_i, y_i in zip(tracts, x, y):
+            text = str(callback(tract))
+            if labels or _label_fits(ax, text, fontsize):
+                ax.text(x_i, y_i, text, ha="center", va="center")
     if show:
         plt.show()
     return ax
@@ -0,0 +1,22 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Shared test fixtures
+"""
+
+import pytest
+
+import numpy as np
+
+
+@pytest.fixture(autouse=True)
+def _keep_random_state():
+    """Worlds reseed numpy, leave the global random state as we found it
+
+    Otherwise tests drawing from the global random state, like those of
+    `test_locations`, see different draws depending on which tests ran first.
+    """
+    state = np.random.get_state()
+    yield
+    np.random.set_state(state)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test logging and replaying binding events
+"""
+
+import pytest
+
+import flins as fl
+from flins.construct import Slabs, Turnover
+from flins.construct.binding_log import BindingLog, BindingLogWriter
+
+
+def _topology(world, ids):
+    """Bonds and motor states of a world, by the log's compact ids"""
+    bonds, states = set(), {}
+    for tract in world.tractspace.all_tracts:
+        for kind in ("actinin", "motor"):
+            for mol in tract.mols.get(kind, []):
+                for head in mol.heads:
+                    if head.bs.bound:
+                        pair = head.bs.linked
+                        partner = (ids[pair.filament], pair.index)
+                        bonds.add(((ids[mol], head.side), partner))
+                    if getattr(head, "state", 0) != 0:
+                        states[(ids[mol], head.side)] = head.state
+    return bonds, states
+
+
+def _replayed(topology, log):
+    """Bonds from crosslinker heads, and motor states, of a replayed topology"""
+    heads = {i for i in range(log.n_molecules) if log.kind(i) in ("actinin", "motor")}
+    bonds = {(a, b) for a, b in topology.bonds.items() if a[0] in heads}
+    return bonds, topology.states
+
+
+def test_replay_matches_each_tick(tmp_path):
+    w = fl.construct.create_test_world(1, 1000, 3, 10, 10)
+    w.step()
+    w.turnover = Turnover({"actinin": (200, 20), "motor": (200, 20)})
+    expected = {}
+    with BindingLogWriter(w, str(tmp_path), checkpoint=3) as writer:
+        for _ in range(8):
+            w.step()
+            writer.events.flush()  # so every molecule bound has an id
+            expected[w.time] = _topology(w, writer.ids)
+        assert not str(writer).startswith("<")
+    log = BindingLog(str(tmp_path))
+    assert len(log) == writer.offset > 0
+    assert [c[0] for c in log.checkpoints] == [1, 4, 7, 9]
+    assert log.n_molecules == writer.n_molecules
+    mol = [m for m in writer.ids.keys() if m.tract is not None][0]
+    assert log.name(writer.ids[mol]) == mol.id
+    for tick, (bonds, states) in expected.items():
+        topology = log.topology(tick)
+        assert topology.tick == tick
+        replayed = _replayed(topology, log)
+        assert replayed[0] == bonds
+        assert replayed[1] == states
+    anchors = sum([len(t.mols.get("anchor", [])) for t in w.tractspace.all_tracts])
+    assert len(topology.bond_array) == len(bonds) + anchors
+    with pytest.raises(Exception):
+        log.topology(0)
+    with pytest.raises(Exception):
+        BindingLogWriter(w, str(tmp_path))
+
+
+def test_log_through_slabs(tmp_path):
+    """Slab workers don't write to the parent's log"""
+    w = fl.construct.create_test_world(0, 4000, 8, 60, 30)
+    w.record_events(capacity=4)  # so workers' copies would overflow
+    with BindingLogWriter(w, str(tmp_path), checkpoint=2) as writer:
+        with Slabs(w, 3) as slabs:
+            for _ in range(7):
+                slabs.step()
+                writer.events.flush()
+                expected = _topology(w, writer.ids)
+    log = BindingLog(str(tmp_path))
+    assert len(log) == writer.offset > 0
+    ticks = [c[0] for c in log.checkpoints]
+    assert ticks == sorted(ticks) and ticks[-1] == 7
+    replayed = _replayed(log.topology(7), log)
+    assert replayed[0] == expected[0]
+    assert replayed[1] == expected[1]
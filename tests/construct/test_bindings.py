@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test buffering binding events
+"""
+
+import numpy as np
+
+import flins as fl
+from flins.construct import bindings
+from flins.support import binding_site
+
+
+class _Collect:
+    def __init__(self):
+        self.records, self.sites = [], []
+
+    def __call__(self, records, sites, partners):
+        self.records.append(records.copy())
+        self.sites.extend(sites)
+
+
+def test_records_of_a_binding():
+    w = fl.construct.create_test_world(1, 1000, 1, 0, 1)
+    events = w.record_events(capacity=2)
+    collect = _Collect()
+    events.subscribe(collect)
+    tract = w.tractspace.all_tracts[3]
+    motor, actin = tract.mols["motor"][0], tract.mols["actin"][0]
+    motor.heads[1].bs.bind(actin.pairs[4].bs)
+    motor.heads[1].state = 2
+    assert collect.records == []  # held until full
+    motor.heads[1].detach()  # unbinds and returns to state 0, overflowing
+    events.flush()
+    records = np.concatenate(collect.records)
+    assert list(records["event"]) == [
+        bindings.BIND,
+        bindings.STATE,
+        bindings.UNBIND,
+        bindings.STATE,
+    ]
+    motor_code = bindings.KIND_CODES["motor"]
+    assert np.all(records["kind"] == motor_code)
+    assert np.all(records["site"] == 1) and np.all(records["tract"] == 3)
+    assert list(records["partner"]) == [bindings.KIND_CODES["actin"], -1] * 2
+    assert list(records["partner_site"]) == [4, -1, 4, -1]
+    assert list(records["state"]) == [-1, 2, -1, 0]
+    assert collect.sites == [motor.heads[1].bs] * 4
+    assert events.total == 4 and events.n == 0
+    assert not str(events).startswith("<")
+
+
+def test_events_match_steps():
+    w = fl.construct.create_test_world(1, 1000, 3, 20, 20)
+    collect = _Collect()
+    w.record_events().subscribe(collect)
+    bound = {
+        head.bs
+        for t in w.tractspace.all_tracts
+        for kind in ("actinin", "motor")
+        for mol in t.mols[kind]
+        for head in mol.heads
+        if head.bs.bound
+    }
+    for _ in range(5):
+        w.step()
+    records = np.concatenate(collect.records)
+    assert np.all(np.diff(records["tick"]) >= 0)
+    for record, site in zip(records, collect.sites):
+        if record["event"] == bindings.BIND:
+            bound.add(site)
+        elif record["event"] == bindings.UNBIND:
+            bound.discard(site)
+    now = {
+        head.bs
+        for t in w.tractspace.all_tracts
+        for kind in ("actinin", "motor")
+        for mol in t.mols[kind]
+        for head in mol.heads
+        if head.bs.bound
+    }
+    assert bound == now
+
+
+def test_unobserved_skips_announcing():
+    w = fl.construct.create_test_world(0, 1000, 1, 0, 0)
+    before = binding_site.listening
+    events = w.record_events()
+    assert binding_site.listening == before + 1
+    events.close()
+    assert binding_site.listening == before
+    assert w.tractspace.listeners == []
+    assert w.events is None
+    w.step()  # no longer flushed
+    assert w.record_events() is not events
+    w.events.close()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test following the connectivity of the actin network
+"""
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.csgraph
+
+import flins as fl
+from flins.construct import Connectivity, Turnover
+from flins.construct.connectivity import ClusterStats
+
+
+def _brute_force(world):
+    """Cluster labels of each actin and anchored ends of each cluster"""
+    tracts = world.tractspace.all_tracts
+    actins = [a for t in tracts for a in t.mols.get("actin", [])]
+    index = {actin: i for i, actin in enumerate(actins)}
+    rows, cols = [], []
+    for t in tracts:
+        for kind in ("actinin", "motor"):
+            for mol in t.mols.get(kind, []):
+                if mol.fully_bound:
+                    a, b = [index[head.bs.linked.filament] for head in mol.heads]
+                    rows.append(a)
+                    cols.append(b)
+    n = len(actins)
+    graph = scipy.sparse.coo_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n))
+    _, labels = scipy.sparse.csgraph.connected_components(graph, directed=False)
+    ends = {}
+    for t in tracts:
+        for anchor in t.mols.get("anchor", []):
+            label = labels[index[anchor.bs.linked.filament]]
+            side = int(anchor.x >= world.tractspace.span / 2)
+            ends.setdefault(label, set()).add(side)
+    return actins, labels, ends
+
+
+def _check(world, conn):
+    actins, labels, ends = _brute_force(world)
+    clusters = [conn.cluster(actin) for actin in actins]
+    # Same partition of filaments, whatever the labels
+    pairs = set(zip(labels.tolist(), clusters))
+    assert len(pairs) == len(set(labels.tolist())) == len(set(clusters))
+    sizes = np.bincount(labels)
+    assert conn.largest == sizes.max()
+    anchored = [label for label, sides in ends.items() if sides]
+    assert conn.n_anchored == sizes[anchored].sum()
+    assert conn.percolates == any([sides == {0, 1} for sides in ends.values()])
+
+
+def test_matches_brute_force():
+    w = fl.construct.create_test_world(1, 1000, 4, 40, 20)
+    w.step()
+    conn = Connectivity(w)
+    _check(w, conn)
+    w.turnover = Turnover({"actinin": (200, 20), "motor": (200, 20)})
+    for _ in range(6):
+        w.step()
+        _check(w, conn)
+    assert not str(conn).startswith("<")
+    conn.close()
+    assert w.tractspace.listeners == []
+
+
+def test_linking_is_incremental():
+    w = fl.construct.create_test_world(0, 1000, 3, 1, 0, periodic=True)
+    actins = w.tractspace.all_tracts[0].mols["actin"]
+    actinin = w.tractspace.all_tracts[0].mols["actinin"][0]
+    for head in actinin.heads:
+        head.detach()
+    conn = Connectivity(w)
+    assert conn.n_clusters == 3 and conn.largest == 1
+    rebuilds = conn.rebuilds
+    actinin.heads[0].bs.bind(actins[0].pairs[0].bs)
+    actinin.heads[1].bs.bind(actins[1].pairs[0].bs)
+    assert conn.n_clusters == 2 and conn.largest == 2
+    assert conn.cluster(actins[0]) == conn.cluster(actins[1])
+    assert conn.rebuilds == rebuilds  # a union, no rebuild
+    actinin.heads[1].detach()
+    assert conn.n_clusters == 3 and conn.largest == 1
+    assert conn.rebuilds == rebuilds + 1
+    assert conn.anchored(actins[0]) == [0, 0] and not conn.percolates
+
+
+def test_observed_cluster_stats():
+    w = fl.construct.create_test_world(1, 1000, 4, 40, 20)
+    conn = Connectivity(w)
+    series = w.observe("clusters", ClusterStats(conn))
+    for _ in range(3):
+        w.step()
+    percolates, largest, n_clusters, n_anchored = series.values[-1]
+    assert largest == conn.largest and n_clusters == conn.n_clusters
+    assert len(series) == 3
+    assert percolates == conn.percolates and n_anchored == conn.n_anchored
+
+
+def test_removed_filaments_are_dropped():
+    w = fl.construct.create_test_world(1, 1000, 4, 40, 20)
+    conn = Connectivity(w)
+    actin = w.tractspace.all_tracts[0].mols["actin"][0]
+    n = len(conn.nodes)
+    actin.remove()
+    assert actin not in conn.nodes
+    _check(w, conn)
+    assert len(conn.nodes) == len(conn.anchors) == n - 1
+    w.turnover = Turnover({"actin": (40, 20), "actinin": (200, 20)})
+    for _ in range(4):
+        w.step()
+        _check(w, conn)
+    actins, labels, _ = _brute_force(w)
+    assert set(conn.nodes) == set(actins)
+    assert conn.n_clusters == len(set(labels.tolist()))
+
+
+def test_anchor_unbinds_from_the_end_it_bound():
+    w = fl.construct.create_test_world(0, 1000, 1, 0, 0, periodic=True)
+    tract = w.tractspace.all_tracts[0]
+    actin = tract.mols["actin"][0]
+    conn = Connectivity(w)
+    anchor = fl.proteins.Anchor(actin.pairs_x[0], actin.pairs[0], tract)
+    assert conn.anchored(actin) == [1, 0]
+    anchor.x = 900  # as if it had been moved across the middle
+    anchor.bs.unbind()
+    assert conn.anchored(actin) == [0, 0]
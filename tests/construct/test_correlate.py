@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test streaming correlators
+"""
+
+import numpy as np
+import pytest
+
+import flins as fl
+from flins.construct import correlate
+
+
+def _brute_msd(x, lag):
+    return np.mean((x[lag:] - x[:-lag]) ** 2) if lag else 0.0
+
+
+def test_level_zero_exact():
+    x = np.cumsum(np.random.standard_normal((300, 5)), axis=0)
+    msd = correlate.MultiTau(5, p=8, m=2, levels=8, msd=True)
+    acf = correlate.MultiTau(5, p=8, m=2, levels=8)
+    for sample in x:
+        msd.push(sample)
+        acf.push(sample)
+    short = msd.lags < 8
+    expected = [_brute_msd(x, lag) for lag in msd.lags[short]]
+    assert msd.result[short] == pytest.approx(expected)
+    products = [np.mean(x[lag:] * x[: len(x) - lag]) for lag in acf.lags[short]]
+    assert acf.result[short] == pytest.approx(products)
+    assert np.isnan(msd.result[-1])  # lags beyond the run aren't seen
+    assert not str(msd).startswith("<")
+
+
+def test_long_lags_approximate():
+    x = np.cumsum(np.random.standard_normal((4096, 20)), axis=0)
+    msd = correlate.MultiTau(20, msd=True)
+    for sample in x:
+        msd.push(sample)
+    seen = ~np.isnan(msd.result) & (msd.lags >= 16) & (msd.lags < 512)
+    # Random walks of unit steps spread as lag, less a block averaging bias
+    assert msd.result[seen] == pytest.approx(msd.lags[seen], rel=0.25)
+    assert len(msd._buffers) <= np.log2(4096) + 1
+
+
+def test_free_diffusion_matches_drag():
+    w = fl.construct.create_test_world(0, 1000, 0, 100, 0, periodic=True)
+    actinins = w.tractspace.all_tracts[0].mols["actinin"]
+    msd = w.observe("msd", correlate.MSD(actinins, p=8, levels=4), capacity=1)
+    vacf = w.observe("vacf", correlate.VelocityACF(actinins, p=8, levels=4))
+    for _ in range(200):
+        w.step()
+    std = w.context.std_dev(actinins[0]._diffusion_drag, w.clock.timestep)
+    lags = msd.reducer.lags
+    short = (lags > 0) & (lags < 8)
+    assert msd.values[-1][short] == pytest.approx(std**2 * lags[short], rel=0.2)
+    velocity = vacf.values[-1]
+    assert velocity[0] == pytest.approx(std**2, rel=0.2)
+    assert abs(velocity[1]) < 0.2 * std**2  # uncorrelated steps
+    assert msd.values.shape == (1, len(lags))
+
+
+def test_force_acf():
+    w = fl.construct.create_test_world(0, 1000, 2, 10, 10)
+    actins = w.tractspace.all_tracts[0].mols["actin"]
+    series = w.observe("force", correlate.ForceACF(actins, p=4, levels=3), stride=2)
+    for _ in range(10):
+        w.step()
+    assert len(series) == 5
+    assert series.values[-1][0] >= 0
+    assert series.values.shape == (5, len(series.reducer.lags))
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test density profiles and their periodicity
+"""
+
+import numpy as np
+import pytest
+
+import flins as fl
+from flins.construct import SharedState, density
+
+
+def _walked(world, profile):
+    """Counts of each kind per bin, walking the molecules"""
+    counts = np.zeros((len(density.KINDS), profile.n_tracts, profile.n_bins))
+    bins = np.arange(profile.n_bins)
+    for i, tract in enumerate(world.tractspace.all_tracts):
+        for k, kind in enumerate(density.KINDS):
+            for mol in tract.mols.get(kind, []):
+                if kind == "actin":
+                    start, end = profile._bin(mol.x), profile._bin(mol.x + mol.length)
+                    if start <= end:
+                        counts[k, i] += (bins >= start) & (bins <= end)
+                    else:  # wrapping around a periodic span
+                        counts[k, i] += (bins >= start) | (bins <= end)
+                else:
+                    counts[k, i, profile._bin(mol.x)] += 1
+    return counts
+
+
+@pytest.mark.parametrize("periodic", [False, True])
+def test_counts_match_walk(periodic):
+    w = fl.construct.create_test_world(1, 1000, 3, 10, 10, periodic=periodic)
+    for _ in range(3):
+        w.step()
+    profile = density.DensityProfile(w, bin_width=25)
+    assert np.all(profile.counts() == _walked(w, profile))
+    with SharedState(w):
+        assert np.all(profile.counts() == _walked(w, profile))
+    assert np.all(profile.counts() == _walked(w, profile))
+
+
+def test_periodicity_of_bands():
+    x = np.arange(200) * 5.0
+    bands = np.cos(2 * np.pi * x / 250) + 0.1 * np.random.standard_normal((3, 200))
+    period, strength = density.periodicity(bands, 5.0)
+    assert period == pytest.approx(250)
+    assert strength > 0.5
+    period, strength = density.periodicity(np.ones((2, 200)), 5.0)
+    assert np.isnan(period) and strength == 0
+
+
+def test_observed_z_spacing():
+    w = fl.construct.create_test_world(0, 1000, 0, 0, 0, periodic=True)
+    w.clock.timestep = 1e-6  # free α-actinin diffuses a few nm a tick
+    tract = w.tractspace.all_tracts[0]
+    for x in np.arange(0, 1000, 200):  # Z-lines every 200 nm
+        for dx in (-5, 0, 5):
+            fl.proteins.AlphaActinin(x + 60 + dx, tract)
+    profile = density.DensityProfile(w, bin_width=10, every=2)
+    series = w.observe("density", profile, capacity=5)
+    for _ in range(3):
+        w.step()
+    assert profile.n_samples == 3
+    assert series.values.shape == (3, len(density.KINDS), 2)
+    assert series.values[-1][1][0] == pytest.approx(200, rel=0.1)
+    assert profile.z_spacing == pytest.approx(200, rel=0.1)
+    assert np.isnan(profile.period("motor"))
+    assert not str(profile).startswith("<")
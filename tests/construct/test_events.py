@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test event-driven kinetics
+"""
+
+import pytest
+
+import numpy as np
+import flins as fl
+from flins.construct.events import EventScheduler
+
+
+class _Mol:
+    """Stand-in molecule with a single head that flips at a fixed rate"""
+
+    fully_bound = True
+    tract = "somewhere"
+
+    def __init__(self, rate):
+        self._version = 0
+        self.heads = [_Head(self, rate)]
+
+
+class _Head:
+    def __init__(self, parent, rate):
+        self.parent, self.rate, self.tract = parent, rate, parent.tract
+        self.flips = 0
+        self.states = []
+
+    def _transitions(self):
+        if isinstance(self.rate, list):
+            return [(rate, state, None) for state, rate in enumerate(self.rate)]
+        return [(self.rate, 1, None)]
+
+    def _transit(self, state, site=None):
+        self.flips += 1
+        self.states.append(state)
+        self.parent._version += 1
+
+
+def test_event_rate():
+    """Events happen at the rate given"""
+    mol = _Mol(50)
+    scheduler = EventScheduler()
+    for _ in range(1000):
+        scheduler.step([mol], 0.01)
+    expected = 50 * 10
+    assert abs(mol.heads[0].flips - expected) < 5 * np.sqrt(expected)
+    assert not str(scheduler).startswith("<")
+
+
+def test_unchanged_not_redrawn():
+    """Fully bound molecules that haven't changed keep their scheduled time"""
+    mol = _Mol(1e-9)
+    scheduler = EventScheduler()
+    scheduler.step([mol], 0.001)
+    entry = scheduler._entries[mol.heads[0]]
+    scheduler.step([mol], 0.001)
+    assert scheduler._entries[mol.heads[0]] is entry
+    mol._version += 1
+    scheduler.step([mol], 0.001)
+    assert scheduler._entries[mol.heads[0]] is not entry
+
+
+def test_infinite_rates_fire_at_once():
+    """Infinite rates fire immediately, choosing among only those"""
+    mol = _Mol([np.inf, 5.0, np.inf])
+    scheduler = EventScheduler()
+    scheduler._schedule(mol.heads[0], 0.5)
+    assert scheduler._queue[0][0] == 0.5
+    for _ in range(100):
+        scheduler._fire(mol.heads[0], 0.5)
+    assert set(mol.heads[0].states) == {0, 2}
+
+
+def test_nan_rates_rejected():
+    mol = _Mol(np.nan)
+    with pytest.raises(Exception):
+        EventScheduler().step([mol], 0.001)
+
+
+def test_overstretched_motor():
+    """A motor stretched to where its reverse rates overflow lets go at once"""
+    tractspace = fl.space.Space("hex", 0, 10000)
+    t = tractspace.all_tracts[0]
+    motor = fl.proteins.Motor(5000, t)
+    acts = [fl.proteins.Actin(x, t, length=100) for x in (5000, 5049.85)]
+    for head, act in zip(motor.heads, acts):
+        head.bs.bind(act.pairs[0].bs)
+        head.state = 2
+    assert abs(motor.heads[0]._length - 49.85) < 1e-9
+    scheduler = EventScheduler()
+    scheduler.step([motor], 1e-6)
+    assert not motor.fully_bound
+    assert all([np.isfinite(entry[0]) for entry in scheduler._queue])
+
+
+def test_event_world():
+    """An event-driven world binds and unbinds like a ticking one"""
+    w = fl.construct.create_test_world(1, 1000, 2, 10, 10)
+    w.scheduler = EventScheduler()
+    _ = [w.step() for i in range(20)]
+    tracts = w.tractspace.all_tracts
+    actinins = [a for t in tracts for a in t.mols["actinin"]]
+    motors = [m for t in tracts for m in t.mols["motor"]]
+    assert any([a.bound for a in actinins])
+    assert not all([a.bound for a in actinins])
+    for motor in motors:
+        for head in motor.heads:
+            assert head.bs.bound == (head.state != 0)
+
+
+def test_unknown_mode():
+    tractspace = fl.space.Space("hex", 0, 100)
+    with pytest.raises(Exception):
+        fl.construct.World(tractspace, kinetics="sometimes")
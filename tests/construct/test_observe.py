@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test observing worlds as they step
+"""
+
+import numpy as np
+import pytest
+
+import flins as fl
+from flins.construct import Turnover, observe
+
+
+def _mols(world, kind):
+    return [m for t in world.tractspace.all_tracts for m in t.mols.get(kind, [])]
+
+
+def _bound_fraction(world):
+    fractions = []
+    for kind in observe.KINDS:
+        mols = _mols(world, kind)
+        bound = [m.bound if kind != "anchor" else m.bs.bound for m in mols]
+        fractions.append(np.mean(bound) if len(mols) else 0)
+    return fractions
+
+
+def _spring_energy(world):
+    energy = sum([m.energy for m in _mols(world, "actinin")])
+    energy += sum([m.heads[0].energy() for m in _mols(world, "motor")])
+    energy += sum([a.energy(a.bs.linked.x) for a in _mols(world, "anchor")])
+    return energy
+
+
+def test_observed_match_brute_force():
+    w = fl.construct.create_test_world(1, 1000, 3, 20, 20)
+    w.step()  # some binding before we start listening
+    bins = np.linspace(0, 60, 7)
+    fraction = w.observe("fraction", observe.BoundFraction())
+    energy = w.observe("energy", observe.SpringEnergy())
+    force = w.observe("force", observe.ActinForce(), stride=2)
+    states = w.observe("states", observe.MotorStates())
+    lengths = w.observe("lengths", observe.LengthHistogram("actinin", bins))
+    w.turnover = Turnover({"actinin": (500, 50), "motor": (500, 50)})
+    for _ in range(5):  # to tick 6
+        w.step()
+        assert fraction.values[-1] == pytest.approx(_bound_fraction(w))
+        assert energy.values[-1] == pytest.approx(_spring_energy(w))
+        motors = [m.state for m in _mols(w, "motor")]
+        occupancy = [np.mean(np.equal(motors, s)) for s in range(3)]
+        assert states.values[-1] == pytest.approx(occupancy)
+        actinins = [m for m in _mols(w, "actinin") if m.fully_bound]
+        separation = w.tractspace.separation
+        length = [abs(separation(*[h.x for h in m.heads])) for m in actinins]
+        assert np.all(lengths.values[-1] == np.histogram(length, bins)[0])
+    assert len(fraction) == 5 and len(force) == 3
+    assert np.all(force.ticks == [2, 4, 6])
+    tracts = w.tractspace.all_tracts
+    expected = [np.mean([a.force for a in t.mols["actin"]]) for t in tracts]
+    assert force.values[-1] == pytest.approx(expected)
+    assert w.observers["energy"] is energy
+    assert not str(w.observers).startswith("<")
+
+
+def test_series_capacity():
+    w = fl.construct.create_test_world(0, 1000, 1, 5, 5)
+    series = w.observe("fraction", observe.BoundFraction(), capacity=4)
+    for _ in range(10):
+        w.step()
+    assert series.n == 10 and len(series) == 4
+    assert series.values.shape == (4, len(observe.KINDS))
+    assert np.all(series.ticks == [7, 8, 9, 10])
+
+
+def test_close_stops_listening():
+    w = fl.construct.create_test_world(0, 1000, 1, 5, 5)
+    series = w.observe("fraction", observe.BoundFraction())
+    assert w.tractspace.listeners == [w.observers]
+    w.step()
+    w.observers.close()
+    assert w.tractspace.listeners == []
+    assert w.observers is None
+    w.step()
+    assert len(series) == 1
+
+
+def test_observed_through_slabs():
+    w = fl.construct.create_test_world(0, 4000, 8, 60, 30)
+    fraction = w.observe("fraction", observe.BoundFraction())
+    with fl.construct.Slabs(w, 2) as slabs:
+        for _ in range(3):
+            slabs.step()
+    assert len(fraction) == 3
+    assert fraction.values[-1] == pytest.approx(_bound_fraction(w))
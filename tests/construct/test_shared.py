@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test publishing world state to shared memory
+"""
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+import flins as fl
+from flins.construct import SharedState, SharedReader
+
+
+def _read_tick(spec, queue):
+    with SharedReader(spec) as reader:
+        state = reader.read()
+        queue.put((state["tick"], state["motor_x"].tolist()))
+
+
+def test_published_state_matches():
+    w = fl.construct.create_test_world(1, 1000, 3, 10, 10)
+    with SharedState(w) as shared:
+        for _ in range(5):
+            w.step()
+        with SharedReader(shared.spec) as reader:
+            state = reader.read()
+            assert state["tick"] == 5
+            motors = [m for t in w.tractspace.all_tracts for m in t.mols["motor"]]
+            assert np.all(state["motor_x"] == [motor.x for motor in motors])
+            states = [[head.state for head in motor.heads] for motor in motors]
+            assert np.all(state["motor_state"] == states)
+            tracts = w.tractspace.all_tracts
+            actins = [(i, a) for i, t in enumerate(tracts) for a in t.mols["actin"]]
+            assert np.all(state["actin_tract"] == [i for i, _ in actins])
+            bound = [len(actin._bound_pairs) for _, actin in actins]
+            assert np.all(state["actin_bound"] == bound)
+
+
+def test_step_after_close():
+    """Closing stops a world publishing, and it steps on without"""
+    w = fl.construct.create_test_world(0, 1000, 1, 5, 5)
+    with SharedState(w):
+        w.step()
+    assert w.shared is None
+    w.step()
+    assert w.time == 2
+
+
+def test_share_attaches_to_world():
+    w = fl.construct.create_test_world(0, 1000, 1, 5, 5)
+    shared = w.share()
+    assert w.shared is shared and w.share() is shared
+    with pytest.raises(Exception):
+        SharedState(w)
+    w.step()
+    assert shared.arrays["tick"][0] == 1
+    shared.close()
+    assert w.shared is None
+    with SharedState(w) as again:
+        assert w.shared is again
+
+
+def test_reader_in_another_process():
+    w = fl.construct.create_test_world(0, 1000, 1, 5, 5)
+    with SharedState(w) as shared:
+        w.step()
+        w.step()
+        context = multiprocessing.get_context("fork")
+        queue = context.Queue()
+        reader = context.Process(target=_read_tick, args=(shared.spec, queue))
+        reader.start()
+        tick, motor_x = queue.get(timeout=10)
+        reader.join()
+        assert tick == 2
+        assert motor_x == [m.x for m in w.tractspace.all_tracts[0].mols["motor"]]
+
+
+def test_sequence_lock():
+    w = fl.construct.create_test_world(0, 1000, 1, 5, 5)
+    with SharedState(w) as shared, SharedReader(shared.spec) as reader:
+        views, seq = reader.view()
+        assert seq % 2 == 0
+        assert not reader.changed_since(seq)
+        shared.publish()
+        assert reader.changed_since(seq)
+        del views
+
+
+def test_room_for_turnover():
+    w = fl.construct.create_test_world(0, 1000, 0, 2, 0)
+    with SharedState(w, spare=0):
+        w.turnover = fl.construct.Turnover({"actinin": (1e6, 0)})
+        with pytest.raises(Exception):
+            w.step()
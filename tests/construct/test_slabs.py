@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test stepping worlds in slabs on worker processes
+"""
+
+import pytest
+
+import flins as fl
+from flins.construct import Slabs
+from flins.construct.slabs import _apply, _index, _state
+
+
+def _bindings_consistent(world):
+    """Every bound head links back, and no pair is bound twice"""
+    pairs = set()
+    for tract in world.tractspace.all_tracts:
+        for kind in ("actinin", "motor"):
+            for mol in tract.mols[kind]:
+                for head in mol.heads:
+                    if head.bs.bound:
+                        assert head.bs.link.link is head.bs
+                        assert head.bs.linked not in pairs
+                        pairs.add(head.bs.linked)
+                    elif kind == "motor":
+                        assert head.state == 0
+    return pairs
+
+
+def test_slabs_step():
+    w = fl.construct.create_test_world(0, 4000, 8, 60, 30)
+    with Slabs(w, 3) as slabs:
+        assert not str(slabs).startswith("<")
+        for _ in range(10):
+            slabs.step()
+            _bindings_consistent(w)
+    assert w.time == 10
+    assert len(_bindings_consistent(w)) > 0
+    for mol in w.tractspace.all_tracts[0].mols["actinin"]:
+        if not mol.bound:  # bound ones follow their heads
+            assert 0 <= mol.x <= 4000
+
+
+def test_ownership():
+    """Each molecule is owned by exactly one slab, actin by its midpoint"""
+    w = fl.construct.create_test_world(0, 4000, 8, 60, 30)
+    with Slabs(w, 4) as slabs:
+        extents, owned, regions = slabs._plan()
+        keys = [key for slab in owned for key in slab]
+        assert sorted(keys) == sorted(extents)
+        for slab, (keys, region) in enumerate(zip(owned, regions)):
+            lo, hi = slabs.edges[slab], slabs.edges[slab + 1]
+            assert region[0] <= lo - slabs.ghost and region[1] >= hi + slabs.ghost
+            for key in keys:
+                if slabs._index[key].kind == "actin":
+                    start, end = extents[key]
+                    assert lo <= (start + end) / 2 <= hi
+                    assert region[0] <= start and end <= region[1]
+
+
+def test_contested_binding():
+    """When two slabs bind the same pair, the lower slab's binding stands"""
+    tractspace = fl.space.Space("hex", 0, 1000)
+    tract = tractspace.all_tracts[0]
+    actin = fl.proteins.Actin(400, tract, length=200)
+    left = fl.proteins.AlphaActinin(480, tract)
+    right = fl.proteins.AlphaActinin(520, tract)
+    w = fl.construct.World(tractspace)
+    with Slabs(w, 2) as slabs:
+        pair = actin.nearest(500)
+        left.heads[1].bs.bind(pair.bs)
+        won = _state(left)
+        left.heads[1].bs.unbind()
+        right.heads[0].bs.bind(pair.bs)
+        lost = _state(right)
+        right.heads[0].bs.unbind()
+        owned = [[left.id], [right.id]]
+        merged = slabs._merge([({left.id: won}, None), ({right.id: lost}, None)], owned)
+        assert merged[left.id] == won
+        assert merged[right.id][1][0] == (None, None)
+
+
+def test_stale_holder_detached():
+    """A head still holding a site another takes is detached, and noted as such"""
+    tractspace = fl.space.Space("hex", 0, 1000)
+    tract = tractspace.all_tracts[0]
+    actin = fl.proteins.Actin(400, tract, length=200)
+    stale, taker = fl.proteins.Motor(480, tract), fl.proteins.Motor(490, tract)
+    w = fl.construct.World(tractspace)
+    pair = actin.nearest(500)
+    with Slabs(w, 2) as slabs:
+        taker.heads[1].bs.bind(pair.bs)
+        taker.heads[1].state = 2
+        update = {taker.id: _state(taker)}
+        taker.heads[1].detach()
+        stale.heads[1].bs.bind(pair.bs)
+        stale.heads[1].state = 2
+        sent = {stale.id: _state(stale), taker.id: _state(taker)}
+        slabs._released(sent, update)
+        _apply(_index(w), update)
+        assert sent[stale.id] == _state(stale)
+        assert stale.heads[1].state == 0 and not stale.heads[1].bs.bound
+        assert taker.heads[1].bs.linked is pair
+
+
+class _Tally:
+    """Subscriber noting the size of each batch in a file, as workers could"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def __call__(self, records, sites, partners):
+        with open(self.path, "a") as f:
+            f.write("%i\n" % len(records))
+
+
+def test_slabs_record_events(tmp_path):
+    """Events are recorded once, by the parent, not by forked workers"""
+    w = fl.construct.create_test_world(0, 4000, 8, 60, 30)
+    events = w.record_events(capacity=4)
+    tally = tmp_path / "tally"
+    events.subscribe(_Tally(str(tally)))
+    with Slabs(w, 3) as slabs:
+        for _ in range(5):
+            slabs.step()
+    assert events.total > 0
+    assert sum(map(int, tally.read_text().split())) == events.total
+    events.close()
+
+
+def test_bad_slabs():
+    w = fl.construct.create_test_world(0, 1000, 1, 1, 1)
+    with pytest.raises(Exception):
+        Slabs(w, 2, ghost=10)
+    with pytest.raises(Exception):
+        Slabs(w, 100)
+    w.turnover = fl.construct.Turnover({"actinin": (1, 1)})
+    with pytest.raises(Exception):
+        Slabs(w, 2)
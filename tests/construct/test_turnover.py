@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test protein turnover
+"""
+
+import pytest
+
+import flins as fl
+from flins.construct import Turnover
+
+
+def _bound_sites_consistent(world):
+    """Every bound head should link to a pair on an actin still in a tract"""
+    for tract in world.tractspace.all_tracts:
+        for kind in ("actinin", "motor"):
+            for mol in tract.mols.get(kind, []):
+                for head in mol.heads:
+                    if head.bs.bound:
+                        actin = head.bs.linked.filament
+                        assert actin.tract is not None
+                        assert actin in actin.tract.mols["actin"]
+                        assert head.bs.link.link is head.bs
+                    elif kind == "motor":
+                        assert head.state == 0
+
+
+def _count(world, kind):
+    return sum([len(t.mols.get(kind, [])) for t in world.tractspace.all_tracts])
+
+
+def test_insertion():
+    """High insertion and no removal only adds"""
+    w = fl.construct.create_test_world(0, 1000, 2, 5, 5)
+    w.turnover = Turnover({"actinin": (5000, 0), "motor": (5000, 0)})
+    _ = [w.step() for i in range(5)]
+    assert _count(w, "actinin") > 5
+    assert _count(w, "motor") > 5
+
+
+def test_removal():
+    """Removing everything leaves nothing behind and nothing dangling"""
+    w = fl.construct.create_test_world(1, 1000, 2, 20, 5)
+    _ = [w.step() for i in range(5)]
+    w.turnover = Turnover({"actinin": (0, 1e6), "actin": (0, 1e6)})
+    w.step()
+    assert _count(w, "actinin") == 0
+    assert _count(w, "actin") == 0
+    assert _count(w, "anchor") == 0
+    assert _count(w, "motor") == 7 * 5
+    _bound_sites_consistent(w)
+
+
+def test_turnover_keeps_bindings_consistent():
+    """Run a while with steady turnover of all kinds"""
+    rates = {"actinin": (200, 20), "motor": (200, 20), "actin": (10, 5)}
+    w = fl.construct.create_test_world(1, 1000, 2, 10, 5)
+    w.turnover = Turnover(rates)
+    for _ in range(20):
+        w.step()
+        _bound_sites_consistent(w)
+    names = [
+        set(t.mols_named.get("actinin", {}).values()) for t in w.tractspace.all_tracts
+    ]
+    lists = [set(t.mols.get("actinin", [])) for t in w.tractspace.all_tracts]
+    assert names == lists
+
+
+def test_per_tract_rates():
+    """Rates can be given per tract"""
+    w = fl.construct.create_test_world(1, 1000, 1, 0, 0)
+    center = w.tractspace.tract((0, 0, 0))
+
+    def rates(tract):
+        return {"actinin": (1e6 if tract is center else 0, 0)}
+
+    w.turnover = Turnover(rates)
+    w.step()
+    assert len(center.mols["actinin"]) > 0
+    others = [t for t in w.tractspace.all_tracts if t is not center]
+    assert all([len(t.mols.get("actinin", [])) == 0 for t in others])
+
+
+def test_unknown_kind():
+    w = fl.construct.create_test_world(0, 1000, 1, 0, 0)
+    w.turnover = Turnover({"myosin": (1e6, 0)})
+    with pytest.raises(Exception):
+        w.step()
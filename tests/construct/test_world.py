@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test stepping worlds
+"""
+
+import numpy as np
+
+import flins as fl
+
+
+def _unbound(world, kind):
+    mols = [m for t in world.tractspace.all_tracts for m in t.mols[kind]]
+    return [m for m in mols if not m.bound]
+
+
+def _unbound_any(mols):
+    return [m for m in mols if m.kind in ("actinin", "motor") and not m.bound]
+
+
+def test_batch_diffusion():
+    """Unbound molecules all move and stay in bounds"""
+    w = fl.construct.create_test_world(1, 1000, 0, 10, 10)
+    w.batch_diffusion = True
+    mols = _unbound(w, "actinin") + _unbound(w, "motor")
+    before = np.array([mol.x for mol in mols])
+    w.step()
+    after = np.array([mol.x for mol in mols])
+    assert np.all(before != after)
+    assert all([0 <= mol.x <= 1000 - mol._diffusion_extent for mol in mols])
+    assert w.clock.peak_dx > 0
+
+
+def test_batch_diffusion_leaves_bound():
+    """Only unbound molecules are diffused in the batch"""
+    w = fl.construct.create_test_world(1, 1000, 3, 20, 20)
+    w.batch_diffusion = True
+    for _ in range(5):
+        w.step()
+    mols = [m for t in w.tractspace.all_tracts for v in t.mols.values() for m in v]
+    bound = [mol for mol in mols if mol not in _unbound_any(mols)]
+    before = [mol.x for mol in bound]
+    moved = w._diffuse_unbound(mols)
+    assert moved == set(_unbound_any(mols))
+    assert before == [mol.x for mol in bound]
+
+
+def test_batch_diffusion_events():
+    w = fl.construct.create_test_world(1, 1000, 3, 10, 10)
+    w = fl.construct.World(w.tractspace, kinetics="event", batch_diffusion=True)
+    for _ in range(5):
+        w.step()
+
+
+def test_periodic_world():
+    """Molecules wrap around and springs measure across the seam"""
+    w = fl.construct.create_test_world(1, 500, 3, 20, 10, periodic=True)
+    assert all([len(t.mols.get("anchor", [])) == 0 for t in w.tractspace.all_tracts])
+    w.batch_diffusion = True
+    for _ in range(20):
+        w.step()
+    for tract in w.tractspace.all_tracts:
+        for actin in tract.mols["actin"]:
+            assert 0 <= actin.x < 500
+        for actinin in tract.mols["actinin"]:
+            if actinin.fully_bound:
+                dist = actinin.heads[0]._backbone_length()
+                assert dist <= 250
+                assert actinin.energy == actinin.spring.energy(dist)
+
+
+def test_periodic_nearest_site():
+    """Binding sites are found across the seam"""
+    tractspace = fl.space.Space("hex", 0, 1000, periodic=True)
+    tract = tractspace.all_tracts[0]
+    actin = fl.proteins.Actin(950, tract, length=100)  # runs over the seam
+    assert tract.nearest_binding_site(20).index == round((1020 - 950) / actin._rise)
+    assert tract.nearest_binding_site(60) is actin.pairs[-1]
+    assert tract.nearest_binding_site(940) is actin.pairs[0]
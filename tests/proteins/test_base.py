@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test the base protein and its per-tick caching
+"""
+
+import flins as fl
+
+
+def _recomputed(mol, prop):
+    """Value of a cached property after throwing the cache away"""
+    mol._invalidate()
+    return getattr(mol, prop)
+
+
+def test_caches_match_recomputation():
+    """Cached geometry should never go stale across a run"""
+    w = fl.construct.create_test_world(1, 1000, 3, 20, 20)
+    for _ in range(10):
+        w.step()
+        for tract in w.tractspace.all_tracts:
+            for motor in tract.mols["motor"]:
+                locs = motor.locs
+                assert tuple(locs) == tuple(_recomputed(motor, "locs"))
+            for actinin in tract.mols["actinin"]:
+                energy = actinin.energy
+                assert energy == _recomputed(actinin, "energy")
+            for actin in tract.mols["actin"]:
+                pairs = actin._bound_pairs
+                assert pairs == _recomputed(actin, "_bound_pairs")
+
+
+def test_cached_once_per_tick():
+    """A property is computed once per tick unless invalidated"""
+    w = fl.construct.create_test_world(0, 1000, 1, 1, 0)
+    actinin = w.tractspace.all_tracts[0].mols["actinin"][0]
+    head = actinin.heads[1]
+    first = head.x
+    assert head.x == first  # same tick, same thermal draw
+    w.clock.advance()
+    assert head.x != first  # new tick, new draw
+
+
+def test_binding_invalidates():
+    """Binding a head updates the cached locations of its motor"""
+    tractspace = fl.space.Space("hex", 0, 1000)
+    t = tractspace.all_tracts[0]
+    motor = fl.proteins.Motor(500, t)
+    actin = fl.proteins.Actin(490, t, length=100)
+    before = motor.locs
+    pair = actin.nearest(before[0] + 3)
+    motor.heads[0].bs.bind(pair.bs)
+    assert motor.locs[0] == pair.x
+    actin.x += 10  # moving the actin moves the bound motor
+    assert motor.locs[0] == pair.x
+    assert actin.bound
+    motor.heads[0].detach()
+    assert not actin.bound
@@ -8,6 +8,8 @@ Test space.
 import pytest
 import random
 
+import numpy as np
+
 import flins.space as space
 
 
@@ -40,3 +42,23 @@ class TestSpace:
         loc = tract.loc
         neighbors = space.neighbors(loc)
         assert all([space.grid.distance(n.loc, loc) == 1 for n in neighbors])
+
+
+class TestPeriodicSpace:
+    def test_needs_span(self):
+        with pytest.raises(Exception):
+            space.Space("hex", 1, None, periodic=True)
+
+    def test_wrap(self):
+        assert space.Space("hex", 0, 100, periodic=True).wrap(-10) == 90
+        assert space.Space("hex", 0, 100).wrap(-10) == -10
+
+    def test_separation(self):
+        """Minimum image separation when periodic"""
+        ring = space.Space("hex", 0, 100, periodic=True)
+        line = space.Space("hex", 0, 100)
+        assert ring.separation(5, 95) == -10
+        assert ring.separation(95, 5) == 10
+        assert ring.separation(10, 30) == 20
+        assert line.separation(5, 95) == 90
+        assert list(ring.separation(0, np.array([40, 60]))) == [40, -40]
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test clocks and adaptive timesteps
+"""
+
+import flins as fl
+from flins.support.clock import Clock, AdaptiveTimestep
+
+
+def test_clock_advance():
+    clock = Clock(0.002)
+    clock.peak_prob = 0.5
+    clock.advance()
+    clock.advance()
+    assert clock.tick == 2
+    assert abs(clock.time - 0.004) < 1e-12
+    assert clock.peak_prob == 0
+    assert not str(clock).startswith("<")
+
+
+def test_adaptive_grows_when_quiet():
+    """Climb one rung per tick while nothing much happens"""
+    clock, adaptive = Clock(0.001), AdaptiveTimestep(max_level=3)
+    for level in (1, 2, 3, 3):
+        clock.peak_prob = 1e-6
+        adaptive.update(clock)
+        assert adaptive.level == level
+        assert clock.timestep == 0.001 * 2**level
+    assert not str(adaptive).startswith("<")
+
+
+def test_adaptive_shrinks():
+    """Drop as far as needed when transitions or diffusion get too likely"""
+    clock = Clock(0.001)
+    adaptive = AdaptiveTimestep(base=0.001, max_prob=0.1, max_dx=10)
+    adaptive.level, clock.timestep = 4, 0.016
+    clock.peak_prob = 0.5  # rate needs a step about 2.4 times the base
+    adaptive.update(clock)
+    assert adaptive.level == 1
+    clock.peak_prob = 0.99
+    adaptive.update(clock)
+    assert adaptive.level == 0
+    adaptive.level, clock.timestep = 4, 0.016
+    clock.peak_prob, clock.peak_dx = 0, 20  # needs a quarter of the step
+    adaptive.update(clock)
+    assert adaptive.level == 2
+
+
+def test_adaptive_spike():
+    """A sudden jump in actin relaxation drops us to the base step"""
+    clock, adaptive = Clock(0.001), AdaptiveTimestep(spike=4)
+    for _ in range(5):
+        clock.peak_jump = 1.0
+        adaptive.update(clock)
+    assert adaptive.level > 0
+    clock.peak_jump = 10.0
+    adaptive.update(clock)
+    assert adaptive.level == 0
+    assert clock.timestep == 0.001
+
+
+def test_world_timestep():
+    """Each world keeps its own timestep, and diffuses according to it"""
+    w1 = fl.construct.create_test_world(0, 1000, 0, 0, 0)
+    w2 = fl.construct.World(fl.space.Space("hex", 0, 1000), timestep=0.004)
+    assert w1.clock.timestep == fl.support.units.world.timestep
+    assert w2.clock.timestep == 0.004
+    for w in (w1, w2):
+        fl.proteins.AlphaActinin(500, w.tractspace.all_tracts[0])
+        w.step()
+    assert w2.clock.peak_dx == 2 * w1.clock.peak_dx
+    assert w2.clock.time == 0.004
+
+
+def test_adaptive_world():
+    w = fl.construct.create_test_world(1, 1000, 2, 10, 10)
+    w.adaptive = AdaptiveTimestep(max_prob=0.2)
+    _ = [w.step() for i in range(10)]
+    assert w.clock.timestep >= w.adaptive.base
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test diffusion helpers
+"""
+
+import numpy as np
+import pytest
+
+from flins.support import diffuse
+
+
+def _bounce(m1, m2, b1, b2):
+    """Bounce back and forth until in bounds"""
+    while m1 < b1 or m2 > b2:
+        diff = 2 * (b1 - m1) if m1 < b1 else -2 * (m2 - b2)
+        m1, m2 = m1 + diff, m2 + diff
+    return m1, m2
+
+
+def test_reflect_matches_bouncing():
+    """Folding gives what bouncing back and forth would"""
+    rng = np.random.RandomState(0)
+    starts = rng.uniform(-3000, 4000, 200)
+    folded = diffuse.reflect(starts, 0, 1000 - 36)
+    for start, x in zip(starts, folded):
+        assert x == pytest.approx(_bounce(start, start + 36, 0, 1000)[0])
+
+
+def test_coerce_to_bounds():
+    assert diffuse.coerce_to_bounds(10, 46, (0, 1000)) == (10, 46)
+    assert diffuse.coerce_to_bounds(-10, 26, (0, 1000)) == (10, 46)
+    assert diffuse.coerce_to_bounds(980, 1016, (0, 1000)) == (948, 984)
+    # Far enough out to have needed thousands of recursions
+    start, end = diffuse.coerce_to_bounds(-1e7 - 5, -1e7 + 31, (0, 1000))
+    assert (start, end) == pytest.approx(_bounce(-1e7 - 5, -1e7 + 31, 0, 1000))
+    with pytest.raises(Exception):
+        diffuse.coerce_to_bounds(0, 2000, (0, 1000))
+    with pytest.raises(Exception):
+        diffuse.coerce_to_bounds(40, 4, (0, 1000))
+
+
+def test_coerce_arrays():
+    starts = np.array([-10.0, 10.0, 980.0])
+    m1, m2 = diffuse.coerce_to_bounds(starts, starts + 36, (0, 1000))
+    assert np.allclose(m1, [10, 10, 948])
+    assert np.allclose(m2 - m1, 36)
+
+
+def test_coerce_periodic():
+    bounds = (0, 1000)
+    assert diffuse.coerce_to_bounds(-10, 26, bounds, periodic=True) == (990, 1026)
+    assert diffuse.coerce_to_bounds(980, 1016, bounds, periodic=True) == (980, 1016)
+    assert diffuse.coerce_to_bounds(2010, 2046, bounds, periodic=True) == (10, 46)
+
+
+def test_reflect_in_bounds():
+    x = diffuse.reflect(np.linspace(-1e5, 1e5, 1001), 10, 50)
+    assert np.all((x >= 10) & (x <= 50))
+    assert diffuse.reflect(55, 10, 50) == 45
+    assert diffuse.reflect(7, 10, 10) == 10  # no room to move
+    with pytest.raises(Exception):
+        diffuse.reflect(5, 10, 0)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test kinetics and rate tables
+"""
+
+import math as m
+import warnings
+import pytest
+import numpy as np
+
+import flins as fl
+from flins.support import kinetics
+from flins.support import spring
+
+
+def _rate(x):
+    return 48 * (1 - m.tanh(0.5 * (x - 30 + 2.0))) + 4
+
+
+def test_rate_to_prob():
+    assert kinetics.rate_to_prob(0, 1) == 0
+    assert 0 < kinetics.rate_to_prob(10, 0.001) < 0.01 + 1e-12
+
+
+def test_reverse_rate():
+    assert kinetics.reverse_rate(2, 1, 1) == 2
+    assert kinetics.reverse_rate(2, 1000, 0) == 0  # overflow guarded
+    assert kinetics.reverse_rate(2, 0, 1000) == float("inf")
+
+
+def test_rate_table_error_bound():
+    """Interpolated values are within tolerance everywhere in the domain"""
+    table = kinetics.RateTable(_rate, 0, 80, tol=1e-4)
+    xs = np.random.uniform(0, 80, 1000)
+    exact = np.array([_rate(x) for x in xs])
+    assert np.max(np.abs(table(xs) - exact)) < 1e-4
+    assert max([abs(table(x) - _rate(x)) for x in xs[:100]]) < 1e-4
+    assert not str(table).startswith("<")
+
+
+def test_rate_table_outside_domain():
+    """Outside the tabulated domain, fall back to the function"""
+    table = kinetics.RateTable(_rate, 0, 80)
+    assert table(-10.0) == _rate(-10.0)
+    assert table(100.0) == _rate(100.0)
+    xs = np.array([-10.0, 10.0, 100.0])
+    assert np.allclose(table(xs), [_rate(x) for x in xs], atol=1e-5)
+
+
+def test_rate_table_probabilities():
+    """Tabulate per-timestep probabilities directly"""
+    table = kinetics.RateTable(_rate, 0, 80, timestep=0.001)
+    for x in (0.0, 12.3, 45.6):
+        assert abs(table(x) - kinetics.rate_to_prob(_rate(x), 0.001)) < 1e-5
+
+
+def test_table_rebuilds_on_new_key():
+    """Changing spring parameters changes the key and so the table"""
+    s = spring.Spring(3.75, 36)
+    key = s.key
+    t1 = kinetics.table(("test", s.key), lambda x: s.energy(x), 0, 80)
+    assert kinetics.table(("test", s.key), None, 0, 80) is t1
+    s.k = 2
+    assert s.key != key
+    t2 = kinetics.table(("test", s.key), lambda x: s.energy(x), 0, 80)
+    assert t2 is not t1
+    assert abs(t2(40.0) - s.energy(40.0)) < 1e-5
+
+
+def _overflowing(x):
+    return m.inf if x > 50 else x
+
+
+def test_rate_table_infinite_rates():
+    """Intervals where the function is infinite are left to the function"""
+    table = kinetics.RateTable(_overflowing, 0, 80)
+    assert table.xs.size < 1000 and table.error < 1e-5
+    for x in (49.0, 49.99, 50.0, 50.01, 60.0):
+        assert table(x) == pytest.approx(_overflowing(x))
+    xs = np.array([49.99, 50.01, 60.0])
+    assert np.allclose(table(xs), [_overflowing(x) for x in xs])
+
+
+def test_rate_table_max_n():
+    """Intervals too steep to tabulate within tolerance warn and use the function"""
+    with pytest.warns(UserWarning):
+        table = kinetics.RateTable(m.exp, 0, 20, max_n=256)
+    xs = np.random.uniform(0, 20, 1000)
+    assert np.max(np.abs(table(xs) - np.exp(xs))) < 1.1e-5
+    assert max([abs(table(x) - m.exp(x)) for x in xs[:100]]) < 1.1e-5
+
+
+def test_motor_rates_finite_where_tabulated():
+    """Motor reverse rates overflow to inf, never nan"""
+    w = fl.construct.create_test_world(1, 1000, 2, 10, 10)
+    head = w.tractspace.all_tracts[0].mols["motor"][0].heads[0]
+    for rate in ("_r10", "_r21"):
+        for length in (0.0, 10.0, 40.0, 49.85, 50.0, 60.0):
+            exact = getattr(head, rate)(length)
+            assert head._rate(rate, length) == pytest.approx(exact, rel=2e-3)
+
+
+def _steep(x):
+    return m.exp(-0.5 * (x - 30) ** 2)
+
+
+def test_rate_table_log():
+    """Log tables follow rates over many orders of magnitude, for any timestep"""
+    table = kinetics.RateTable(_steep, 0, 60, tol=1e-4, log=True)
+    xs = np.random.uniform(0, 60, 1000)
+    exact = np.array([_steep(x) for x in xs])
+    assert np.allclose(table(xs), exact, rtol=1e-4, atol=0)
+    assert table(30.0) == pytest.approx(1, rel=1e-4)
+    prob = table.lookup(0.001)
+    for x in (12.3, 29.0, 31.7):
+        exact = kinetics.rate_to_prob(_steep(x), 0.001)
+        assert prob(x) == pytest.approx(exact, rel=1e-4)
+    with pytest.raises(Exception):
+        kinetics.RateTable(_rate, 0, 80, tol=1e-3).lookup(0.001)
+
+
+def test_default_world_tables_within_tolerance():
+    """Head rate tables of the default world need no warnings, and are bounded"""
+    from flins.proteins import base
+
+    np.random.seed(1)
+    w = fl.construct.create_test_world(1, 1000, 2, 10, 10)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("error", "Rate table")
+        for _ in range(3):
+            w.step()
+    assert 0 < len(base._lookups) <= 1025
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test per-world physical parameter contexts
+"""
+
+import flins as fl
+from flins.support import units, diffuse, spring
+
+
+def test_default_context():
+    """The default context matches the module-level constants"""
+    context = units.default_context
+    assert context.kT == units.constants.kT
+    assert context.eta == units.constants.eta
+    assert context.D_cyto_corr == units.world.D_cyto_corr
+
+
+def test_replace():
+    """Replacing a parameter rederives the constants from it"""
+    hot = units.default_context.replace(temperature=310)
+    assert hot.temperature == 310
+    assert hot.eta == units.default_context.eta
+    assert hot.kT == units.constants.boltzmann * 310
+
+
+def test_cached_drag():
+    context = units.Context(eta=units.poise(0.02))
+    shape = diffuse.Drag.Ellipsoid.long_axis_translation
+    assert context.drag(shape, 18, 3) == shape(18, 3, eta=units.poise(0.02))
+    assert (shape, (18, 3)) in context._drags
+    assert context.drag(shape, 18, 3) > units.default_context.drag(shape, 18, 3)
+
+
+def test_spring_keys_follow_kT():
+    """Springs only share rate tables when their kT matches"""
+    hot = units.default_context.replace(temperature=310)
+    assert spring.Spring(1, 30).key != spring.Spring(1, 30, hot).key
+    assert spring.Spring(1, 30, hot).key == spring.Spring(1, 30, hot).key
+
+
+def test_worlds_side_by_side():
+    """Proteins use the parameters of the world they are in"""
+    cold = fl.construct.create_test_world(0, 1000, 1, 1, 1)
+    hot_context = units.Context(temperature=370, eta=units.poise(0.007))
+    hot = fl.construct.create_test_world(0, 1000, 1, 1, 1, context=hot_context)
+    assert hot.context is hot_context
+    assert cold.context is units.default_context
+    cold_motor = cold.tractspace.all_tracts[0].mols["motor"][0]
+    hot_motor = hot.tractspace.all_tracts[0].mols["motor"][0]
+    assert hot_motor.spring[0].k == hot_context.kT
+    assert cold_motor.spring[0].k == units.constants.kT
+    for _ in range(5):
+        cold.step()
+        hot.step()
+    assert hot_motor._context.std_dev(1e-8, 1e-3) > cold_motor._context.std_dev(
+        1e-8, 1e-3
+    )
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test snapshotting and rendering worlds as flat svgs
+"""
+
+import pickle
+
+import numpy as np
+
+import flins as fl
+from flins.visualize import flat_render
+
+
+def _stepped_world(periodic=False):
+    np.random.seed(0)
+    w = fl.construct.create_test_world(1, 800, 3, 15, 10, periodic=periodic)
+    for _ in range(20):
+        w.step()
+    return w
+
+
+def test_snapshot():
+    w = _stepped_world()
+    snap = flat_render.snapshot(w)
+    assert snap["n_tracts"] == len(w.tractspace.all_tracts)
+    n_motors = sum([len(t.mols["motor"]) for t in w.tractspace.all_tracts])
+    assert snap["motor"]["bound"].shape == (n_motors, 2)
+    motors = [m for t in w.tractspace.all_tracts for m in t.mols["motor"]]
+    n_bound = sum([h.bs.bound for m in motors for h in m.heads])
+    assert snap["motor"]["bound"].sum() == n_bound
+    assert (snap["motor"]["head_tract"][~snap["motor"]["bound"]] == -1).all()
+    # Snapshots are plain data, surviving a trip to another process
+    again = pickle.loads(pickle.dumps(snap))
+    assert again["span"] == snap["span"]
+    assert np.array_equal(again["actin"]["start"], snap["actin"]["start"])
+
+
+def test_snapshot_is_detached():
+    """Stepping the world on doesn't change a snapshot already taken"""
+    w = _stepped_world()
+    snap = flat_render.snapshot(w)
+    before = flat_render.plot_snapshot(snap).tostring()
+    for _ in range(5):
+        w.step()
+    assert flat_render.plot_snapshot(snap).tostring() == before
+
+
+def test_plot_world():
+    for periodic in (False, True):
+        w = _stepped_world(periodic)
+        dwg = flat_render.plot_world(w, {"xm": 1})
+        drawn = dwg.tostring()
+        tracts = w.tractspace.all_tracts
+        n_anchors = sum([len(t.mols.get("anchor", [])) for t in tracts])
+        assert drawn.count('class="anchor" cx') == n_anchors
+        assert drawn.count("<ellipse") > 0
+        assert dwg.attribs["width"] == 800
+
+
+def test_crop():
+    w = _stepped_world()
+    snap = flat_render.snapshot(w)
+    cropped = flat_render.crop(snap, 200, 400)
+    assert cropped["span"] == 200
+    actin = cropped["actin"]
+    assert (actin["start"] <= 200).all() and (actin["end"] >= 0).all()
+    x = cropped["actinin"]["x"]
+    assert len(x) < len(snap["actinin"]["x"])
+    gaps = np.abs((x + 200)[:, None] - snap["actinin"]["x"][None, :])
+    assert (gaps.min(axis=1) < 1e-9).all()
+    # Cropping to everything keeps everything
+    whole = flat_render.crop(snap, 0, 800)
+    for kind in ("actin", "anchor", "actinin", "motor"):
+        assert len(whole[kind]["tract"]) == len(snap[kind]["tract"])
+
+
+def test_periodic_crop():
+    """Molecules across the seam are found in a window at either edge"""
+    w = fl.construct.create_test_world(0, 400, 1, 0, 0, periodic=True)
+    actin = w.tractspace.all_tracts[0].mols["actin"][0]
+    actin.x = 380 + 400  # unwrapped, over the seam
+    snap = flat_render.snapshot(w)
+    for lo, hi in ((0, 10), (390, 400)):
+        cropped = flat_render.crop(snap, lo, hi)
+        assert len(cropped["actin"]["start"]) == 1
+        assert not cropped["periodic"]
+    start = flat_render.crop(snap, 0, 10)["actin"]["start"][0]
+    assert np.isclose(start, -20)
+
+
+def test_window_and_budget():
+    w = _stepped_world()
+    dwg = flat_render.plot_world(w, {"window": (100, 300), "width": 500})
+    assert dwg.attribs["width"] == 500
+    assert len(dwg.tostring()) < len(flat_render.plot_world(w).tostring())
+
+
+def test_density_strips():
+    np.random.seed(0)
+    w = fl.construct.create_test_world(0, 2000, 2, 400, 200)
+    drawn = flat_render.plot_world(w, {"width": 400, "lod": 0.25}).tostring()
+    assert "density actinin" in drawn and "density motor" in drawn
+    detailed = flat_render.plot_world(w, {"width": 400}).tostring()
+    assert "density" not in detailed.replace(".density", "")
+    assert drawn.count("<ellipse") < detailed.count("<ellipse") / 4
+    assert len(drawn) < len(detailed)
+
+
+def test_density_strips_only_where_crowded():
+    np.random.seed(0)
+    w = fl.construct.create_test_world(0, 2000, 2, 0, 0)
+    tract = w.tractspace.all_tracts[0]
+    for x in np.linspace(100, 1500, 8):
+        fl.proteins.AlphaActinin(x, tract)
+    for x in np.linspace(1000, 1010, 20):
+        fl.proteins.AlphaActinin(x, tract)
+    drawn = flat_render.plot_world(w, {"width": 400, "lod": 0.25}).tostring()
+    assert drawn.count("density actinin") == 1
+    assert drawn.count("<ellipse") == 8
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test writing flat svgs as text
+"""
+
+import io
+
+import numpy as np
+import pytest
+
+import flins as fl
+from flins.visualize import flat_render, flat_writer
+
+
+@pytest.mark.parametrize("periodic", [False, True])
+def test_same_as_svgwrite(periodic):
+    """Text written is exactly what svgwrite would give"""
+    np.random.seed(2)
+    w = fl.construct.create_test_world(1, 800, 3, 15, 10, periodic=periodic)
+    for _ in range(20):
+        w.step()
+    snap = flat_render.snapshot(w)
+    for params in ({}, {"xm": 1, "ym": 3}, {"window": (100, 500), "width": 900}):
+        expected = flat_render.plot_snapshot(snap, params).tostring()
+        assert flat_writer.plot_snapshot(snap, params) == expected
+
+
+def test_density_same_as_svgwrite():
+    np.random.seed(0)
+    w = fl.construct.create_test_world(0, 2000, 2, 400, 200)
+    params = {"width": 400, "lod": 0.25}
+    expected = flat_render.plot_world(w, params).tostring()
+    assert "density actinin" in expected and "<ellipse" in expected
+    assert flat_writer.plot_world(w, params) == expected
+
+
+def test_write_and_save(tmp_path):
+    w = fl.construct.create_test_world(1, 400, 2, 8, 4)
+    snap = flat_render.snapshot(w)
+    out = io.StringIO()
+    flat_writer.write_snapshot(snap, out)
+    filename = str(tmp_path / "frame.svg")
+    flat_writer.save(snap, filename)
+    with open(filename) as svg_file:
+        assert svg_file.read() == out.getvalue()
+    assert out.getvalue().startswith("<svg") and out.getvalue().endswith("</svg>")
+
+
+def test_leaves_world_alone():
+    """Rendering doesn't stash anything on the simulation's objects"""
+    w = fl.construct.create_test_world(1, 400, 2, 8, 4)
+    tract = w.tractspace.all_tracts[0]
+    actin = tract.mols["actin"][0]
+    before = (set(vars(tract)), set(vars(actin)))
+    flat_writer.plot_world(w)
+    flat_render.plot_world(w)
+    assert (set(vars(tract)), set(vars(actin))) == before
+
+
+def test_fragment_cache():
+    np.random.seed(3)
+    w = fl.construct.create_test_world(1, 800, 3, 15, 10)
+    cache = flat_writer.FragmentCache()
+    snap = flat_render.snapshot(w)
+    first = flat_writer.plot_snapshot(snap, {}, cache)
+    assert first == flat_writer.plot_snapshot(snap)
+    assert cache.hits == 0 and cache.misses == 7 * snap["n_tracts"]
+    # Nothing changed, everything reused
+    assert flat_writer.plot_snapshot(snap, {}, cache) == first
+    assert cache.hits == 7 * snap["n_tracts"]
+    assert not str(cache).startswith("<")
+
+
+def test_fragment_cache_sees_changes():
+    np.random.seed(3)
+    w = fl.construct.create_test_world(1, 800, 3, 15, 10)
+    cache = flat_writer.FragmentCache()
+    flat_writer.plot_world(w, {}, cache)
+    tract = w.tractspace.all_tracts[2]
+    actin = tract.mols["actin"][0]
+    actin.x += 0.1  # less than a pixel, reused
+    misses = cache.misses
+    flat_writer.plot_world(w, {}, cache)
+    assert cache.misses == misses
+    actin.x += 10  # moved, its tract's actin redrawn
+    drawn = flat_writer.plot_world(w, {}, cache)
+    assert cache.misses == misses + 1
+    assert drawn == flat_writer.plot_world(w)
+    # A new layout starts afresh
+    flat_writer.plot_world(w, {"xm": 1}, cache)
+    assert cache.misses == misses + 1 + 7 * len(w.tractspace.all_tracts)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test rendering movie frames, in the background or not
+"""
+
+import concurrent.futures
+import os
+import shutil
+import time
+
+import numpy as np
+import pytest
+
+import flins as fl
+from flins.visualize import flat_render, flat_writer
+from flins.visualize.movie import MovieGen, _ordered
+
+
+def test_background_frames(tmp_path):
+    np.random.seed(0)
+    w = fl.construct.create_test_world(1, 400, 2, 8, 4)
+    expected, cache = [], flat_writer.FragmentCache()
+    movie = MovieGen(temp_dir=str(tmp_path / "bg"), workers=1, queue_size=2)
+    for _ in range(6):
+        w.step()
+        expected.append(flat_writer.plot_world(w, {"xm": 1.0, "ym": 1.0}, cache))
+        movie.add_world(w)
+    movie.finish_renders()
+    assert len(movie._workers) == 0
+    for filename, drawn in zip(movie.svgs, expected):
+        with open(filename) as svg_file:
+            assert svg_file.read() == drawn
+    movie.clean_up()
+    assert not os.path.exists(movie.svgs[0])
+
+
+def test_several_workers(tmp_path):
+    w = fl.construct.create_test_world(1, 400, 2, 8, 4)
+    movie = MovieGen(temp_dir=str(tmp_path / "bg"), workers=3, queue_size=1)
+    for _ in range(8):
+        w.step()
+        movie.add_world(w)
+    movie.finish_renders()
+    groups = flat_render.plot_world(w).tostring().count("<g")
+    for filename in movie.svgs:
+        with open(filename) as svg_file:
+            assert svg_file.read().count("<g") == groups
+
+
+def test_foreground_frames(tmp_path):
+    w = fl.construct.create_test_world(1, 400, 2, 8, 4)
+    movie = MovieGen(temp_dir=str(tmp_path / "fg"))
+    movie.add_world(w)
+    movie.add_world(w)
+    assert [os.path.basename(fn) for fn in movie.svgs] == ["000001.svg", "000002.svg"]
+    assert all([os.path.exists(fn) for fn in movie.svgs])
+    assert len(movie._workers) == 0
+
+
+def test_failed_worker(tmp_path):
+    w = fl.construct.create_test_world(1, 400, 2, 8, 4)
+    movie = MovieGen(temp_dir=str(tmp_path / "bad"), workers=1)
+    movie.add_world(w)
+    movie._jobs.put(("not a snapshot", {}, str(tmp_path / "nowhere.svg")))
+    with pytest.raises(Exception):
+        movie.finish_renders()
+
+
+def test_dropped_movie_stops_workers(tmp_path):
+    w = fl.construct.create_test_world(1, 400, 2, 8, 4)
+    movie = MovieGen(temp_dir=str(tmp_path / "dropped"), workers=1)
+    movie.add_world(w)
+    worker = movie._workers[0]
+    del movie  # stops, rather than waits on, the worker
+    worker.join(5)
+    assert not worker.is_alive()
+    assert not os.path.exists(str(tmp_path / "dropped" / "000001.svg"))
+
+
+def test_ordered():
+    """Results come back in order, however long each takes"""
+    with concurrent.futures.ThreadPoolExecutor(4) as pool:
+        delays = [0.02, 0, 0.01, 0, 0.03, 0]
+        results = list(_ordered(pool, lambda d: time.sleep(d) or d, delays, 2))
+    assert results == delays
+
+
+@pytest.mark.skipif(
+    shutil.which("rsvg-convert") is None or shutil.which("ffmpeg") is None,
+    reason="needs rsvg-convert and ffmpeg",
+)
+def test_write_movie(tmp_path):
+    w = fl.construct.create_test_world(1, 400, 2, 8, 4)
+    for pipe in (False, True):
+        outname = str(tmp_path / ("piped" if pipe else "files"))
+        movie = MovieGen(outname, temp_dir=str(tmp_path / str(pipe)), quiet=True)
+        for _ in range(3):
+            w.step()
+            movie.add_world(w)
+        movie.write_movie(workers=2, pipe=pipe)
+        assert os.path.getsize(movie.outname) > 0
+        assert len(movie.pngs) == (0 if pipe else 3)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test rendering worlds straight into arrays
+"""
+
+import numpy as np
+
+import flins as fl
+from flins.visualize import flat_render, raster
+
+
+def _colors(image):
+    """Set of the colors used in an image"""
+    return set(map(tuple, image.reshape(-1, 3)))
+
+
+def test_styles():
+    styles = raster._styles()
+    assert styles["actin"]["stroke"] == "cornflowerblue"
+    assert raster._width(styles, "post") == 4
+    assert raster._width(styles, "anchor") == 1
+    assert tuple(raster._color(styles, "motor", "fill")) == (178, 34, 34)
+
+
+def test_lines():
+    image = np.zeros((10, 20, 3), dtype=np.uint8)
+    white = np.array([255, 255, 255], dtype=np.uint8)
+    raster._lines(image, [2, 5], [5, 0], [17, 5], [5, 9], 1, white)
+    assert (image[5, 2:18] == 255).all()  # horizontal
+    assert (image[:, 5] == 255).all()  # vertical
+    assert image[0, 0, 0] == 0
+    raster._lines(image, [-10], [-10], [100], [100], 3, white)  # off canvas
+    assert image[9, 9, 0] == 255
+
+
+def test_plot_world():
+    np.random.seed(0)
+    w = fl.construct.create_test_world(1, 400, 2, 8, 4)
+    for _ in range(10):
+        w.step()
+    image = raster.plot_world(w, {"xm": 1, "ym": 2})
+    dwg = flat_render.plot_world(w, {"xm": 1, "ym": 2})
+    assert image.dtype == np.uint8
+    assert image.shape == (dwg.attribs["height"], dwg.attribs["width"], 3)
+    styles = raster._styles()
+    colors = _colors(image)
+    for name, prop in (("tract", "fill"), ("tract", "stroke"), ("actin", "stroke")):
+        assert tuple(raster._color(styles, name, prop)) in colors
+    # Background shows between tracts
+    background = raster._color(styles, "background", "background-color")
+    assert (image[0, image.shape[1] // 2] == background).all()
+
+
+def test_periodic_plot():
+    np.random.seed(1)
+    w = fl.construct.create_test_world(1, 400, 3, 8, 4, periodic=True)
+    for actin in w.tractspace.all_tracts[0].mols["actin"]:
+        actin.x = 380  # runs over the seam
+    image = raster.plot_world(w, {"xm": 1, "ym": 1})
+    blue = tuple(raster._color(raster._styles(), "actin", "stroke"))
+    assert blue in _colors(image[:, :50])
+    assert blue in _colors(image[:, 350:])
+
+
+def test_window():
+    w = fl.construct.create_test_world(1, 400, 2, 8, 4)
+    image = raster.plot_world(w, {"window": (100, 200), "width": 300})
+    assert image.shape[1] == 300
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test recording trajectories and rendering from them
+"""
+
+import numpy as np
+import pytest
+
+import flins as fl
+from flins.visualize import flat_render, flat_writer
+from flins.visualize.movie import MovieGen
+from flins.visualize.trajectory import Trajectory, TrajectoryWriter, render
+
+
+def _record(path, n=7, chunk=3, periodic=False):
+    """Record n frames of a stepping world, returning their svgs too"""
+    np.random.seed(4)
+    w = fl.construct.create_test_world(1, 400, 2, 8, 4, periodic=periodic)
+    svgs = []
+    with TrajectoryWriter(path, chunk=chunk) as writer:
+        for _ in range(n):
+            w.step()
+            writer.add_world(w)
+            svgs.append(flat_writer.plot_world(w, {"xm": 1}))
+    return svgs
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "run")
+    np.random.seed(4)
+    w = fl.construct.create_test_world(1, 400, 2, 8, 4)
+    snaps = []
+    with TrajectoryWriter(path, chunk=2) as writer:
+        for _ in range(5):
+            w.step()
+            writer.add_world(w)
+            snaps.append(flat_render.snapshot(w))
+    trajectory = Trajectory(path)
+    assert len(trajectory) == 5
+    assert trajectory[4]["tick"] == 5
+    for i, snap in enumerate(snaps):
+        frame = trajectory[i]
+        for kind in ("actin", "anchor", "actinin", "motor"):
+            for field, array in snap[kind].items():
+                assert np.array_equal(frame[kind][field], array)
+                assert frame[kind][field].dtype == array.dtype
+    assert trajectory[-1]["time"] == trajectory[4]["time"]
+    with pytest.raises(IndexError):
+        trajectory[5]
+    with pytest.raises(Exception):
+        TrajectoryWriter(path)
+
+
+def test_flush_mid_chunk(tmp_path):
+    """Chunks flushed early are kept, and every frame read back"""
+    path = str(tmp_path / "run")
+    w = fl.construct.create_test_world(1, 400, 2, 8, 4)
+    ticks = []
+    with TrajectoryWriter(path, chunk=3) as writer:
+        for i in range(8):
+            w.step()
+            writer.add_world(w)
+            ticks.append(w.clock.tick)
+            if i in (0, 4):
+                writer.flush()
+    assert writer.starts == [0, 1, 4, 5]
+    trajectory = Trajectory(path)
+    assert len(trajectory) == 8
+    assert [trajectory[i]["tick"] for i in range(8)] == ticks
+    assert [trajectory[i]["tick"] for i in reversed(range(8))] == ticks[::-1]
+
+
+@pytest.mark.parametrize("periodic", [False, True])
+def test_render(tmp_path, periodic):
+    path = str(tmp_path / "run")
+    svgs = _record(path, periodic=periodic)
+    frames = [1, 2, 3, 6]
+    out = str(tmp_path / "frame_%03i.svg")
+    filenames = render(path, out, frames, {"xm": 1}, workers=2)
+    assert filenames[0].endswith("frame_001.svg")
+    # The first frame each worker draws is exact, later ones may reuse groups
+    with open(filenames[0]) as svg_file:
+        assert svg_file.read() == svgs[1]
+    for filename in filenames:
+        with open(filename) as svg_file:
+            assert svg_file.read().count("<g") == svgs[0].count("<g")
+
+
+def test_movie_from_trajectory(tmp_path):
+    path = str(tmp_path / "run")
+    svgs = _record(path, n=4)
+    movie = MovieGen(temp_dir=str(tmp_path / "movie"), zoom=(1, 2), quiet=True)
+    movie.add_trajectory(path, frames=range(0, 4, 3), workers=1)
+    assert len(movie.svgs) == 2
+    with open(movie.svgs[0]) as svg_file:
+        assert svg_file.read() == svgs[0]
+    css = flat_render.CSS_STYLES.replace("firebrick", "purple")
+    movie.add_trajectory(path, frames=[0], params={"css": css}, workers=1)
+    with open(movie.svgs[-1]) as svg_file:
+        assert "purple" in svg_file.read()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: UTF-8 -*-
+
+"""
+Test plotting tract spaces
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+import flins as fl
+from flins.support.hexmath import cube
+from flins.visualize import vis_space
+
+
+def test_centers_and_vertices():
+    ts = fl.space.Space("hex", 2, 100)
+    x, y = vis_space.tract_centers(ts)
+    for tract, x_i, y_i in zip(ts.all_tracts, x, y):
+        assert np.allclose(cube.to_cart(*tract.loc), (x_i, y_i))
+    corners = vis_space.hex_vertices(x, y)
+    assert corners.shape == (len(x), 6, 2)
+    assert np.allclose(np.hypot(*(corners[0] - (x[0], y[0])).T), 1)
+    # Neighbouring hexagons share corners
+    shared = set(map(tuple, np.round(corners[0], 6))) & set(
+        map(tuple, np.round(corners[1], 6))
+    )
+    assert len(shared) in (0, 2)
+
+
+def test_plot_tractspace():
+    ts = fl.space.Space("hex", 1, 100)
+    ax = vis_space.plot_tractspace(ts)
+    assert len(ax.collections) == 1
+    assert len(ax.collections[0].get_paths()) == 7
+    assert sorted([t.get_text() for t in ax.texts]) == sorted(
+        [str(t.loc) for t in ts.all_tracts]
+    )
+    plt.close("all")
+
+
+def test_values():
+    ts = fl.space.Space("hex", 2, 100)
+    seen = []
+
+    def n_neighbors(tracts):
+        seen.append(len(tracts))
+        return np.array([len(t.neighbors) for t in tracts])
+
+    ax = vis_space.plot_tractspace(ts, values=n_neighbors, labels=False)
+    assert seen == [len(ts.all_tracts)]
+    assert np.array_equal(ax.collections[0].get_array(), n_neighbors(ts.all_tracts))
+    assert len(ax.texts) == 0
+    plt.close("all")
+
+
+def test_labels_only_when_legible():
+    ts = fl.space.Space("hex", 20, 100)
+    called = []
+    ax = vis_space.plot_tractspace(ts, callback=called.append)
+    assert len(ax.texts) == 0 and len(called) == 0
+    ax = vis_space.plot_tractspace(ts, callback=lambda t: "", labels=True)
+    assert len(ax.texts) == len(ts.all_tracts)
+    plt.close("all")